@@ -0,0 +1,306 @@
+"""
+Benchmark offline dos módulos de eventos: reproduz mensagens, entradas de membros e exclusões
+de canais sintéticas pelos cogs reais (AntiSpamAntilinkModule, EconomySystem, AutoQuarantine,
+WelcomeGoodbyeModule e AntiNuke), sem Discord e sem MongoDB.
+
+Os eventos passam pelos mesmos pipelines e serviços do bot (cache de configurações, executor REST,
+instrumentação), com os dados gravados no backend em memória de `benchmarks.memory_motor`.
+
+Uso:
+    python -m benchmarks.event_replay [--messages 20000] [--joins 1000] [--guilds 5] [--seed 42] [--json resultado.json]
+
+O relatório mostra eventos por segundo, latência p50/p99 por tipo de evento e operações no banco
+e chamadas à API por evento, para comparar o antes e o depois de cada mudança de desempenho.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import random
+import time
+import discord
+from discord.ext import commands
+from benchmarks.fakes import FakeApi, FakeGuild, FakeMember, FakeMessage
+from benchmarks.memory_motor import MemoryClient
+from database.repositories import Repositories
+from utils.guild_config_cache import GuildConfigCache
+from utils.message_pipeline import MessagePipeline
+from utils.join_pipeline import JoinPipeline
+from utils.rest_executor import RestExecutor
+from utils.instrumentation import Instrumentation
+from utils.shutdown import ShutdownCoordinator
+from modules.antispam_antilink import AntiSpamAntilinkModule
+from modules.economy import EconomySystem
+from modules.auto_quarantine import AutoQuarantine
+from modules.welcome_goodbye_module import WelcomeGoodbyeModule
+from modules.antinuke import AntiNuke
+
+logger = logging.getLogger('benchmark')
+
+ANTISPAM_LIMIT = 8
+SPAM_BURST_SIZE = ANTISPAM_LIMIT + 4  # Rajadas que sempre passam do limite do anti-spam
+WORDS = (
+    "oi", "bom", "dia", "alguém", "vai", "jogar", "hoje", "kkkk", "valeu", "mano", "que", "isso",
+    "servidor", "evento", "amanhã", "partida", "top", "legal", "obrigado", "beleza", "noite", "time",
+)
+LINKS = ("https://exemplo.com/promo", "www.convite-gratis.net", "veja discord.gg/abcdef")
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Percentil pelo método do posto mais próximo (os valores já devem estar ordenados)."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def build_bot(db_latency: float, api_latency: float) -> commands.Bot:
+    """Cria o bot com os mesmos serviços do main.py, mas com o banco em memória e sem login."""
+    bot = commands.Bot(command_prefix='!', intents=discord.Intents.default())
+    bot.logger = logger
+    bot.config = {}
+    bot.api = FakeApi(api_latency)
+    bot.db_client = MemoryClient(latency=db_latency)
+    bot.repos = Repositories(bot.db_client)
+    bot.config_cache = GuildConfigCache(bot)
+    bot.message_pipeline = MessagePipeline(bot)
+    bot.join_pipeline = JoinPipeline(bot)
+    bot.rest = RestExecutor(bot)
+    bot.instrumentation = Instrumentation(bot)
+    bot.shutdown = ShutdownCoordinator(bot)  # Só recebe os registros dos cogs; o benchmark não o executa
+    return bot
+
+
+async def load_cogs(bot):
+    """Carrega os cogs medidos, que registram seus estágios nos pipelines."""
+    await bot.add_cog(AntiSpamAntilinkModule(bot))
+    await bot.add_cog(EconomySystem(bot, bot.db_client))
+    await bot.add_cog(AutoQuarantine(bot))
+    await bot.add_cog(WelcomeGoodbyeModule(bot))
+    await bot.add_cog(AntiNuke(bot))
+    bot.instrumentation.instrument_listeners()
+
+
+async def seed_guilds(bot, guild_count: int, members_per_guild: int, rng: random.Random) -> list:
+    """Cria os servidores falsos com membros e grava as configurações dos módulos no banco."""
+    now = discord.utils.utcnow()
+    guilds = []
+    for index in range(guild_count):
+        guild = FakeGuild(bot.api, f"servidor-{index}")
+        for member_index in range(members_per_guild):
+            created_at = now - datetime.timedelta(days=rng.randint(30, 3000))
+            guild.add_member(FakeMember(guild, f"membro{member_index}", created_at))
+        # Autor das exclusões de canais (nuke)
+        guild.moderator = FakeMember(guild, "moderador", now - datetime.timedelta(days=900), roles=[guild.roles[2]])
+        guild.add_member(guild.moderator)
+        guilds.append(guild)
+
+        await bot.repos.guild_config('antispam_configs').save(guild.id, {'enabled': True, 'limit': ANTISPAM_LIMIT})
+        await bot.repos.guild_config('antilink_configs').save(guild.id, {'enabled': True})
+        await bot.repos.guild_config('welcome_goodbye_configs').save(guild.id, {
+            'welcome_channel_id': guild.text_channels[0].id,
+            'welcome_data': {'personalized_message': 'Olá {user}!', 'welcome_title': 'Boas-vindas!'}
+        })
+
+    # As gravações da preparação não entram na contagem do benchmark
+    bot.db_client.ops.clear()
+    return guilds
+
+
+def build_workload(guilds: list, args, rng: random.Random) -> list:
+    """
+    Monta a sequência de eventos: mensagens comuns, mensagens com links, rajadas de spam,
+    entradas de membros (parte delas suspeitas) e sequências de exclusão de canais (nuke).
+    Rajadas e sequências de nuke ficam contíguas; o resto é embaralhado.
+    """
+    chunks = []
+    spam_messages = int(args.messages * args.spam_ratio)
+    regular_messages = args.messages - spam_messages
+
+    for _ in range(regular_messages):
+        guild = rng.choice(guilds)
+        author = rng.choice(list(guild.members.values()))
+        if rng.random() < args.link_ratio:
+            content = f"{rng.choice(WORDS)} {rng.choice(LINKS)}"
+        else:
+            content = " ".join(rng.choices(WORDS, k=rng.randint(2, 12)))
+        chunks.append([('message', guild, author, rng.choice(guild.text_channels), content)])
+
+    for _ in range(max(1, spam_messages // SPAM_BURST_SIZE) if spam_messages else 0):
+        guild = rng.choice(guilds)
+        author = rng.choice(list(guild.members.values()))
+        channel = rng.choice(guild.text_channels)
+        content = " ".join(rng.choices(WORDS, k=3))
+        chunks.append([('message', guild, author, channel, content)] * SPAM_BURST_SIZE)
+
+    for index in range(args.joins):
+        guild = rng.choice(guilds)
+        suspicious = rng.random() < args.suspicious_ratio
+        chunks.append([('join', guild, suspicious, index)])
+
+    for guild in guilds[:args.nuke_guilds]:
+        chunks.append([('channel_delete', guild)] * args.nuke_actions)
+
+    rng.shuffle(chunks)
+    return [event for chunk in chunks for event in chunk]
+
+
+async def run_event(bot, event):
+    kind = event[0]
+    if kind == 'message':
+        _, guild, author, channel, content = event
+        message = FakeMessage(channel, author, content)
+        channel.messages.append(message)
+        await bot.message_pipeline.dispatch(message)
+    elif kind == 'join':
+        _, guild, suspicious, index = event
+        now = discord.utils.utcnow()
+        if suspicious:
+            member = FakeMember(guild, f"{index}xx", now - datetime.timedelta(days=1), has_avatar=False)
+        else:
+            member = FakeMember(guild, f"novato{index}", now - datetime.timedelta(days=400))
+        guild.add_member(member)
+        await bot.join_pipeline.dispatch(member)
+    elif kind == 'channel_delete':
+        _, guild = event
+        channel = guild.text_channels[-1]
+        guild.log_action(guild.moderator, discord.AuditLogAction.channel_delete, channel)
+        for listener in list(bot.extra_events.get('on_guild_channel_delete', [])):
+            await listener(channel)
+
+
+async def replay(bot, events: list, concurrency: int) -> dict:
+    """Reproduz os eventos e mede a latência de cada um, além das operações no banco e na API."""
+    latencies = {}
+    db_ops = {}
+    api_calls = {}
+
+    async def timed(event):
+        kind = event[0]
+        ops_before, calls_before = bot.db_client.total_ops, bot.api.total_calls
+        start = time.perf_counter()
+        try:
+            await run_event(bot, event)
+        except Exception as e:
+            logger.error(f"Erro ao reproduzir evento {kind}: {e}")
+        latencies.setdefault(kind, []).append(time.perf_counter() - start)
+        # Com concorrência, as operações de eventos simultâneos se misturam; o total continua exato
+        db_ops[kind] = db_ops.get(kind, 0) + bot.db_client.total_ops - ops_before
+        api_calls[kind] = api_calls.get(kind, 0) + bot.api.total_calls - calls_before
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        for event in events:
+            await timed(event)
+    else:
+        for offset in range(0, len(events), concurrency):
+            await asyncio.gather(*(timed(event) for event in events[offset:offset + concurrency]))
+    elapsed = time.perf_counter() - start
+
+    return {"elapsed": elapsed, "latencies": latencies, "db_ops": db_ops, "api_calls": api_calls}
+
+
+def build_report(bot, results: dict, flush_ops: int, flushed_users: int) -> dict:
+    by_kind = {}
+    total_events = 0
+    for kind, values in results["latencies"].items():
+        values.sort()
+        total_events += len(values)
+        by_kind[kind] = {
+            "events": len(values),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+            "max_ms": round(values[-1] * 1000, 3),
+            "db_ops_per_event": round(results["db_ops"].get(kind, 0) / len(values), 3),
+            "api_calls_per_event": round(results["api_calls"].get(kind, 0) / len(values), 3),
+        }
+
+    all_latencies = sorted(value for values in results["latencies"].values() for value in values)
+    total_ops = bot.db_client.total_ops
+    return {
+        "events": total_events,
+        "elapsed_seconds": round(results["elapsed"], 3),
+        "events_per_second": round(total_events / results["elapsed"], 1) if results["elapsed"] else 0.0,
+        "p50_ms": round(percentile(all_latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(all_latencies, 0.99) * 1000, 3),
+        "db_ops_total": total_ops,
+        "db_ops_per_event": round(total_ops / total_events, 3) if total_events else 0.0,
+        "db_ops_by_operation": dict(bot.db_client.ops.most_common()),
+        "final_xp_flush": {"users": flushed_users, "db_ops": flush_ops},
+        "api_calls_by_method": dict(bot.api.calls.most_common()),
+        "config_cache": bot.config_cache.stats(),
+        "by_event": by_kind,
+        "stages": [
+            {"module": module, "handler": handler, "calls": stats["calls"], "errors": stats["errors"],
+             "avg_ms": round(stats["total_time"] / stats["calls"] * 1000, 3) if stats["calls"] else 0.0,
+             "max_ms": round(stats["max_time"] * 1000, 3)}
+            for (module, handler), stats in bot.instrumentation.top(limit=15)
+        ],
+    }
+
+
+def print_report(report: dict):
+    print(f"\n{report['events']} eventos em {report['elapsed_seconds']:.2f} s — {report['events_per_second']:.0f} eventos/s")
+    print(f"Latência geral: p50 {report['p50_ms']:.3f} ms, p99 {report['p99_ms']:.3f} ms")
+    print(f"Operações no banco: {report['db_ops_total']} ({report['db_ops_per_event']:.3f} por evento)"
+          f", incluindo {report['final_xp_flush']['db_ops']} do flush final de XP ({report['final_xp_flush']['users']} usuários)")
+
+    print(f"\n{'evento':<16}{'qtd':>8}{'p50 ms':>10}{'p99 ms':>10}{'máx ms':>10}{'banco/ev':>10}{'api/ev':>10}")
+    for kind, stats in sorted(report["by_event"].items()):
+        print(f"{kind:<16}{stats['events']:>8}{stats['p50_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['max_ms']:>10.3f}"
+              f"{stats['db_ops_per_event']:>10.3f}{stats['api_calls_per_event']:>10.3f}")
+
+    print(f"\n{'estágio/listener':<44}{'chamadas':>10}{'erros':>8}{'média ms':>10}{'máx ms':>10}")
+    for stage in report["stages"]:
+        print(f"{stage['module'] + '.' + stage['handler']:<44}{stage['calls']:>10}{stage['errors']:>8}{stage['avg_ms']:>10.3f}{stage['max_ms']:>10.3f}")
+
+    print("\nOperações no banco: " + (", ".join(f"{name} {count}" for name, count in report["db_ops_by_operation"].items()) or "nenhuma"))
+    print("Chamadas à API: " + (", ".join(f"{name} {count}" for name, count in report["api_calls_by_method"].items()) or "nenhuma"))
+    cache = report["config_cache"]
+    print(f"Cache de configurações: {cache}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Reproduz eventos sintéticos pelos módulos do bot e mede o desempenho.")
+    parser.add_argument('--messages', type=int, default=20000, help="Quantidade de mensagens.")
+    parser.add_argument('--joins', type=int, default=1000, help="Quantidade de entradas de membros.")
+    parser.add_argument('--guilds', type=int, default=5, help="Quantidade de servidores.")
+    parser.add_argument('--members', type=int, default=500, help="Membros iniciais por servidor (autores das mensagens).")
+    parser.add_argument('--link-ratio', type=float, default=0.03, help="Fração das mensagens comuns com links.")
+    parser.add_argument('--spam-ratio', type=float, default=0.05, help="Fração das mensagens enviadas em rajadas de spam.")
+    parser.add_argument('--suspicious-ratio', type=float, default=0.2, help="Fração das entradas de contas suspeitas.")
+    parser.add_argument('--nuke-guilds', type=int, default=1, help="Servidores que sofrem uma sequência de exclusões de canais.")
+    parser.add_argument('--nuke-actions', type=int, default=10, help="Exclusões de canais em cada sequência.")
+    parser.add_argument('--concurrency', type=int, default=1, help="Eventos processados ao mesmo tempo.")
+    parser.add_argument('--db-latency-ms', type=float, default=0.0, help="Latência simulada de cada operação no banco.")
+    parser.add_argument('--api-latency-ms', type=float, default=0.0, help="Latência simulada de cada chamada à API.")
+    parser.add_argument('--seed', type=int, default=42, help="Semente da geração dos eventos.")
+    parser.add_argument('--json', help="Grava o relatório completo neste arquivo.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    random.seed(args.seed)  # Os ganhos de XP usam o gerador global
+    bot = build_bot(args.db_latency_ms / 1000, args.api_latency_ms / 1000)
+    # O contexto prepara o estado interno do cliente sem conectar ao Discord e fecha o bot no fim
+    async with bot:
+        await load_cogs(bot)
+        guilds = await seed_guilds(bot, args.guilds, args.members, rng)
+        events = build_workload(guilds, args, rng)
+        results = await replay(bot, events, args.concurrency)
+
+        # Grava o XP acumulado, como o flush periódico faria, e conta as operações à parte
+        economy = bot.get_cog('EconomySystem')
+        ops_before = bot.db_client.total_ops
+        flushed_users = await economy.accumulator.flush()
+        report = build_report(bot, results, bot.db_client.total_ops - ops_before, flushed_users)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nRelatório gravado em {args.json}.")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s:%(levelname)s:%(name)s: %(message)s')
+    asyncio.run(main())
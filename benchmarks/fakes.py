@@ -0,0 +1,209 @@
+"""
+Objetos falsos do Discord para o benchmark: servidores, canais, membros, cargos e mensagens
+com apenas os atributos e métodos usados pelos módulos. As chamadas à API não fazem nada além
+de contar (e, opcionalmente, esperar uma latência simulada), e não há conexão com o Discord.
+"""
+import asyncio
+import collections
+import datetime
+import itertools
+import discord
+
+# IDs sequenciais no formato de snowflake, para não colidir entre os objetos
+_snowflakes = itertools.count(100000000000000000)
+
+
+def next_snowflake() -> int:
+    return next(_snowflakes)
+
+
+class FakeApi:
+    """Contador das chamadas feitas à "API" pelos objetos falsos, com latência simulada opcional."""
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = collections.Counter()  # {método: quantidade}
+
+    async def call(self, name: str):
+        self.calls[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+
+class FakeAsset:
+    def __init__(self, url: str):
+        self.url = url
+
+
+class FakeRole:
+    def __init__(self, guild, name: str, role_id: int = None):
+        self.guild = guild
+        self.id = role_id or next_snowflake()
+        self.name = name
+        self.mention = f"<@&{self.id}>"
+
+    def __repr__(self):
+        return f"<FakeRole name={self.name!r}>"
+
+
+class FakeUser:
+    def __init__(self, api: FakeApi, name: str, created_at: datetime.datetime, has_avatar: bool = True, bot: bool = False, user_id: int = None):
+        self.api = api
+        self.id = user_id or next_snowflake()
+        self.name = name
+        self.display_name = name
+        self.global_name = name
+        self.bot = bot
+        self.created_at = created_at
+        self.mention = f"<@{self.id}>"
+        self.avatar = FakeAsset(f"https://cdn.discordapp.com/avatars/{self.id}/avatar.png") if has_avatar else None
+        self.display_avatar = self.avatar or FakeAsset("https://cdn.discordapp.com/embed/avatars/0.png")
+
+    async def send(self, *args, **kwargs):
+        await self.api.call('user.send')
+
+
+class FakeMember(FakeUser):
+    def __init__(self, guild, name: str, created_at: datetime.datetime, has_avatar: bool = True, bot: bool = False, roles: list = None):
+        super().__init__(guild.api, name, created_at, has_avatar, bot)
+        self.guild = guild
+        self.roles = [guild.default_role] + list(roles or [])
+        self.joined_at = discord.utils.utcnow()
+
+    async def add_roles(self, *roles, reason: str = None, **kwargs):
+        await self.api.call('member.add_roles')
+        self.roles.extend(role for role in roles if role not in self.roles)
+
+    async def remove_roles(self, *roles, reason: str = None, **kwargs):
+        await self.api.call('member.remove_roles')
+        self.roles = [role for role in self.roles if role not in roles]
+
+    async def kick(self, reason: str = None):
+        await self.api.call('member.kick')
+        self.guild.members.pop(self.id, None)
+
+    async def ban(self, reason: str = None, **kwargs):
+        await self.api.call('member.ban')
+        self.guild.members.pop(self.id, None)
+
+
+class FakeMessage:
+    def __init__(self, channel, author: FakeMember, content: str, created_at: datetime.datetime = None):
+        self.id = next_snowflake()
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.created_at = created_at or discord.utils.utcnow()
+        self.attachments = []
+        self.embeds = []
+        self.mentions = []
+        self.deleted = False
+
+    async def delete(self, delay: float = None):
+        await self.channel.guild.api.call('message.delete')
+        self.deleted = True
+
+
+class FakeTextChannel:
+    """Canal de texto que guarda as últimas `history_size` mensagens para o `history()`."""
+    def __init__(self, guild, name: str, history_size: int = 500):
+        self.guild = guild
+        self.id = next_snowflake()
+        self.name = name
+        self.mention = f"<#{self.id}>"
+        self.messages = collections.deque(maxlen=history_size)
+
+    async def send(self, content: str = None, **kwargs):
+        await self.guild.api.call('channel.send')
+
+    async def history(self, limit: int = 100, before=None, after=None, oldest_first: bool = False):
+        # Mais recentes primeiro, como no discord.py
+        if isinstance(before, datetime.datetime):
+            before_time = before
+        elif before is not None:
+            before_time = before.created_at
+        else:
+            before_time = None
+        await self.guild.api.call('channel.history')
+        returned = 0
+        for message in reversed(self.messages):
+            if limit is not None and returned >= limit:
+                break
+            if message.deleted or (before_time and message.created_at >= before_time):
+                continue
+            returned += 1
+            yield message
+
+    async def delete_messages(self, messages, reason: str = None):
+        await self.guild.api.call('channel.delete_messages')
+        for message in messages:
+            message.deleted = True
+
+    def get_partial_message(self, message_id: int):
+        return discord.utils.get(self.messages, id=message_id)
+
+
+class FakeAuditLogEntry:
+    def __init__(self, user, action, target=None):
+        self.user = user
+        self.action = action
+        self.target = target
+        self.created_at = discord.utils.utcnow()
+
+
+class FakeGuild:
+    def __init__(self, api: FakeApi, name: str, channel_count: int = 5):
+        self.api = api
+        self.id = next_snowflake()
+        self.name = name
+        self.default_role = FakeRole(self, "@everyone", role_id=self.id)
+        self.roles = [self.default_role, FakeRole(self, "Quarentena"), FakeRole(self, "Moderador")]
+        self.text_channels = [FakeTextChannel(self, f"canal-{index}") for index in range(channel_count)]
+        self.members = {}
+        self.moderator = None  # Membro usado como autor das ações do log de auditoria
+        self.audit_log = collections.deque(maxlen=100)  # Entradas mais recentes no fim
+
+    @property
+    def channels(self) -> list:
+        return list(self.text_channels)
+
+    @property
+    def member_count(self) -> int:
+        return len(self.members)
+
+    def get_channel(self, channel_id: int):
+        return discord.utils.get(self.text_channels, id=channel_id)
+
+    get_channel_or_thread = get_channel
+
+    def get_member(self, user_id: int):
+        return self.members.get(user_id)
+
+    def get_role(self, role_id: int):
+        return discord.utils.get(self.roles, id=role_id)
+
+    def add_member(self, member: FakeMember):
+        self.members[member.id] = member
+
+    async def kick(self, user, reason: str = None):
+        await self.api.call('guild.kick')
+        self.members.pop(user.id, None)
+
+    def log_action(self, user, action, target=None):
+        """Registra uma ação no log de auditoria, como o Discord faz antes de enviar o evento."""
+        self.audit_log.append(FakeAuditLogEntry(user, action, target))
+
+    async def audit_logs(self, limit: int = 100, action=None, **kwargs):
+        await self.api.call('guild.audit_logs')
+        returned = 0
+        for entry in reversed(self.audit_log):
+            if returned >= limit:
+                break
+            if action is not None and entry.action != action:
+                continue
+            returned += 1
+            yield entry
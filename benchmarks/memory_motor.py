@@ -0,0 +1,441 @@
+"""
+Backend do MongoDB em memória com a mesma interface assíncrona do Motor, usado pelo benchmark.
+
+Cobre só o que os módulos do bot usam: filtros por igualdade e pelos operadores de comparação
+mais comuns, atualizações com $set/$inc/$max/$setOnInsert/$unset, cursores com sort/limit/skip,
+agregações simples e `bulk_write` de UpdateOne. Cada operação é contada em `client.ops`.
+"""
+import asyncio
+import collections
+import copy
+import random
+from bson import ObjectId
+
+
+def _get_path(document: dict, path: str):
+    value = document
+    for part in path.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return None, False
+        value = value[part]
+    return value, True
+
+def _set_path(document: dict, path: str, value):
+    parts = path.split('.')
+    for part in parts[:-1]:
+        document = document.setdefault(part, {})
+    document[parts[-1]] = value
+
+def _unset_path(document: dict, path: str):
+    parts = path.split('.')
+    for part in parts[:-1]:
+        document = document.get(part)
+        if not isinstance(document, dict):
+            return
+    document.pop(parts[-1], None)
+
+def _compare(value, operator: str, expected, exists: bool) -> bool:
+    if operator == '$exists':
+        return exists == bool(expected)
+    if operator == '$ne':
+        return value != expected
+    if operator == '$in':
+        return value in expected
+    if operator == '$nin':
+        return value not in expected
+    if not exists or value is None:
+        return False
+    if operator == '$lt':
+        return value < expected
+    if operator == '$lte':
+        return value <= expected
+    if operator == '$gt':
+        return value > expected
+    if operator == '$gte':
+        return value >= expected
+    raise NotImplementedError(f"Operador {operator} não suportado pelo backend em memória.")
+
+def matches(document: dict, query: dict) -> bool:
+    """Verifica se o documento satisfaz o filtro."""
+    for key, expected in (query or {}).items():
+        if key == '$and':
+            if not all(matches(document, clause) for clause in expected):
+                return False
+            continue
+        if key == '$or':
+            if not any(matches(document, clause) for clause in expected):
+                return False
+            continue
+        value, exists = _get_path(document, key)
+        if isinstance(expected, dict) and expected and all(str(operator).startswith('$') for operator in expected):
+            if not all(_compare(value, operator, operand, exists) for operator, operand in expected.items()):
+                return False
+        elif value != expected:
+            return False
+    return True
+
+def apply_projection(document: dict, projection) -> dict:
+    document = copy.deepcopy(document)
+    if not projection:
+        return document
+    included = {field for field, flag in projection.items() if flag}
+    if not included:
+        for field in projection:
+            _unset_path(document, field)
+        return document
+    result = {'_id': document['_id']} if '_id' in document and projection.get('_id', 1) else {}
+    for field in included:
+        value, exists = _get_path(document, field)
+        if exists:
+            _set_path(result, field, value)
+    return result
+
+def _sort_documents(documents: list, sort: list) -> list:
+    for field, direction in reversed(sort):
+        # Documentos sem o campo ficam no início da ordem crescente, como no MongoDB
+        documents.sort(key=lambda document: (_get_path(document, field)[1], _get_path(document, field)[0]), reverse=direction < 0)
+    return documents
+
+def _normalize_sort(key_or_list, direction=None) -> list:
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    return list(key_or_list)
+
+
+class UpdateResult:
+    def __init__(self, matched_count: int = 0, modified_count: int = 0, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+
+
+class InsertResult:
+    def __init__(self, inserted_id=None, inserted_ids=None):
+        self.inserted_id = inserted_id
+        self.inserted_ids = inserted_ids or []
+
+
+class DeleteResult:
+    def __init__(self, deleted_count: int = 0):
+        self.deleted_count = deleted_count
+
+
+class BulkWriteResult:
+    def __init__(self):
+        self.matched_count = 0
+        self.modified_count = 0
+        self.upserted_count = 0
+
+
+class MemoryCursor:
+    """Cursor sobre o resultado de uma busca; a consulta só é avaliada ao buscar os documentos."""
+    def __init__(self, collection, query: dict, projection=None, sort=None, limit: int = 0, skip: int = 0):
+        self.collection = collection
+        self.query = query
+        self.projection = projection
+        self._sort = _normalize_sort(sort) if sort else []
+        self._limit = limit
+        self._skip = skip
+        self._results = None
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def limit(self, limit: int):
+        self._limit = limit
+        return self
+
+    def skip(self, skip: int):
+        self._skip = skip
+        return self
+
+    def batch_size(self, batch_size: int):
+        return self
+
+    def _evaluate(self) -> list:
+        documents = [document for document in self.collection.documents.values() if matches(document, self.query)]
+        if self._sort:
+            documents = _sort_documents(documents, self._sort)
+        documents = documents[self._skip:]
+        if self._limit:
+            documents = documents[:self._limit]
+        return [apply_projection(document, self.projection) for document in documents]
+
+    async def to_list(self, length: int = None):
+        await self.collection.database.client.round_trip()
+        documents = self._evaluate()
+        return documents[:length] if length else documents
+
+    async def explain(self):
+        return {"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}, "executionStats": {"totalDocsExamined": len(self.collection.documents)}}
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._results is None:
+            await self.collection.database.client.round_trip()
+            self._results = collections.deque(self._evaluate())
+        if not self._results:
+            raise StopAsyncIteration
+        return self._results.popleft()
+
+
+class MemoryCollection:
+    def __init__(self, database, name: str):
+        self.database = database
+        self.name = name
+        self.documents = {}  # {_id: documento}
+        self.indexes = {'_id_': {'key': [('_id', 1)], 'v': 2}}
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.database.name}.{self.name}"
+
+    async def _operation(self, name: str):
+        self.database.client.ops[name] += 1
+        await self.database.client.round_trip()
+
+    def _matching(self, query: dict) -> list:
+        _id = (query or {}).get('_id')
+        if _id is not None and not isinstance(_id, dict):
+            document = self.documents.get(_id)
+            return [document] if document is not None and matches(document, query) else []
+        return [document for document in self.documents.values() if matches(document, query)]
+
+    def _insert(self, document: dict):
+        document = copy.deepcopy(document)
+        document.setdefault('_id', ObjectId())
+        if document['_id'] in self.documents:
+            raise ValueError(f"Chave duplicada em {self.full_name}: {document['_id']!r}")
+        self.documents[document['_id']] = document
+        return document['_id']
+
+    def _update(self, document: dict, update: dict, inserting: bool = False):
+        for operator, fields in update.items():
+            for path, value in fields.items():
+                current, exists = _get_path(document, path)
+                if operator == '$set':
+                    _set_path(document, path, copy.deepcopy(value))
+                elif operator == '$setOnInsert':
+                    if inserting:
+                        _set_path(document, path, copy.deepcopy(value))
+                elif operator == '$inc':
+                    _set_path(document, path, (current if exists else 0) + value)
+                elif operator == '$max':
+                    if not exists or value > current:
+                        _set_path(document, path, value)
+                elif operator == '$min':
+                    if not exists or value < current:
+                        _set_path(document, path, value)
+                elif operator == '$unset':
+                    _unset_path(document, path)
+                elif operator == '$push':
+                    document_list = current if exists else []
+                    document_list.append(copy.deepcopy(value))
+                    _set_path(document, path, document_list)
+                else:
+                    raise NotImplementedError(f"Operador {operator} não suportado pelo backend em memória.")
+
+    def _upsert(self, query: dict, update: dict):
+        document = {key: copy.deepcopy(value) for key, value in (query or {}).items() if not key.startswith('$') and not (isinstance(value, dict) and any(str(k).startswith('$') for k in value))}
+        self._update(document, update, inserting=True)
+        return self._insert(document)
+
+    def _update_documents(self, query: dict, update: dict, upsert: bool, many: bool) -> UpdateResult:
+        targets = self._matching(query)
+        if not many:
+            targets = targets[:1]
+        if not targets:
+            return UpdateResult(upserted_id=self._upsert(query, update) if upsert else None)
+        modified = 0
+        for document in targets:
+            before = copy.deepcopy(document)
+            self._update(document, update)
+            modified += document != before
+        return UpdateResult(len(targets), modified)
+
+    async def find_one(self, query: dict = None, projection=None, sort=None, **kwargs):
+        await self._operation('find_one')
+        cursor = MemoryCursor(self, query or {}, projection, sort, limit=1)
+        documents = cursor._evaluate()
+        return documents[0] if documents else None
+
+    def find(self, query: dict = None, projection=None, sort=None, limit: int = 0, skip: int = 0, **kwargs):
+        self.database.client.ops['find'] += 1
+        return MemoryCursor(self, query or {}, projection, sort, limit, skip)
+
+    def aggregate(self, pipeline: list, **kwargs):
+        self.database.client.ops['aggregate'] += 1
+        return _AggregationCursor(self, pipeline)
+
+    async def insert_one(self, document: dict, **kwargs):
+        await self._operation('insert_one')
+        inserted_id = self._insert(document)
+        document.setdefault('_id', inserted_id)  # O pymongo também preenche o _id no documento original
+        return InsertResult(inserted_id)
+
+    async def insert_many(self, documents: list, **kwargs):
+        await self._operation('insert_many')
+        return InsertResult(inserted_ids=[self._insert(document) for document in documents])
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False, **kwargs):
+        await self._operation('update_one')
+        return self._update_documents(query, update, upsert, many=False)
+
+    async def update_many(self, query: dict, update: dict, upsert: bool = False, **kwargs):
+        await self._operation('update_many')
+        return self._update_documents(query, update, upsert, many=True)
+
+    async def replace_one(self, query: dict, replacement: dict, upsert: bool = False, **kwargs):
+        await self._operation('replace_one')
+        targets = self._matching(query)[:1]
+        if not targets:
+            return UpdateResult(upserted_id=self._upsert(query, {'$set': replacement}) if upsert else None)
+        _id = targets[0]['_id']
+        self.documents[_id] = {**copy.deepcopy(replacement), '_id': _id}
+        return UpdateResult(1, 1)
+
+    async def delete_one(self, query: dict, **kwargs):
+        await self._operation('delete_one')
+        targets = self._matching(query)[:1]
+        for document in targets:
+            del self.documents[document['_id']]
+        return DeleteResult(len(targets))
+
+    async def delete_many(self, query: dict, **kwargs):
+        await self._operation('delete_many')
+        targets = self._matching(query)
+        for document in targets:
+            del self.documents[document['_id']]
+        return DeleteResult(len(targets))
+
+    async def count_documents(self, query: dict = None, **kwargs) -> int:
+        await self._operation('count_documents')
+        return len(self._matching(query or {}))
+
+    async def bulk_write(self, operations: list, ordered: bool = True, **kwargs):
+        # Um bulk_write é uma única ida ao banco, independentemente do número de operações
+        await self._operation('bulk_write')
+        result = BulkWriteResult()
+        for operation in operations:
+            many = type(operation).__name__ == 'UpdateMany'
+            outcome = self._update_documents(operation._filter, operation._doc, operation._upsert, many=many)
+            result.matched_count += outcome.matched_count
+            result.modified_count += outcome.modified_count
+            result.upserted_count += outcome.upserted_id is not None
+        return result
+
+    async def create_index(self, keys, name: str = None, **kwargs):
+        await self._operation('create_index')
+        keys = _normalize_sort(keys)
+        name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        self.indexes[name] = {'key': keys, 'v': 2, **kwargs}
+        return name
+
+    async def drop_index(self, name: str):
+        await self._operation('drop_index')
+        self.indexes.pop(name, None)
+
+    async def index_information(self) -> dict:
+        await self._operation('index_information')
+        return copy.deepcopy(self.indexes)
+
+    async def drop(self):
+        await self._operation('drop')
+        self.database.collections.pop(self.name, None)
+
+
+class _AggregationCursor(MemoryCursor):
+    """Agregações com os estágios usados pelo bot: $match, $sort, $limit, $skip e $sample."""
+    def __init__(self, collection, pipeline: list):
+        super().__init__(collection, {})
+        self.pipeline = pipeline
+
+    def _evaluate(self) -> list:
+        documents = list(self.collection.documents.values())
+        rng = self.collection.database.client.rng
+        for stage in self.pipeline:
+            (operator, argument), = stage.items()
+            if operator == '$match':
+                documents = [document for document in documents if matches(document, argument)]
+            elif operator == '$sort':
+                documents = _sort_documents(documents, list(argument.items()))
+            elif operator == '$limit':
+                documents = documents[:argument]
+            elif operator == '$skip':
+                documents = documents[argument:]
+            elif operator == '$sample':
+                documents = rng.sample(documents, min(argument['size'], len(documents)))
+            else:
+                raise NotImplementedError(f"Estágio {operator} não suportado pelo backend em memória.")
+        return [copy.deepcopy(document) for document in documents]
+
+
+class MemoryDatabase:
+    def __init__(self, client, name: str):
+        self.client = client
+        self.name = name
+        self.collections = {}
+
+    def get_collection(self, name: str) -> MemoryCollection:
+        collection = self.collections.get(name)
+        if collection is None:
+            collection = self.collections[name] = MemoryCollection(self, name)
+        return collection
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self.get_collection(name)
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        return self.get_collection(name)
+
+    async def list_collection_names(self) -> list:
+        self.client.ops['list_collection_names'] += 1
+        return list(self.collections)
+
+    async def command(self, name, *args, **kwargs):
+        self.client.ops['command'] += 1
+        return {'ok': 1.0}
+
+
+class MemoryClient:
+    """
+    Cliente com a interface do `AsyncIOMotorClient`, guardando tudo em dicionários.
+    Args:
+        latency: Atraso simulado (em segundos) de cada ida ao banco.
+        rng: Gerador usado pelo $sample (para execuções reproduzíveis).
+    """
+    def __init__(self, latency: float = 0.0, rng: random.Random = None):
+        self.latency = latency
+        self.rng = rng or random.Random()
+        self.databases = {}
+        self.ops = collections.Counter()  # {operação: quantidade}
+
+    async def round_trip(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def get_database(self, name: str) -> MemoryDatabase:
+        database = self.databases.get(name)
+        if database is None:
+            database = self.databases[name] = MemoryDatabase(self, name)
+        return database
+
+    def __getattr__(self, name: str) -> MemoryDatabase:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self.get_database(name)
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        return self.get_database(name)
+
+    @property
+    def total_ops(self) -> int:
+        return sum(self.ops.values())
+
+    def close(self):
+        pass
@@ -1,18 +1,6 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import asyncio
-
-async def handle_rate_limit(func, *args, **kwargs):
-    try:
-        return await func(*args, **kwargs)
-    except discord.errors.HTTPException as e:
-        if e.status == 429:
-            print("Rate limit atingido. Esperando...")
-            await asyncio.sleep(e.retry_after)
-            return await handle_rate_limit(func, *args, **kwargs)
-        else:
-            raise e
 
 def setup(tree: app_commands.CommandTree, bot: commands.Bot):
     @tree.command(name="anti-clone", description="Analisa perfis com nomes e avatares semelhantes.")
@@ -55,4 +43,4 @@ def setup(tree: app_commands.CommandTree, bot: commands.Bot):
         if not clones_found:
             embed.add_field(name="Resultado", value="Nenhum perfil suspeito de ser clone encontrado no servidor.")
         
-        await handle_rate_limit(interaction.followup.send, embed=embed)
\ No newline at end of file
+        await bot.rest.run(interaction.followup.send, embed=embed)
\ No newline at end of file
@@ -3,27 +3,18 @@ from discord import app_commands
 from discord.ext import commands
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient
-import asyncio
+from utils.join_pipeline import STAGE_QUARANTINE
+from utils.rest_executor import PRIORITY_SECURITY
+import collections
+import time
 
 logger = logging.getLogger(__name__)
 
-async def handle_rate_limit(func, *args, **kwargs):
-    try:
-        return await func(*args, **kwargs)
-    except discord.errors.HTTPException as e:
-        if e.status == 429:
-            print("Rate limit atingido. Esperando...")
-            await asyncio.sleep(e.retry_after)
-            return await handle_rate_limit(func, *args, **kwargs)
-        else:
-            raise e
-
 
 # Funções para o banco de dados
-async def get_antiraid_config(db_client, guild_id):
+async def get_antiraid_config(repos, guild_id):
     """Retorna a configuração antiraid do banco de dados para o servidor."""
-    collection = db_client.mydatabase.antiraid_configs
-    return await collection.find_one({"_id": guild_id}) or {
+    return await repos.antiraid_configs.get(guild_id) or {
         "is_active": False,
         "kick_new_members": False,
         "ban_new_members": False,
@@ -31,14 +22,49 @@ async def get_antiraid_config(db_client, guild_id):
         "raid_threshold": 10
     }
 
-async def save_antiraid_config(db_client, guild_id, config):
+async def save_antiraid_config(repos, guild_id, config):
     """Salva a configuração antiraid no banco de dados."""
-    collection = db_client.mydatabase.antiraid_configs
-    await collection.update_one(
-        {"_id": guild_id},
-        {"$set": config},
-        upsert=True
-    )
+    await repos.antiraid_configs.save(guild_id, config)
+
+# Entradas recentes por servidor, usadas para detectar picos acima do limite por minuto
+recent_joins = collections.defaultdict(collections.deque)
+
+async def antiraid_stage(ctx):
+    """Estágio antiraid da entrada de membros: expulsa ou bane contas mais novas que o mínimo configurado."""
+    member = ctx.member
+    if member.bot:
+        return
+
+    config = await ctx.config('antiraid_configs', loader=lambda guild_id: get_antiraid_config(ctx.bot.repos, guild_id))
+    if not config.get("is_active"):
+        return
+
+    # Registra a entrada e descarta as que saíram da janela de 1 minuto (simulações têm uma janela própria)
+    now = time.monotonic()
+    joins = recent_joins[('drill', ctx.guild_id) if ctx.dry_run else ctx.guild_id]
+    joins.append(now)
+    while joins and now - joins[0] > 60:
+        joins.popleft()
+    if len(joins) == config.get("raid_threshold", 10) + 1:
+        ctx.actions.append('raid_alert')
+        logger.warning(f"Possível raid no servidor {member.guild.name}: {len(joins)} entradas no último minuto{' (simulação)' if ctx.dry_run else ''}.")
+
+    required_age = config.get("required_account_age_days", 0)
+    if not required_age or ctx.features.account_age_days >= required_age:
+        return
+
+    reason = f"Antiraid: conta com menos de {required_age} dias."
+    try:
+        if config.get("ban_new_members"):
+            await ctx.rest.run(member.ban, reason=reason, guild_id=ctx.guild_id, priority=PRIORITY_SECURITY)
+            ctx.actions.append('antiraid_ban')
+            ctx.stop()
+        elif config.get("kick_new_members"):
+            await ctx.rest.run(member.kick, reason=reason, guild_id=ctx.guild_id, priority=PRIORITY_SECURITY)
+            ctx.actions.append('antiraid_kick')
+            ctx.stop()
+    except discord.Forbidden:
+        logger.error(f"Sem permissão para aplicar o antiraid em {member.name} no servidor {member.guild.name}.")
 
 def create_antiraid_embed(config: dict) -> discord.Embed:
     """Cria um embed com o status atual das configurações de antiraid."""
@@ -66,10 +92,9 @@ def create_antiraid_embed(config: dict) -> discord.Embed:
     return embed
 
 class AntiraidConfigView(discord.ui.View):
-    def __init__(self, bot, db_client, guild_id, config):
+    def __init__(self, bot, guild_id, config):
         super().__init__(timeout=180)
         self.bot = bot
-        self.db_client = db_client
         self.guild_id = guild_id
         self.config = config
 
@@ -80,36 +105,40 @@ class AntiraidConfigView(discord.ui.View):
     @discord.ui.button(label="Ativar/Desativar Antiraid", style=discord.ButtonStyle.danger)
     async def toggle_antiraid(self, interaction: discord.Interaction, button: discord.ui.Button):
         self.config["is_active"] = not self.config.get("is_active")
-        await save_antiraid_config(self.db_client, self.guild_id, self.config)
+        await save_antiraid_config(self.bot.repos, self.guild_id, self.config)
+        self.bot.config_cache.invalidate('antiraid_configs', self.guild_id)
         await self.update_embed(interaction)
 
     @discord.ui.button(label="Expulsar Contas Novas", style=discord.ButtonStyle.secondary)
     async def toggle_kick(self, interaction: discord.Interaction, button: discord.ui.Button):
         self.config["kick_new_members"] = not self.config.get("kick_new_members")
-        await save_antiraid_config(self.db_client, self.guild_id, self.config)
+        await save_antiraid_config(self.bot.repos, self.guild_id, self.config)
+        self.bot.config_cache.invalidate('antiraid_configs', self.guild_id)
         await self.update_embed(interaction)
 
     @discord.ui.button(label="Banir Contas Novas", style=discord.ButtonStyle.secondary)
     async def toggle_ban(self, interaction: discord.Interaction, button: discord.ui.Button):
         self.config["ban_new_members"] = not self.config.get("ban_new_members")
-        await save_antiraid_config(self.db_client, self.guild_id, self.config)
+        await save_antiraid_config(self.bot.repos, self.guild_id, self.config)
+        self.bot.config_cache.invalidate('antiraid_configs', self.guild_id)
         await self.update_embed(interaction)
 
 @app_commands.command(name="antiraid", description="Abre o painel de controle antiraid.")
 @app_commands.checks.has_permissions(administrator=True)
 async def antiraid(interaction: discord.Interaction):
-    # Obtém a instância do bot e do cliente do banco de dados através da interação
+    # Obtém a instância do bot através da interação
     bot = interaction.client
-    db_client = bot.db_client
 
     await interaction.response.defer(ephemeral=True, thinking=True)
     
-    config = await get_antiraid_config(db_client, interaction.guild_id)
+    config = await get_antiraid_config(bot.repos, interaction.guild_id)
     
-    view = AntiraidConfigView(bot, db_client, interaction.guild_id, config)
+    view = AntiraidConfigView(bot, interaction.guild_id, config)
     embed = create_antiraid_embed(config)
     
     await interaction.followup.send(embed=embed, view=view, ephemeral=True)
 
 async def setup(tree: app_commands.CommandTree, bot: commands.Bot, db_client: AsyncIOMotorClient):
-    tree.add_command(antiraid)
\ No newline at end of file
+    tree.add_command(antiraid)
+    # O antiraid roda junto da quarentena, antes do autorole e das boas-vindas
+    bot.join_pipeline.register('antiraid', STAGE_QUARANTINE, antiraid_stage)
\ No newline at end of file
@@ -1,8 +1,12 @@
 import discord
 from discord.ext import commands
 from discord import app_commands, ui
-from database.database import get_collection
 from discord.ui import Modal, TextInput
+from utils.join_pipeline import STAGE_AUTOROLE
+from utils.index_manager import declare_index
+
+# Índices das consultas deste módulo (criados na inicialização)
+declare_index('autorole', 'bot_data', 'autorole_configs', [('guild_id', 1)])
 
 # -----------------
 # CLASSES MODAIS
@@ -30,12 +34,8 @@ class AutoroleModal(Modal, title="Configurar Autorole"):
             await interaction.followup.send("❌ Cargo não encontrado. Por favor, verifique se o ID está correto.", ephemeral=True)
             return
 
-        collection = get_collection(interaction.client.db_client, 'autorole_configs')
-        await collection.update_one(
-            {'guild_id': guild_id},
-            {'$set': {'role_id': role_id}},
-            upsert=True
-        )
+        await interaction.client.repos.guild_config('autorole_configs').save(guild_id, {'role_id': role_id})
+        interaction.client.config_cache.invalidate('autorole_configs', guild_id)
         
         await interaction.followup.send(f"✅ O cargo {role.name} foi configurado como autorole com sucesso.", ephemeral=True)
 
@@ -51,23 +51,30 @@ class AutoroleModule(commands.Cog):
     async def autorole(self, interaction: discord.Interaction):
         await interaction.response.send_modal(AutoroleModal())
 
-    @commands.Cog.listener()
-    async def on_member_join(self, member: discord.Member):
-        if member.bot:
+    async def cog_load(self):
+        self.bot.join_pipeline.register('autorole', STAGE_AUTOROLE, self.autorole_stage)
+
+    async def cog_unload(self):
+        self.bot.join_pipeline.unregister('autorole')
+
+    async def autorole_stage(self, ctx):
+        """Estágio de autorole da entrada de membros. Não concede cargos a quem foi colocado em quarentena."""
+        member = ctx.member
+        if member.bot or ctx.quarantined:
             return
 
-        collection = get_collection(self.bot.db_client, 'autorole_configs')
-        config = await collection.find_one({'guild_id': member.guild.id})
+        config = await ctx.config('autorole_configs')
         
         if config and config.get('role_id'):
             role = member.guild.get_role(config['role_id'])
             if role:
                 try:
-                    await member.add_roles(role)
-                    print(f"Cargo {role.name} adicionado a {member.name}.")
-                    await asyncio.sleep(0.5)  # Adiciona um delay de 0.5 segundos
+                    await ctx.rest.run(member.add_roles, role, guild_id=member.guild.id)
+                    ctx.actions.append('autorole')
+                    # Um registro por entrada: só uma amostra vai para o log
+                    self.bot.logger.info(f"Cargo {role.name} adicionado a {member.name}.", extra={"sample_rate": 0.01})
                 except discord.errors.Forbidden:
-                    print(f"Erro: Sem permissão para adicionar o cargo {role.name} a {member.name}.")
+                    self.bot.logger.warning(f"Sem permissão para adicionar o cargo {role.name} a {member.name}.")
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(AutoroleModule(bot))
@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+from utils.bulk_delete import DeletionJob, CancelDeletionView
 
 class ClearCommand(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -16,22 +17,24 @@ class ClearCommand(commands.Cog):
             return
 
         await interaction.response.defer(ephemeral=True, thinking=True)
+
+        async def report_progress(job):
+            await interaction.edit_original_response(content=f"🧹 Apagando mensagens... {job.deleted}/{quantidade}")
+
+        job = DeletionJob(self.bot, interaction.channel, progress_callback=report_progress, reason=f"/limpar por {interaction.user}")
+        await interaction.edit_original_response(content="🧹 Apagando mensagens...", view=CancelDeletionView(job, interaction.user.id))
         
         try:
-            deleted_count = 0
-            # Apaga as mensagens individualmente com delay
-            async for message in interaction.channel.history(limit=quantidade + 1):
-                if message.id != interaction.message.id:  # Evita apagar a mensagem do comando
-                    await message.delete()
-                    deleted_count += 1
-                    await asyncio.sleep(0.5)  # Delay de 0.5 segundos
+            # Apaga em massa as mensagens recentes e individualmente as mais antigas que 14 dias
+            await job.run(interaction.channel.history(limit=quantidade))
 
             # Envia uma mensagem de confirmação
-            await interaction.followup.send(f"Foram apagadas {deleted_count} mensagens.", ephemeral=True)
+            status = "Limpeza cancelada. " if job.cancelled else ""
+            await interaction.edit_original_response(content=f"{status}Foram apagadas {job.deleted} mensagens.", view=None)
         except discord.Forbidden:
-            await interaction.followup.send("Não tenho permissão para gerenciar mensagens neste canal.", ephemeral=True)
+            await interaction.edit_original_response(content="Não tenho permissão para gerenciar mensagens neste canal.", view=None)
         except Exception as e:
-            await interaction.followup.send(f"Ocorreu um erro ao tentar limpar as mensagens: {e}", ephemeral=True)
+            await interaction.edit_original_response(content=f"Ocorreu um erro ao tentar limpar as mensagens: {e}", view=None)
 
 async def setup(tree: app_commands.CommandTree, bot: commands.Bot):
     """Adiciona o comando de limpar à árvore de comandos."""
@@ -1,7 +1,7 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import os
+from utils.command_sync import sync_configured_target
 
 class DisableCommand(commands.Cog):
     def __init__(self, bot: commands.Bot, owner_id: int):
@@ -30,7 +30,7 @@ class DisableCommand(commands.Cog):
             # Remove o comando da árvore para desativá-lo
             self.bot.tree.remove_command(command.name)
             self.disabled_commands.append(command.name)
-            await self.bot.tree.sync()
+            await sync_configured_target(self.bot)
             
             # Envia a mensagem de sucesso como um "follow-up".
             await interaction.followup.send(f"Comando `{command_name}` desativado com sucesso.", ephemeral=True)
@@ -55,7 +55,7 @@ class DisableCommand(commands.Cog):
                 self.bot.tree.add_command(original_command)
                 self.disabled_commands.remove(command_name)
                 del self.original_commands[command_name]
-                await self.bot.tree.sync()
+                await sync_configured_target(self.bot)
                 
                 # Envia a mensagem de sucesso como um "follow-up".
                 await interaction.followup.send(f"Comando `{command_name}` reativado com sucesso.", ephemeral=True)
@@ -39,6 +39,7 @@ class GiveawayView(ui.View):
         self.image_url = image_url
         self.footer_text = footer_text
         self.participants = set()
+        self.interrupted = False  # Definido no desligamento: o sorteio não é mais atualizado nem sorteado
 
         # Cria o botão "Participar"
         self.participate_button = ui.Button(
@@ -65,6 +66,16 @@ class GiveawayView(ui.View):
             self.participants.add(interaction.user.id)
             await interaction.response.send_message("Você entrou no sorteio!", ephemeral=True)
 
+    async def interrupt(self, message: discord.Message):
+        """Chamado no desligamento do bot: encerra as participações e avisa que o sorteio foi interrompido."""
+        self.interrupted = True
+        for item in self.children:
+            item.disabled = True
+        embed = message.embeds[0]
+        embed.description = f"**Prêmio:** {self.premio}\n\n⚠️ Sorteio interrompido pelo reinício do bot. Nenhum vencedor foi sorteado."
+        embed.color = discord.Color.dark_grey()
+        await message.edit(embed=embed, view=self)
+
 def setup(tree: app_commands.CommandTree, bot: commands.Bot):
 
     async def parse_duration(time_str: str):
@@ -136,10 +147,13 @@ def setup(tree: app_commands.CommandTree, bot: commands.Bot):
             return
 
         await interaction.followup.send("Sorteio iniciado com sucesso!", ephemeral=True)
+        shutdown_token = bot.shutdown.track(f"sorteio '{premio}' em #{interaction.channel}", lambda: view.interrupt(giveaway_message))
 
         # Loop para atualizar o cronômetro
         while datetime.utcnow() < end_time:
             await asyncio.sleep(30)  # Atualiza a cada 30 segundos
+            if view.interrupted:
+                return  # O desligamento já avisou no canal que o sorteio foi interrompido
             try:
                 # Recria o embed para atualizar o cronômetro e a contagem de participantes
                 updated_embed = discord.Embed(
@@ -156,9 +170,13 @@ def setup(tree: app_commands.CommandTree, bot: commands.Bot):
 
                 await giveaway_message.edit(embed=updated_embed, view=view)
             except discord.NotFound:
+                bot.shutdown.untrack(shutdown_token)
                 return
             except Exception as e:
                 bot.logger.error(f"Erro ao atualizar o sorteio: {e}")
+        bot.shutdown.untrack(shutdown_token)
+        if view.interrupted:
+            return
 
         # Fim do sorteio
         try:
@@ -0,0 +1,50 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+def is_owner_check(config):
+    """Cria uma verificação que retorna True se o usuário for o dono do bot."""
+    async def predicate(interaction: discord.Interaction):
+        owner_id = config.get('owner_id')
+        if owner_id:
+            return interaction.user.id == int(owner_id)
+        return False
+    return app_commands.check(predicate)
+
+def setup(tree: app_commands.CommandTree, bot: commands.Bot, config: dict):
+    @tree.command(name="handler-stats", description="[DONO] Mostra os handlers mais lentos do bot.")
+    @app_commands.describe(ordenar_por="Critério de ordenação do ranking.")
+    @app_commands.choices(
+        ordenar_por=[
+            app_commands.Choice(name="Tempo total", value="total_time"),
+            app_commands.Choice(name="Maior latência", value="max_time"),
+            app_commands.Choice(name="Chamadas", value="calls"),
+            app_commands.Choice(name="Erros", value="errors")
+        ]
+    )
+    @is_owner_check(config)
+    async def handler_stats(interaction: discord.Interaction, ordenar_por: app_commands.Choice[str] = None):
+        instrumentation = bot.instrumentation
+        key = ordenar_por.value if ordenar_por else "total_time"
+        ranking = instrumentation.top(limit=15, key=key)
+
+        if not ranking:
+            status = "" if instrumentation.enabled else " A amostragem está desativada (`instrumentation_sample_rate` = 0)."
+            await interaction.response.send_message(f"Nenhuma métrica registrada ainda.{status}", ephemeral=True)
+            return
+
+        lines = []
+        for (module, handler), stats in ranking:
+            average_ms = stats['total_time'] / stats['calls'] * 1000 if stats['calls'] else 0
+            lines.append(
+                f"`{module}.{handler}` — {stats['calls']} chamadas, {stats['errors']} erros, "
+                f"média {average_ms:.1f} ms, máx {stats['max_time'] * 1000:.1f} ms"
+            )
+
+        embed = discord.Embed(
+            title="📊 Latência dos Handlers",
+            description="\n".join(lines),
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text=f"Amostragem: {instrumentation.sample_rate:.0%}")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -14,6 +14,8 @@ class JudgmentView(discord.ui.View):
         self.votes_yes = 0
         self.votes_no = 0
         self.voters = set()
+        self.message = None
+        self.shutdown_token = None
 
     @discord.ui.button(label="Sim", style=discord.ButtonStyle.green)
     async def vote_yes(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -46,7 +48,16 @@ class JudgmentView(discord.ui.View):
         await asyncio.sleep(2)  # Adiciona um delay de 2 segundos
         await self.message.edit(view=self)
 
+    async def interrupt(self):
+        """Chamado no desligamento do bot: encerra a votação sem aplicar a punição."""
+        self.stop()
+        for button in self.children:
+            button.disabled = True
+        await self.message.edit(view=self)
+        await self.message.channel.send(f"⚠️ O julgamento de {self.member.mention} foi interrompido pelo reinício do bot. A punição não será aplicada.")
+
     async def on_timeout(self):
+        self.bot.shutdown.untrack(self.shutdown_token)
         # Desativa os botões e decide o resultado
         for button in self.children:
             button.disabled = True
@@ -104,4 +115,5 @@ def setup(tree: app_commands.CommandTree, bot: commands.Bot):
         )
         
         # Salva a mensagem para ser atualizada
-        view.message = await interaction.original_response()
\ No newline at end of file
+        view.message = await interaction.original_response()
+        view.shutdown_token = bot.shutdown.track(f"julgamento de {usuario}", view.interrupt)
\ No newline at end of file
@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+from utils.command_sync import sync_if_changed, format_sync_report
 
 def is_owner_check(config):
     """Cria uma verificação que retorna True se o usuário for o dono do bot."""
@@ -16,6 +17,6 @@ def setup(tree: app_commands.CommandTree, bot: commands.Bot, config: dict):
 
         bot.tree.clear_commands(guild=None)
         await interaction.followup.send("Comandos globais limpos. Sincronizando...")
-        synced = await bot.tree.sync()
+        report = await sync_if_changed(bot, force=True)
 
-        await interaction.followup.send(f"Limpeza e ressincronização concluídas com sucesso! {len(synced)} comandos sincronizados.")
\ No newline at end of file
+        await interaction.followup.send(f"Limpeza e ressincronização concluídas com sucesso!\n{format_sync_report(report)}")
\ No newline at end of file
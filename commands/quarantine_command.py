@@ -1,7 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import asyncio
+from utils.rest_executor import PRIORITY_SECURITY
 
 def setup(tree: app_commands.CommandTree, bot: commands.Bot):
     @tree.command(name="quarentena", description="Move um usuário para um cargo/canal isolado para avaliação.")
@@ -11,9 +11,7 @@ def setup(tree: app_commands.CommandTree, bot: commands.Bot):
         await interaction.response.defer(ephemeral=True)
 
         try:
-            db = bot.db_client['guild_settings']
-            settings_collection = db['quarantine_config']
-            config = await settings_collection.find_one({'guild_id': interaction.guild.id})
+            config = await bot.repos.guild_config('quarantine_configs').get(interaction.guild.id, ['quarantine_role_id', 'quarantine_channel_id'])
             
             if not config:
                 await interaction.followup.send("O sistema de quarentena não foi configurado para este servidor. Use `/config-quarentena` para configurá-lo.")
@@ -29,30 +27,24 @@ def setup(tree: app_commands.CommandTree, bot: commands.Bot):
             # Guarda os IDs dos cargos atuais para restauração futura
             original_roles_ids = [r.id for r in usuario.roles if r.name != "@everyone" and r.id != quarantine_role_id]
             
-            # Remove todos os cargos do usuário, exceto o @everyone, com delay
+            # Remove todos os cargos do usuário, exceto o @everyone
             roles_to_remove = [r for r in usuario.roles if r.name != "@everyone"]
             for role in roles_to_remove:
                 try:
-                    await usuario.remove_roles(role, reason=motivo)
-                    await asyncio.sleep(0.5)  # Adiciona um delay de 0.5 segundos
+                    await bot.rest.run(usuario.remove_roles, role, reason=motivo, guild_id=interaction.guild.id, priority=PRIORITY_SECURITY)
                 except discord.Forbidden:
                     await interaction.followup.send(f"Não tenho permissão para remover o cargo {role.name} de {usuario.display_name}.")
                     return
             
             # Adiciona o cargo de quarentena
             try:
-                await usuario.add_roles(quarantine_role, reason=motivo)
+                await bot.rest.run(usuario.add_roles, quarantine_role, reason=motivo, guild_id=interaction.guild.id, priority=PRIORITY_SECURITY)
             except discord.Forbidden:
                 await interaction.followup.send(f"Não tenho permissão para adicionar o cargo de quarentena a {usuario.display_name}.")
                 return
 
             # Salva os cargos originais no banco de dados
-            users_collection = bot.db_client['users_data']
-            await users_collection.update_one(
-                {'user_id': usuario.id, 'guild_id': interaction.guild.id},
-                {'$set': {'quarantine_roles': original_roles_ids}},
-                upsert=True
-            )
+            await bot.repos.quarantine_roles.save(interaction.guild.id, usuario.id, original_roles_ids)
 
             quarantine_channel_id = config.get('quarantine_channel_id')
             if quarantine_channel_id and usuario.voice and usuario.voice.channel:
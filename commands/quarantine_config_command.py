@@ -2,6 +2,11 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from pymongo.errors import ConnectionFailure
+from utils.index_manager import declare_index
+
+# Índice da configuração de quarentena, consultada por servidor
+declare_index('quarantine', 'bot_data', 'quarantine_configs', [('guild_id', 1)])
+declare_index('quarantine', 'bot_data', 'quarantine_roles', [('guild_id', 1), ('user_id', 1)])
 
 def setup(tree: app_commands.CommandTree, bot: commands.Bot):
     @tree.command(name="config-quarentena", description="Configura o cargo e o canal de quarentena.")
@@ -11,17 +16,10 @@ def setup(tree: app_commands.CommandTree, bot: commands.Bot):
         await interaction.response.defer(ephemeral=True)
 
         try:
-            db = bot.db_client['guild_settings']
-            settings_collection = db['quarantine_config']
-
-            await settings_collection.update_one(
-                {'guild_id': interaction.guild.id},
-                {'$set': {
-                    'quarantine_role_id': cargo.id,
-                    'quarantine_channel_id': canal.id
-                }},
-                upsert=True
-            )
+            await bot.repos.guild_config('quarantine_configs').save(interaction.guild.id, {
+                'quarantine_role_id': cargo.id,
+                'quarantine_channel_id': canal.id
+            })
 
             await interaction.followup.send(
                 f"Configuração de quarentena salva com sucesso!\n"
@@ -0,0 +1,44 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+from commands.handler_stats_command import is_owner_check
+
+def setup(tree: app_commands.CommandTree, bot: commands.Bot, config: dict):
+    @tree.command(name="query-stats", description="[DONO] Mostra as consultas ao banco de dados que mais consomem tempo.")
+    @app_commands.describe(ordenar_por="Critério de ordenação do ranking.")
+    @app_commands.choices(
+        ordenar_por=[
+            app_commands.Choice(name="Tempo total", value="total_time"),
+            app_commands.Choice(name="Maior latência", value="max_time"),
+            app_commands.Choice(name="Chamadas", value="calls"),
+            app_commands.Choice(name="Consultas lentas", value="slow")
+        ]
+    )
+    @is_owner_check(config)
+    async def query_stats(interaction: discord.Interaction, ordenar_por: app_commands.Choice[str] = None):
+        profiler = bot.query_profiler
+        if not profiler.enabled:
+            await interaction.response.send_message("O profiler de consultas está desativado (`query_profiler` no config.json).", ephemeral=True)
+            return
+
+        key = ordenar_por.value if ordenar_por else "total_time"
+        ranking = profiler.top(limit=10, key=key)
+        if not ranking:
+            await interaction.response.send_message("Nenhuma consulta registrada ainda.", ephemeral=True)
+            return
+
+        lines = []
+        for (namespace, operation, shape), stats in ranking:
+            average_ms = stats.total_time / stats.calls * 1000 if stats.calls else 0
+            lines.append(
+                f"`{namespace}.{operation} {shape}` — {stats.calls} chamadas, {stats.slow} lentas, "
+                f"média {average_ms:.1f} ms, máx {stats.max_time * 1000:.1f} ms"
+            )
+
+        embed = discord.Embed(
+            title="🗄️ Consultas ao Banco de Dados",
+            description="\n".join(lines)[:4096],
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text=f"Consultas acima de {profiler.slow_threshold * 1000:.0f} ms são explicadas no log.")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
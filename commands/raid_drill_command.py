@@ -0,0 +1,92 @@
+import asyncio
+import discord
+from discord.ext import commands
+from discord import app_commands
+from commands.handler_stats_command import is_owner_check
+from utils.raid_drill import RaidDrill
+
+# Um exercício por vez: todos disputam o mesmo executor REST
+drill_lock = asyncio.Lock()
+
+DETECTION_NAMES = {
+    'quarantine': "Quarentena automática",
+    'antiraid_kick': "Antiraid (expulsão)",
+    'antiraid_ban': "Antiraid (banimento)",
+    'raid_alert': "Alerta de raid",
+    'antilink': "Anti-link",
+    'antispam': "Anti-spam",
+    'duplicates': "Conteúdo repetido",
+}
+
+def setup(tree: app_commands.CommandTree, bot: commands.Bot, config: dict):
+    @tree.command(name="raid-drill", description="[DONO] Simula uma raid sem afetar o servidor e mede o tempo de reação.")
+    @app_commands.describe(
+        entradas="Quantidade de entradas simuladas.",
+        mensagens="Quantidade de mensagens simuladas.",
+        duracao="Segundos ao longo dos quais a onda é injetada (0 = tudo de uma vez).",
+        configuracao="Usar configurações fixas do exercício ou as configuradas neste servidor.",
+        latencia_api_ms="Latência simulada de cada ação que seria enviada ao Discord."
+    )
+    @app_commands.choices(
+        configuracao=[
+            app_commands.Choice(name="Simulada", value="simulada"),
+            app_commands.Choice(name="Do servidor", value="servidor")
+        ]
+    )
+    @is_owner_check(config)
+    async def raid_drill(
+        interaction: discord.Interaction,
+        entradas: app_commands.Range[int, 0, 500] = 50,
+        mensagens: app_commands.Range[int, 0, 1000] = 100,
+        duracao: app_commands.Range[float, 0, 60] = 5.0,
+        configuracao: app_commands.Choice[str] = None,
+        latencia_api_ms: app_commands.Range[int, 0, 1000] = 50
+    ):
+        if not entradas and not mensagens:
+            await interaction.response.send_message("❌ Informe ao menos uma entrada ou mensagem.", ephemeral=True)
+            return
+        if drill_lock.locked():
+            await interaction.response.send_message("❌ Já existe um exercício de raid em andamento.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        use_guild_config = configuracao is not None and configuracao.value == "servidor"
+        async with drill_lock:
+            drill = RaidDrill(
+                bot, interaction.guild, joins=entradas, messages=mensagens, duration=duracao,
+                api_latency=latencia_api_ms / 1000, use_guild_config=use_guild_config
+            )
+            try:
+                report = await drill.run()
+            except ValueError as e:
+                await interaction.followup.send(f"❌ {e}", ephemeral=True)
+                return
+
+        first_detection = report["time_to_first_detection"]
+        embed = discord.Embed(
+            title="🚨 Exercício de Raid (simulação)",
+            description=(
+                f"{entradas} entradas e {mensagens} mensagens em {report['elapsed']:.2f}s, "
+                f"com configurações {'do servidor' if use_guild_config else 'simuladas'}. Nenhuma ação foi executada."
+            ),
+            color=discord.Color.orange()
+        )
+        embed.add_field(
+            name="Primeira detecção",
+            value=f"{first_detection * 1000:.0f} ms após o início" if first_detection is not None else "Nenhuma detecção",
+            inline=True
+        )
+        embed.add_field(name="Ações por segundo", value=f"{report['actions_per_second']:.1f}", inline=True)
+        embed.add_field(name="Latência por evento", value=f"p50 {report['p50'] * 1000:.1f} ms\np99 {report['p99'] * 1000:.1f} ms", inline=True)
+        embed.add_field(
+            name="Detecções",
+            value="\n".join(f"{DETECTION_NAMES.get(name, name)}: {count}" for name, count in report["detections"].items()) or "Nenhuma",
+            inline=True
+        )
+        embed.add_field(
+            name="Ações registradas",
+            value="\n".join(f"`{name}`: {count}" for name, count in sorted(report["actions"].items())) or "Nenhuma",
+            inline=True
+        )
+        embed.add_field(name="Fila do executor REST", value=f"Pico {report['queue_max']}\nMédia {report['queue_avg']:.1f}", inline=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
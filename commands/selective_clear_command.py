@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+from utils.bulk_delete import DeletionJob, CancelDeletionView
 
 def setup(tree: app_commands.CommandTree, bot: commands.Bot):
     @tree.command(name="limpeza-seletiva", description="Apaga mensagens que contêm uma palavra específica.")
@@ -9,14 +10,25 @@ def setup(tree: app_commands.CommandTree, bot: commands.Bot):
     async def selective_clear(interaction: discord.Interaction, palavra: str):
         await interaction.response.defer(ephemeral=True) # Defer a resposta para não dar timeout
 
-        deleted_count = 0
-        async for message in interaction.channel.history(limit=200): # Limite de 200 mensagens
-            if palavra.lower() in message.content.lower():
-                try:
-                    await message.delete()
-                    deleted_count += 1
-                    await asyncio.sleep(0.5)  # Adiciona um delay de 0.5 segundos
-                except discord.NotFound:
-                    pass
-        
-        await interaction.followup.send(f"Foram apagadas {deleted_count} mensagens que continham a palavra '{palavra}'.")
\ No newline at end of file
+        palavra_lower = palavra.lower()
+
+        async def report_progress(job):
+            await interaction.edit_original_response(content=f"🧹 Procurando '{palavra}'... {job.deleted} apagadas de {job.scanned} verificadas.")
+
+        job = DeletionJob(
+            bot,
+            interaction.channel,
+            check=lambda message: palavra_lower in message.content.lower(),
+            progress_callback=report_progress,
+            reason=f"/limpeza-seletiva por {interaction.user}"
+        )
+        await interaction.edit_original_response(content=f"🧹 Procurando '{palavra}'...", view=CancelDeletionView(job, interaction.user.id))
+
+        try:
+            await job.run(interaction.channel.history(limit=200)) # Limite de 200 mensagens
+        except discord.Forbidden:
+            await interaction.edit_original_response(content="Não tenho permissão para gerenciar mensagens neste canal.", view=None)
+            return
+
+        status = "Limpeza cancelada. " if job.cancelled else ""
+        await interaction.edit_original_response(content=f"{status}Foram apagadas {job.deleted} mensagens que continham a palavra '{palavra}'.", view=None)
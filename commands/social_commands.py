@@ -3,7 +3,10 @@ from discord.ext import commands
 from discord import app_commands, ui
 import random
 import asyncio
+from utils.index_manager import declare_index
 
+# Índice da busca de imagens por comando (também cobre a remoção por comando + id)
+declare_index('social', 'bot_data', 'social_images', [('command', 1), ('id', 1)])
 
 
 class RetributionView(ui.View):
@@ -36,17 +39,7 @@ class RetributionView(ui.View):
 
         await interaction.response.defer()
 
-        collection = self.bot.db_client.giveaway_database.social_images
-        
-        image_data_cursor = collection.aggregate([
-            { "$match": { "command": self.command_name } },
-            { "$sample": { "size": 1 } }
-        ])
-        
-        image_data = None
-        async for doc in image_data_cursor:
-            image_data = doc
-            break
+        image_data = await self.bot.repos.social_images.random_image(self.command_name)
 
         if not image_data:
             await interaction.followup.send(f"Não há imagens registradas para o comando {self.command_name}!", ephemeral=True)
@@ -82,7 +75,7 @@ class RetributionView(ui.View):
 # Adicione a variável owner_id aqui para ser usada na função de setup
 def setup(tree: app_commands.CommandTree, bot: commands.Bot, owner_id):
     
-    collection = bot.db_client.giveaway_database.social_images
+    collection = bot.repos.social_images
 
     # Usamos uma função anônima para verificar se o usuário é o dono
     async def is_owner_check(interaction: discord.Interaction) -> bool:
@@ -102,14 +95,7 @@ def setup(tree: app_commands.CommandTree, bot: commands.Bot, owner_id):
     )
     @app_commands.check(is_owner_check)
     async def add_social_image(interaction: discord.Interaction, comando: app_commands.Choice[str], imagem_url: str):
-        pipeline = [
-            { "$match": { "command": comando.value } },
-            { "$group": { "_id": None, "max_id": { "$max": "$id" } } }
-        ]
-        
-        results = await collection.aggregate(pipeline).to_list(1)
-        max_id = results[0].get("max_id", 0) if results else 0
-        next_id = max_id + 1
+        next_id = await collection.next_image_id(comando.value)
         
         image_data = {
             "id": next_id,
@@ -146,17 +132,7 @@ def setup(tree: app_commands.CommandTree, bot: commands.Bot, owner_id):
         @app_commands.describe(usuario="O usuário para {description_text}.")
         async def social_command(interaction: discord.Interaction, usuario: discord.Member):
             
-            collection = bot.db_client.giveaway_database.social_images
-            
-            image_data_cursor = collection.aggregate([
-                { "$match": { "command": name } },
-                { "$sample": { "size": 1 } }
-            ])
-            
-            image_data = None
-            async for doc in image_data_cursor:
-                image_data = doc
-                break
+            image_data = await collection.random_image(name)
 
             if not image_data:
                 await interaction.response.send_message(f"Não há imagens registradas para o comando /{name}! Peça a um moderador para adicionar usando /add_social_image.", ephemeral=True)
@@ -0,0 +1,28 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+from utils.command_sync import sync_configured_target, format_sync_report
+
+def is_owner_check(config):
+    """Cria uma verificação que retorna True se o usuário for o dono do bot."""
+    async def predicate(interaction: discord.Interaction):
+        owner_id = config.get('owner_id')
+        if owner_id:
+            return interaction.user.id == int(owner_id)
+        return False
+    return app_commands.check(predicate)
+
+def setup(tree: app_commands.CommandTree, bot: commands.Bot, config: dict):
+    @tree.command(name="sync-commands", description="[DONO] Sincroniza os comandos slash se a árvore de comandos mudou.")
+    @app_commands.describe(forcar="Sincroniza mesmo que nada tenha mudado.")
+    @is_owner_check(config)
+    async def sync_commands(interaction: discord.Interaction, forcar: bool = False):
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            report = await sync_configured_target(bot, force=forcar)
+        except discord.HTTPException as e:
+            await interaction.followup.send(f"❌ Erro ao sincronizar os comandos: {e}", ephemeral=True)
+            return
+
+        await interaction.followup.send(format_sync_report(report), ephemeral=True)
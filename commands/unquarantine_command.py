@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import asyncio
 
 def setup(tree: app_commands.CommandTree, bot: commands.Bot):
     @tree.command(name="liberar-quarentena", description="Remove um usuário da quarentena e restaura seus cargos.")
@@ -12,9 +11,7 @@ def setup(tree: app_commands.CommandTree, bot: commands.Bot):
 
         try:
             # Pega o ID do cargo de quarentena
-            db = bot.db_client['guild_settings']
-            settings_collection = db['quarantine_config']
-            config = await settings_collection.find_one({'guild_id': interaction.guild.id})
+            config = await bot.repos.guild_config('quarantine_configs').get(interaction.guild.id, ['quarantine_role_id'])
             
             if not config:
                 await interaction.followup.send("O sistema de quarentena não foi configurado para este servidor.")
@@ -24,10 +21,7 @@ def setup(tree: app_commands.CommandTree, bot: commands.Bot):
             quarantine_role = interaction.guild.get_role(quarantine_role_id)
             
             # Pega os cargos originais do banco de dados
-            users_collection = bot.db_client['users_data']
-            user_data = await users_collection.find_one(
-                {'user_id': usuario.id, 'guild_id': interaction.guild.id}
-            )
+            user_data = await bot.repos.quarantine_roles.get(interaction.guild.id, usuario.id)
 
             if not user_data or 'quarantine_roles' not in user_data:
                 await interaction.followup.send(f"Não há dados de quarentena registrados para **{usuario.display_name}**.")
@@ -43,16 +37,13 @@ def setup(tree: app_commands.CommandTree, bot: commands.Bot):
             if roles_to_add:
                 for role in roles_to_add:
                     try:
-                        await usuario.add_roles(role, reason="Cargos restaurados após quarentena.")
-                        await asyncio.sleep(0.5)  # Adiciona um delay de 0.5 segundos
+                        await bot.rest.run(usuario.add_roles, role, reason="Cargos restaurados após quarentena.", guild_id=interaction.guild.id)
                     except discord.Forbidden:
                         await interaction.followup.send(f"Não tenho permissão para adicionar o cargo {role.name} a {usuario.display_name}.")
                         return
 
             # Limpa o registro do banco de dados para evitar lixo
-            await users_collection.delete_one(
-                {'user_id': usuario.id, 'guild_id': interaction.guild.id}
-            )
+            await bot.repos.quarantine_roles.remove(interaction.guild.id, usuario.id)
 
             await interaction.followup.send(
                 f"✅ **{usuario.display_name}** foi liberado(a) da quarentena e seus cargos foram restaurados."
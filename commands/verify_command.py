@@ -2,9 +2,11 @@ import discord
 from discord.ext import commands
 from discord import app_commands, ui, ButtonStyle, TextStyle
 from discord.ui import Modal, TextInput
-from database.database import get_collection
-import asyncio
 import os
+from utils.index_manager import declare_index
+
+# Índices das consultas deste módulo (criados na inicialização)
+declare_index('verify', 'bot_data', 'verify_configs', [('guild_id', 1)])
 
 # Classes dos Modais (Pop-ups)
 class VerifyConfigModal(Modal, title="Configurar Sistema de Verificação"):
@@ -120,13 +122,8 @@ class VerifyConfigModal(Modal, title="Configurar Sistema de Verificação"):
             'panel_message_id': None
         }
 
-        collection = get_collection(interaction.client.db_client, 'verify_configs')
-        existing_config = await collection.find_one({'guild_id': guild_id})
-
-        if existing_config:
-            await collection.update_one({'guild_id': guild_id}, {'$set': config_data})
-        else:
-            await collection.insert_one(config_data)
+        await interaction.client.repos.guild_config('verify_configs').save(guild_id, config_data)
+        interaction.client.config_cache.invalidate('verify_configs', guild_id)
 
         await interaction.followup.send("✅ Configurações de verificação salvas com sucesso! Use o botão 'Enviar Painel' para enviar o painel ao canal.", ephemeral=True)
 
@@ -140,8 +137,7 @@ class VerifyButton(ui.Button):
 
     async def callback(self, interaction: discord.Interaction):
         await interaction.response.defer(thinking=True, ephemeral=True)
-        collection = get_collection(self.bot.db_client, 'verify_configs')
-        guild_config = await collection.find_one({'guild_id': interaction.guild.id})
+        guild_config = await self.bot.config_cache.get('verify_configs', interaction.guild.id)
 
         if not guild_config or not guild_config.get('role_id'):
             await interaction.followup.send("❌ O sistema de verificação não está configurado neste servidor ou o cargo não foi definido.", ephemeral=True)
@@ -153,8 +149,7 @@ class VerifyButton(ui.Button):
             return
 
         try:
-            await interaction.user.add_roles(role)
-            await asyncio.sleep(0.5)  # Adiciona um delay de 0.5 segundos
+            await self.bot.rest.run(interaction.user.add_roles, role, guild_id=interaction.guild.id)
             await interaction.followup.send("✅ Você foi verificado(a) com sucesso!", ephemeral=True)
         except discord.Forbidden:
             await interaction.followup.send("❌ Não tenho permissão para adicionar este cargo. Por favor, verifique minhas permissões no servidor.", ephemeral=True)
@@ -178,8 +173,7 @@ class ConfigButton(ui.Button):
         self.bot = bot
 
     async def callback(self, interaction: discord.Interaction):
-        collection = get_collection(self.bot.db_client, 'verify_configs')
-        guild_config = await collection.find_one({'guild_id': interaction.guild.id})
+        guild_config = await self.bot.repos.guild_config('verify_configs').get(interaction.guild.id)
         await interaction.response.send_modal(VerifyConfigModal(guild_config or {}))
 
 
@@ -191,8 +185,8 @@ class SendPanelButton(ui.Button):
 
     async def callback(self, interaction: discord.Interaction):
         await interaction.response.defer(thinking=True, ephemeral=True)
-        collection = get_collection(self.bot.db_client, 'verify_configs')
-        guild_config = await collection.find_one({'guild_id': interaction.guild.id})
+        repository = self.bot.repos.guild_config('verify_configs')
+        guild_config = await repository.get(interaction.guild.id)
 
         if not guild_config:
             await interaction.followup.send("❌ Nenhuma configuração de verificação encontrada. Por favor, configure o painel primeiro.", ephemeral=True)
@@ -225,7 +219,8 @@ class SendPanelButton(ui.Button):
 
         try:
             new_message = await channel.send(embed=embed, view=verify_view)
-            await collection.update_one({'guild_id': interaction.guild.id}, {'$set': {'panel_message_id': new_message.id}})
+            await repository.save(interaction.guild.id, {'panel_message_id': new_message.id})
+            self.bot.config_cache.invalidate('verify_configs', interaction.guild.id)
             await interaction.followup.send(f"✅ Painel de verificação enviado para {channel.mention}!", ephemeral=True)
         except discord.Forbidden:
             await interaction.followup.send("❌ Não tenho permissão para enviar mensagens neste canal.", ephemeral=True)
@@ -239,8 +234,8 @@ class RemoveButton(ui.Button):
 
     async def callback(self, interaction: discord.Interaction):
         await interaction.response.defer(thinking=True, ephemeral=True)
-        collection = get_collection(self.bot.db_client, 'verify_configs')
-        existing_config = await collection.find_one({'guild_id': interaction.guild.id})
+        repository = self.bot.repos.guild_config('verify_configs')
+        existing_config = await repository.get(interaction.guild.id, ['channel_id', 'panel_message_id'])
 
         if existing_config:
             try:
@@ -251,7 +246,8 @@ class RemoveButton(ui.Button):
             except (discord.NotFound, discord.Forbidden, AttributeError):
                 pass
             
-            await collection.delete_one({'guild_id': interaction.guild.id})
+            await repository.remove(interaction.guild.id)
+            self.bot.config_cache.invalidate('verify_configs', interaction.guild.id)
             await interaction.followup.send("✅ Sistema de verificação removido com sucesso.", ephemeral=True)
         else:
             await interaction.followup.send("❌ Não há sistema de verificação para remover.", ephemeral=True)
@@ -0,0 +1,120 @@
+"""
+Migração única para o layout consolidado: copia os documentos dos bancos antigos
+(mydatabase, giveaway_database, your_database_name, seu_banco, guild_settings e as coleções
+tickets_{guild_id}) para as coleções dos repositórios em `bot_data`, em lotes.
+
+Uso:
+    python -m database.migrate [--batch-size 500] [--dry-run] [--drop-legacy]
+
+Pode ser executada mais de uma vez: documentos que já existem no destino não são sobrescritos.
+Ao terminar, grava um marcador em `bot_data.migrations`; enquanto ele não existir e os bancos
+antigos tiverem documentos, o bot se recusa a iniciar (veja `unmigrated_sources`), para que
+nenhum documento novo seja criado antes da cópia e faça a migração ignorar os dados antigos.
+"""
+import argparse
+import asyncio
+import datetime
+import fnmatch
+import logging
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+from database.database import setup_database
+from database.repositories import Repositories, CONSOLIDATED_DATABASE
+
+logger = logging.getLogger('migrate')
+
+MIGRATION_MARKER = "consolidated_layout"
+
+
+async def _legacy_collections(db_client, database_name: str, pattern: str) -> list:
+    """Coleções de origem que existem no banco antigo (resolvendo curingas como "tickets_*")."""
+    names = await db_client.get_database(database_name).list_collection_names()
+    return [name for name in names if fnmatch.fnmatchcase(name, pattern)]
+
+def _migrations(db_client):
+    return db_client.get_database(CONSOLIDATED_DATABASE).get_collection("migrations")
+
+async def _legacy_sources(db_client, repos: Repositories):
+    """(repositório, banco, coleção de origem) de todas as coleções antigas que existem."""
+    sources = []
+    for repository in repos.all():
+        for database_name, pattern in repository.legacy_sources:
+            for source_name in await _legacy_collections(db_client, database_name, pattern):
+                if (database_name, source_name) == (repository.collection.database.name, repository.collection_name):
+                    continue
+                sources.append((repository, database_name, source_name))
+    return sources
+
+async def unmigrated_sources(db_client) -> list:
+    """
+    Coleções antigas com documentos quando a migração ainda não foi concluída ("banco.coleção").
+    Vazia depois da migração (ou quando não há dados antigos).
+    """
+    if await _migrations(db_client).find_one({"_id": MIGRATION_MARKER}):
+        return []
+    pending = []
+    for _, database_name, source_name in await _legacy_sources(db_client, Repositories(db_client)):
+        if await db_client.get_database(database_name).get_collection(source_name).estimated_document_count():
+            pending.append(f"{database_name}.{source_name}")
+    return pending
+
+async def migrate_collection(repository, source, source_name: str, batch_size: int, dry_run: bool) -> int:
+    """Copia uma coleção antiga para o repositório em lotes de `bulk_write`. Retorna quantos documentos leu."""
+    if dry_run:
+        return await source.count_documents({})
+
+    migrated = 0
+    operations = []
+    async for document in source.find({}).batch_size(batch_size):
+        document = repository.transform_legacy(document, source_name)
+        key = {field: document[field] for field in repository.migration_key}
+        # $setOnInsert preserva o que já foi gravado no destino pela versão nova do bot
+        operations.append(UpdateOne(key, {'$setOnInsert': document}, upsert=True))
+        if len(operations) >= batch_size:
+            await repository.bulk_write(operations, ordered=False)
+            migrated += len(operations)
+            operations = []
+    if operations:
+        await repository.bulk_write(operations, ordered=False)
+        migrated += len(operations)
+    return migrated
+
+async def migrate(db_client, batch_size: int = 500, dry_run: bool = False, drop_legacy: bool = False) -> dict:
+    """
+    Migra todos os repositórios que têm origem no layout antigo.
+    Returns:
+        {"banco.coleção -> coleção_nova": documentos}
+    """
+    report = {}
+    for repository, database_name, source_name in await _legacy_sources(db_client, Repositories(db_client)):
+        source = db_client.get_database(database_name).get_collection(source_name)
+        count = await migrate_collection(repository, source, source_name, batch_size, dry_run)
+        label = f"{database_name}.{source_name} -> {repository.collection_name}"
+        report[label] = count
+        logger.info(f"{label}: {count} documentos{' (simulação)' if dry_run else ''}.")
+        if drop_legacy and not dry_run:
+            await source.drop()
+            logger.info(f"{database_name}.{source_name} removida.")
+    if not dry_run:
+        await _migrations(db_client).update_one(
+            {"_id": MIGRATION_MARKER}, {"$set": {"completed_at": datetime.datetime.utcnow()}}, upsert=True
+        )
+    return report
+
+async def main():
+    parser = argparse.ArgumentParser(description="Migra os dados dos bancos antigos para o layout consolidado em bot_data.")
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--dry-run', action='store_true', help="Apenas conta os documentos de cada origem.")
+    parser.add_argument('--drop-legacy', action='store_true', help="Remove as coleções antigas depois de copiá-las.")
+    args = parser.parse_args()
+
+    load_dotenv()
+    db_client = await setup_database()
+    if not db_client:
+        raise SystemExit("Não foi possível conectar ao banco de dados.")
+    report = await migrate(db_client, args.batch_size, args.dry_run, args.drop_legacy)
+    logger.info(f"Migração concluída: {sum(report.values())} documentos em {len(report)} coleções.")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s: %(message)s')
+    asyncio.run(main())
@@ -0,0 +1,234 @@
+from database.database import get_collection
+
+# Todas as coleções ficam no banco `bot_data`; os bancos antigos só são lidos pela migração (database/migrate.py)
+CONSOLIDATED_DATABASE = "bot_data"
+
+
+def projection(fields) -> dict:
+    """Converte uma lista de campos na projeção do MongoDB (None busca o documento inteiro)."""
+    if not fields:
+        return None
+    return {field: 1 for field in fields}
+
+
+class Repository:
+    """
+    Acesso a uma coleção do banco consolidado.
+
+    Expõe as mesmas operações de uma coleção do Motor, aceitando `fields` nas buscas para
+    trazer só os campos necessários, além dos métodos específicos de cada repositório.
+    """
+    collection_name = None
+    legacy_sources = ()  # (banco, coleção) de onde a migração copia os documentos; aceita curingas
+    migration_key = ('_id',)  # Campos que identificam um documento já migrado
+
+    def __init__(self, db_client, collection_name: str = None, legacy_sources: tuple = None):
+        if collection_name:
+            self.collection_name = collection_name
+        if legacy_sources is not None:
+            self.legacy_sources = legacy_sources
+        self.collection = get_collection(db_client, self.collection_name)
+
+    def transform_legacy(self, document: dict, source_collection: str) -> dict:
+        """Ajusta um documento do layout antigo para o consolidado (por padrão, sem mudanças)."""
+        return document
+
+    async def find_one(self, query: dict = None, fields: list = None, **kwargs):
+        return await self.collection.find_one(query or {}, projection(fields), **kwargs)
+
+    def find(self, query: dict = None, fields: list = None, **kwargs):
+        return self.collection.find(query or {}, projection(fields), **kwargs)
+
+    def aggregate(self, pipeline: list, **kwargs):
+        return self.collection.aggregate(pipeline, **kwargs)
+
+    async def insert_one(self, document: dict, **kwargs):
+        return await self.collection.insert_one(document, **kwargs)
+
+    async def insert_many(self, documents: list, **kwargs):
+        return await self.collection.insert_many(documents, **kwargs)
+
+    async def update_one(self, query: dict, update: dict, **kwargs):
+        return await self.collection.update_one(query, update, **kwargs)
+
+    async def update_many(self, query: dict, update: dict, **kwargs):
+        return await self.collection.update_many(query, update, **kwargs)
+
+    async def delete_one(self, query: dict, **kwargs):
+        return await self.collection.delete_one(query, **kwargs)
+
+    async def delete_many(self, query: dict, **kwargs):
+        return await self.collection.delete_many(query, **kwargs)
+
+    async def bulk_write(self, operations: list, **kwargs):
+        return await self.collection.bulk_write(operations, **kwargs)
+
+    async def count_documents(self, query: dict = None, **kwargs) -> int:
+        return await self.collection.count_documents(query or {}, **kwargs)
+
+
+class GuildConfigRepository(Repository):
+    """Configuração de um módulo por servidor, um documento por `guild_id`."""
+    migration_key = ('guild_id',)
+
+    async def get(self, guild_id: int, fields: list = None):
+        return await self.find_one({'guild_id': guild_id}, fields)
+
+    async def save(self, guild_id: int, values: dict):
+        return await self.update_one({'guild_id': guild_id}, {'$set': values}, upsert=True)
+
+    async def remove(self, guild_id: int):
+        return await self.delete_one({'guild_id': guild_id})
+
+
+class AntiraidConfigRepository(Repository):
+    """Configuração do antiraid, com o ID do servidor como `_id`."""
+    collection_name = "antiraid_configs"
+    legacy_sources = (("mydatabase", "antiraid_configs"),)
+
+    async def get(self, guild_id: int):
+        return await self.find_one({'_id': guild_id})
+
+    async def save(self, guild_id: int, values: dict):
+        return await self.update_one({'_id': guild_id}, {'$set': values}, upsert=True)
+
+
+class QuarantineRepository(Repository):
+    """Membros em quarentena automática, removidos quando a quarentena expira."""
+    collection_name = "quarantined_users"
+    legacy_sources = (("giveaway_database", "quarantined_users"),)
+
+    async def add(self, guild_id: int, user_id: int, quarantined_at):
+        return await self.insert_one({"user_id": user_id, "quarantined_at": quarantined_at, "guild_id": guild_id})
+
+    def expired(self, before, extra_query: dict = None):
+        """Registros em quarentena desde antes de `before`, só com os campos usados na varredura."""
+        query = {"quarantined_at": {"$lte": before}, **(extra_query or {})}
+        return self.find(query, ['_id', 'guild_id', 'user_id'])
+
+    async def remove(self, guild_id: int, user_id: int):
+        return await self.delete_one({"user_id": user_id, "guild_id": guild_id})
+
+
+class QuarantineRolesRepository(Repository):
+    """Cargos originais de quem foi colocado em quarentena manualmente com /quarentena."""
+    collection_name = "quarantine_roles"
+    migration_key = ('guild_id', 'user_id')
+
+    async def get(self, guild_id: int, user_id: int):
+        return await self.find_one({'user_id': user_id, 'guild_id': guild_id}, ['quarantine_roles'])
+
+    async def save(self, guild_id: int, user_id: int, role_ids: list):
+        return await self.update_one({'user_id': user_id, 'guild_id': guild_id}, {'$set': {'quarantine_roles': role_ids}}, upsert=True)
+
+    async def remove(self, guild_id: int, user_id: int):
+        return await self.delete_one({'user_id': user_id, 'guild_id': guild_id})
+
+
+class EconomyRepository(Repository):
+    """XP, nível e moedas de cada `{user}_{guild}`."""
+    collection_name = "economy_users"
+    legacy_sources = (("your_database_name", "users"),)
+
+    async def leaderboard(self, guild_id: str, field: str, limit: int = 10) -> list:
+        """Os `limit` primeiros do servidor ordenados por `field`, trazendo só os campos do ranking."""
+        cursor = self.find({'guild_id': guild_id}, ['user_id', 'level', field]).sort(field, -1).limit(limit)
+        return await cursor.to_list(limit)
+
+
+class HelpCommandRepository(Repository):
+    collection_name = "help_commands"
+    legacy_sources = (("giveaway_database", "help_commands"),)
+
+
+class SocialImageRepository(Repository):
+    collection_name = "social_images"
+    legacy_sources = (("giveaway_database", "social_images"),)
+
+    async def random_image(self, command: str):
+        """Sorteia uma imagem registrada para o comando social."""
+        cursor = self.aggregate([{"$match": {"command": command}}, {"$sample": {"size": 1}}])
+        results = await cursor.to_list(1)
+        return results[0] if results else None
+
+    async def next_image_id(self, command: str) -> int:
+        """Próximo ID sequencial de imagem do comando (usa o índice command + id)."""
+        last = await self.find_one({"command": command}, ['id'], sort=[('id', -1)])
+        return (last.get('id', 0) if last else 0) + 1
+
+
+class PanelSettingsRepository(Repository):
+    """Cargos de moderador/administrador dos painéis, guardados no documento `roles`."""
+    collection_name = "panel_settings"
+    legacy_sources = (("seu_banco", "settings_collection"),)
+
+    async def get_role_id(self, key: str):
+        settings = await self.find_one({"_id": "roles"}, [key])
+        return settings.get(key) if settings else None
+
+    async def set_role_id(self, key: str, role_id: int):
+        return await self.update_one({"_id": "roles"}, {"$set": {key: role_id}}, upsert=True)
+
+
+class TicketRepository(Repository):
+    """Tickets de todos os servidores em uma só coleção (antes havia uma `tickets_{guild_id}` por servidor)."""
+    collection_name = "tickets"
+    legacy_sources = ((CONSOLIDATED_DATABASE, "tickets_*"),)
+
+    def transform_legacy(self, document: dict, source_collection: str) -> dict:
+        document.setdefault("guild_id", int(source_collection.split("_", 1)[1]))
+        return document
+
+    async def get_by_channel(self, guild_id: int, channel_id: int, fields: list = None):
+        return await self.find_one({"guild_id": guild_id, "channel_id": channel_id}, fields)
+
+    async def mark_closed(self, guild_id: int, channel_id: int, closed_at):
+        return await self.update_one({"guild_id": guild_id, "channel_id": channel_id}, {"$set": {"closed_at": closed_at}})
+
+
+class Repositories:
+    """Todos os repositórios do bot, disponíveis em `bot.repos`."""
+
+    # Configurações por servidor usadas pelo GuildConfigCache, com a origem no layout antigo
+    GUILD_CONFIGS = {
+        "antispam_configs": (),
+        "antilink_configs": (),
+        "welcome_goodbye_configs": (),
+        "verify_configs": (),
+        "autorole_configs": (),
+        "word_filter_configs": (),
+        "quarantine_configs": (("guild_settings", "quarantine_config"),),
+    }
+
+    def __init__(self, db_client):
+        self.db_client = db_client
+        self.guild_configs = {
+            name: GuildConfigRepository(db_client, name, legacy_sources)
+            for name, legacy_sources in self.GUILD_CONFIGS.items()
+        }
+        self.antiraid_configs = AntiraidConfigRepository(db_client)
+        self.quarantined_users = QuarantineRepository(db_client)
+        self.quarantine_roles = QuarantineRolesRepository(db_client)
+        self.economy = EconomyRepository(db_client)
+        self.profiles = Repository(db_client, "profiles", (("mydatabase", "profiles"),))
+        self.shop_items = Repository(db_client, "shop_items", (("mydatabase", "shop_items"),))
+        self.user_inventory = Repository(db_client, "user_inventory", (("mydatabase", "user_inventory"),))
+        self.help_commands = HelpCommandRepository(db_client)
+        self.social_images = SocialImageRepository(db_client)
+        self.panel_settings = PanelSettingsRepository(db_client)
+        self.tickets = TicketRepository(db_client)
+        self.ticket_panels = Repository(db_client, "ticket_panels")
+        self.command_sync_state = Repository(db_client, "command_sync_state")
+
+    def guild_config(self, collection_name: str) -> GuildConfigRepository:
+        """Repositório de configuração por servidor; cria um novo se o nome não estiver na lista."""
+        repository = self.guild_configs.get(collection_name)
+        if repository is None:
+            repository = self.guild_configs[collection_name] = GuildConfigRepository(self.db_client, collection_name)
+        return repository
+
+    def all(self) -> list:
+        """Lista de todos os repositórios (usada pela migração)."""
+        repositories = list(self.guild_configs.values())
+        repositories += [value for value in vars(self).values() if isinstance(value, Repository)]
+        return repositories
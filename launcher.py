@@ -0,0 +1,279 @@
+"""
+Launcher de clusters: inicia vários processos do bot (main.py), cada um com uma faixa contígua de shards.
+
+Uso:
+    python launcher.py [--clusters N] [--shards N] [--identify-concurrency N]
+
+O launcher coordena as identificações no gateway entre os processos, reinicia workers que caírem
+e junta o status de todos em um único endpoint HTTP (/status).
+A comunicação com os workers é feita por um socket local (127.0.0.1), então tudo roda em uma só máquina.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import os
+import signal
+import sys
+import time
+import aiohttp
+from aiohttp import web
+from dotenv import load_dotenv
+from utils.cluster import IDENTIFY_INTERVAL, shard_ranges
+from utils import log_service
+
+logger = logging.getLogger('launcher')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+GATEWAY_URL = "https://discord.com/api/v10/gateway/bot"
+
+
+class Worker:
+    """Um processo do bot e a sua faixa de shards."""
+    def __init__(self, cluster_id: int, shard_ids: list):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.process = None
+        self.restarts = 0
+        self.started_at = None
+        self.last_status = None
+        self.last_status_at = None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+
+class ClusterLauncher:
+    def __init__(self, shard_count: int, cluster_count: int, max_concurrency: int, ipc_port: int, web_port: int, health_timeout: float = 30.0):
+        self.shard_count = shard_count
+        self.max_concurrency = max(1, max_concurrency)
+        self.ipc_port = ipc_port
+        self.web_port = web_port
+        self.health_timeout = health_timeout
+        self.workers = [Worker(cluster_id, shard_ids) for cluster_id, shard_ids in enumerate(shard_ranges(shard_count, cluster_count))]
+        self.stopping = False
+        self._identify_locks = collections.defaultdict(asyncio.Lock)
+        self._next_identify = collections.defaultdict(float)
+
+    # -----------------
+    # IPC COM OS WORKERS
+    # -----------------
+    async def handle_ipc(self, reader, writer):
+        """Atende uma mensagem JSON de um worker e responde na mesma conexão."""
+        try:
+            message = json.loads(await reader.readline() or b'{}')
+            op = message.get("op")
+            if op == "identify":
+                await self._wait_identify_turn(int(message["shard_id"]))
+                reply = {"ok": True}
+            elif op == "health":
+                worker = self.workers[int(message["cluster_id"])]
+                worker.last_status = message.get("status")
+                worker.last_status_at = time.monotonic()
+                reply = {"ok": True}
+            else:
+                reply = {"ok": False, "error": f"operação desconhecida: {op}"}
+            writer.write(json.dumps(reply).encode('utf-8') + b'\n')
+            await writer.drain()
+        except (ValueError, KeyError, IndexError) as e:
+            logger.warning(f"Mensagem IPC inválida: {e}")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _wait_identify_turn(self, shard_id: int):
+        """Libera no máximo uma identificação por bucket a cada IDENTIFY_INTERVAL segundos."""
+        bucket = shard_id % self.max_concurrency
+        loop = asyncio.get_running_loop()
+        async with self._identify_locks[bucket]:
+            delay = self._next_identify[bucket] - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_identify[bucket] = loop.time() + IDENTIFY_INTERVAL
+        logger.info(f"Shard {shard_id} liberado para identificar (bucket {bucket}).")
+
+    # -----------------
+    # PROCESSOS
+    # -----------------
+    def _worker_env(self, worker: Worker) -> dict:
+        env = os.environ.copy()
+        env.update({
+            "SHARDED": "1",
+            "SHARD_COUNT": str(self.shard_count),
+            "SHARD_IDS": ",".join(str(shard_id) for shard_id in worker.shard_ids),
+            "CLUSTER_ID": str(worker.cluster_id),
+            "CLUSTER_IPC": f"127.0.0.1:{self.ipc_port}",
+            # Cada worker mantém o próprio web service em uma porta separada
+            "PORT": str(self.web_port + 1 + worker.cluster_id),
+        })
+        return env
+
+    async def supervise(self, worker: Worker):
+        """Mantém o worker rodando, reiniciando-o com espera crescente se ele cair."""
+        backoff = 1
+        while not self.stopping:
+            worker.process = await asyncio.create_subprocess_exec(
+                sys.executable, os.path.join(BASE_DIR, 'main.py'), cwd=BASE_DIR, env=self._worker_env(worker)
+            )
+            worker.started_at = time.monotonic()
+            logger.info(f"Cluster {worker.cluster_id} iniciado (PID {worker.process.pid}, shards {worker.shard_ids[0]}-{worker.shard_ids[-1]}).")
+
+            returncode = await worker.process.wait()
+            if self.stopping:
+                break
+            if returncode == 0:
+                logger.info(f"Cluster {worker.cluster_id} encerrado normalmente. Não será reiniciado.")
+                break
+
+            # Se o worker rodou bastante tempo, a queda não faz parte de um ciclo de falhas
+            backoff = 1 if time.monotonic() - worker.started_at > 60 else min(backoff * 2, 60)
+            worker.restarts += 1
+            worker.last_status = None
+            logger.warning(f"Cluster {worker.cluster_id} caiu (código {returncode}). Reiniciando em {backoff}s...")
+            await asyncio.sleep(backoff)
+
+    async def stop_workers(self, timeout: float = 30.0):
+        """Pede o encerramento de todos os workers e força os que não pararem a tempo."""
+        self.stopping = True
+        running = [worker for worker in self.workers if worker.alive]
+        for worker in running:
+            worker.process.terminate()
+        for worker in running:
+            try:
+                await asyncio.wait_for(worker.process.wait(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Cluster {worker.cluster_id} não encerrou em {timeout:.0f}s. Forçando.")
+                worker.process.kill()
+                await worker.process.wait()
+
+    # -----------------
+    # STATUS AGREGADO
+    # -----------------
+    def build_status(self) -> dict:
+        """Status de todos os clusters, com base no último relatório de cada worker."""
+        now = time.monotonic()
+        clusters = []
+        for worker in self.workers:
+            healthy = (
+                worker.alive
+                and worker.last_status_at is not None
+                and now - worker.last_status_at <= self.health_timeout
+                and (worker.last_status or {}).get("status") == "Online"
+            )
+            clusters.append({
+                "cluster_id": worker.cluster_id,
+                "pid": worker.process.pid if worker.alive else None,
+                "shard_ids": worker.shard_ids,
+                "alive": worker.alive,
+                "healthy": healthy,
+                "restarts": worker.restarts,
+                "status": worker.last_status,
+            })
+
+        healthy_count = sum(1 for cluster in clusters if cluster["healthy"])
+        if healthy_count == len(clusters):
+            overall = "Online"
+        elif healthy_count:
+            overall = "Degradado"
+        else:
+            overall = "Offline"
+        return {
+            "status": overall,
+            "shard_count": self.shard_count,
+            "guilds": sum((cluster["status"] or {}).get("guilds", 0) for cluster in clusters if cluster["healthy"]),
+            "clusters": clusters,
+        }
+
+    def create_app(self) -> web.Application:
+        async def home(request):
+            return web.Response(text='Launcher está online!')
+
+        async def get_status(request):
+            status = self.build_status()
+            return web.json_response(status, status=200 if status["status"] != "Offline" else 503)
+
+        app = web.Application()
+        app.router.add_get('/', home)
+        app.router.add_get('/status', get_status)
+        return app
+
+    async def run(self):
+        ipc_server = await asyncio.start_server(self.handle_ipc, '127.0.0.1', self.ipc_port)
+        runner = web.AppRunner(self.create_app(), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host='0.0.0.0', port=self.web_port).start()
+        logger.info(
+            f"{len(self.workers)} clusters para {self.shard_count} shards "
+            f"(identificação: {self.max_concurrency} por vez). Status em :{self.web_port}/status, IPC em 127.0.0.1:{self.ipc_port}."
+        )
+
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+            except (NotImplementedError, AttributeError):
+                pass  # Windows: o Ctrl+C chega como KeyboardInterrupt
+
+        supervisors = [asyncio.create_task(self.supervise(worker)) for worker in self.workers]
+        try:
+            await stop_event.wait()
+        finally:
+            logger.info("Encerrando os clusters...")
+            await self.stop_workers()
+            for task in supervisors:
+                task.cancel()
+            ipc_server.close()
+            await ipc_server.wait_closed()
+            await runner.cleanup()
+
+
+async def fetch_gateway_info(token: str) -> dict:
+    """Consulta o número recomendado de shards e o max_concurrency da aplicação."""
+    headers = {"Authorization": f"Bot {token}"}
+    async with aiohttp.ClientSession() as session:
+        async with session.get(GATEWAY_URL, headers=headers) as response:
+            response.raise_for_status()
+            return await response.json()
+
+async def main():
+    load_dotenv()
+    with open(os.path.join(BASE_DIR, 'config.json'), 'r') as f:
+        config = json.load(f)
+    # Mesmo formato de log dos workers, para juntar tudo num só coletor
+    log_service.setup_logging(
+        json_output=os.getenv('LOG_FORMAT', config.get('log_format', 'json')).lower() == 'json',
+        static_fields={"cluster": "launcher"}
+    )
+
+    parser = argparse.ArgumentParser(description="Inicia o bot em vários processos, cada um com uma faixa de shards.")
+    parser.add_argument('--clusters', type=int, default=os.getenv('CLUSTER_COUNT') or config.get('cluster_count') or os.cpu_count() or 1)
+    parser.add_argument('--shards', type=int, default=os.getenv('SHARD_COUNT') or config.get('shard_count'))
+    parser.add_argument('--identify-concurrency', type=int, default=config.get('identify_concurrency'))
+    args = parser.parse_args()
+
+    shard_count = args.shards
+    max_concurrency = args.identify_concurrency
+    if not shard_count or not max_concurrency:
+        # Sem configuração explícita, usa os valores recomendados pelo Discord
+        gateway = await fetch_gateway_info(os.getenv('DISCORD_BOT_TOKEN'))
+        shard_count = shard_count or gateway["shards"]
+        max_concurrency = max_concurrency or gateway["session_start_limit"]["max_concurrency"]
+
+    launcher = ClusterLauncher(
+        shard_count=int(shard_count),
+        cluster_count=int(args.clusters),
+        max_concurrency=int(max_concurrency),
+        ipc_port=int(config.get('cluster_ipc_port', 5100)),
+        web_port=int(os.getenv('PORT', config.get('web_service_port', 5000))),
+    )
+    await launcher.run()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("Launcher encerrado manualmente.")
@@ -5,25 +5,34 @@ from discord.ext import commands
 from discord import app_commands
 from dotenv import load_dotenv
 from database.database import setup_database
+from database.repositories import Repositories
+from database.migrate import unmigrated_sources
 import asyncio
+import inspect
 import logging
-
-# Configura o logger
-handler = logging.StreamHandler()
-handler.setFormatter(logging.Formatter('%(asctime)s:%(levelname)s:%(name)s: %(message)s'))
-handler.setLevel(logging.INFO)
-
-logging.getLogger('discord').addHandler(handler)
-logging.getLogger('discord').setLevel(logging.INFO)
+import signal
+import time
 
 logger = logging.getLogger('bot')
-logger.setLevel(logging.INFO)
-logger.addHandler(handler)
 
 # Importação dos módulos que contêm os comandos
 from commands.antiraid_command import setup as setup_antiraid_command
 from modules.personalization import Personalization
-from utils.web_service import run_web_service
+from utils.web_service import start_web_service
+from utils.shutdown import ShutdownCoordinator
+from utils.guild_config_cache import GuildConfigCache
+from utils.message_pipeline import MessagePipeline
+from utils.join_pipeline import JoinPipeline
+from utils.rest_executor import RestExecutor
+from utils.instrumentation import Instrumentation
+from utils.loop_monitor import LoopLagMonitor
+from utils.query_profiler import QueryProfiler
+from utils.command_sync import sync_configured_target
+from utils.sharding import shard_settings
+from utils.cluster import ClusterClient
+from utils.index_manager import reconcile_indexes
+from utils.web_service import register_metrics_provider
+from utils import log_service
 from commands.status_command import setup as setup_status_command
 from utils.embed_creator import setup as setup_embed_creator
 from modules.mod_panel import setup as setup_mod_panel
@@ -39,6 +48,7 @@ from commands.slowmode_command import setup as setup_slowmode_command
 from commands.userinfo_command import setup as setup_userinfo_command
 from commands.autorole_command import setup as setup_autorole_command
 from modules.antispam_antilink import setup as setup_antispam_antilink_module
+from modules.word_filter import setup as setup_word_filter_module
 from commands.verify_command import setup as setup_verify_command
 from commands.social_commands import setup as setup_social_commands
 
@@ -59,7 +69,11 @@ from commands.crime_file_command import setup as setup_crime_file_command
 from commands.anti_clone_command import setup as setup_anti_clone_command
 from commands.list_commands import setup as setup_list_commands
 from commands.purge_commands import setup as setup_purge_commands
+from commands.sync_commands_command import setup as setup_sync_commands_command
 from commands.giveaway_command import setup as setup_giveaway_command
+from commands.handler_stats_command import setup as setup_handler_stats_command
+from commands.query_stats_command import setup as setup_query_stats_command
+from commands.raid_drill_command import setup as setup_raid_drill_command
 from modules.help_command import HelpCommand
 from modules.backup_restore import BackupRestore
 
@@ -72,123 +86,174 @@ load_dotenv()
 with open('config.json', 'r') as f:
     config = json.load(f)
 
+# Configura os logs: escritos por uma thread a partir de uma fila, em JSON e com limite por ponto de chamada
+log_service.setup_logging(
+    level=getattr(logging, os.getenv('LOG_LEVEL', config.get('log_level', 'INFO')).upper(), logging.INFO),
+    json_output=os.getenv('LOG_FORMAT', config.get('log_format', 'json')).lower() == 'json',
+    rate=float(config.get('log_rate_limit_per_second', 5)),
+    burst=int(config.get('log_burst', 20)),
+    static_fields={"cluster": os.getenv('CLUSTER_ID')}
+)
+
 # Define as intents do bot
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 
-# Cria a instância do bot
-bot = commands.Bot(command_prefix='!', intents=intents)
+class SwityisBotMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.started = False
+
+    async def setup_hook(self):
+        """Executado uma única vez, após o login e antes de conectar ao gateway (não roda de novo em reconexões)."""
+        if self.started:
+            return
+        self.started = True
+        await startup()
+
+    async def before_identify_hook(self, shard_id, *, initial=False):
+        """Quando iniciado pelo launcher, a vez de identificar cada shard é coordenada entre os processos."""
+        if self.cluster:
+            await self.cluster.before_identify(shard_id, initial)
+        else:
+            await super().before_identify_hook(shard_id, initial=initial)
+
+    async def close(self, reason: str = "close"):
+        """Encerramento gracioso: drena as chamadas pendentes e grava os buffers antes de desconectar."""
+        await self.shutdown.shutdown(super().close, reason)
+
+class SwityisCommandTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Recusa comandos novos depois que o desligamento começou e marca o início da execução dos aceitos."""
+        if interaction.client.shutdown.admit():
+            # A latência medida é só a do bot, sem o atraso de entrega do gateway nem a diferença de relógio
+            interaction.extras['started_at'] = time.perf_counter()
+            return True
+        await interaction.response.send_message("⏳ O bot está reiniciando. Tente novamente em instantes.", ephemeral=True)
+        return False
+
+class SwityisBot(SwityisBotMixin, commands.Bot):
+    pass
+
+class ShardedSwityisBot(SwityisBotMixin, commands.AutoShardedBot):
+    pass
+
+# Cria a instância do bot (com shards automáticos quando 'sharded' está ativo no config.json)
+shard_options = shard_settings(config)
+if shard_options is None:
+    bot = SwityisBot(command_prefix='!', intents=intents, activity=discord.Game(name="Online e operando!"), tree_cls=SwityisCommandTree)
+else:
+    bot = ShardedSwityisBot(command_prefix='!', intents=intents, activity=discord.Game(name="Online e operando!"), tree_cls=SwityisCommandTree, **shard_options)
+    logger.info(f"Modo com shards ativado: {shard_options or 'quantidade automática'}.")
 bot.db_client = None
 bot.logger = logger
+bot.cluster = ClusterClient.from_env(bot)  # Só existe quando o processo foi iniciado pelo launcher.py
 bot.config = config
+bot.config_cache = GuildConfigCache(bot)
+bot.message_pipeline = MessagePipeline(bot)
+bot.join_pipeline = JoinPipeline(bot)
+bot.rest = RestExecutor(bot)
+bot.instrumentation = Instrumentation(bot, sample_rate=float(config.get('instrumentation_sample_rate', 1.0)))
+register_metrics_provider(bot.instrumentation.metrics)
+bot.loop_monitor = LoopLagMonitor(bot, slow_threshold=float(config.get('loop_slow_callback_threshold', 0.25)))
+register_metrics_provider(bot.loop_monitor.metrics)
+bot.query_profiler = QueryProfiler(
+    bot,
+    enabled=os.getenv('QUERY_PROFILER', str(config.get('query_profiler', False))).lower() in ('1', 'true', 'sim'),
+    slow_threshold=float(config.get('slow_query_threshold_ms', 100)) / 1000
+)
+register_metrics_provider(bot.query_profiler.metrics)
+register_metrics_provider(log_service.metrics)
+bot.shutdown = ShutdownCoordinator(
+    bot,
+    drain_timeout=float(config.get('shutdown_drain_timeout', 10)),
+    flush_timeout=float(config.get('shutdown_flush_timeout', 10))
+)
 
 # -----------------
 # FUNÇÕES DE CARREGAMENTO E SINCRONIZAÇÃO
 # -----------------
+async def load_module(name: str, setup_call):
+    """Carrega um módulo, aguardando o setup se ele for assíncrono, e registra quanto tempo levou."""
+    start = time.perf_counter()
+    result = setup_call()
+    if inspect.isawaitable(result):
+        await result
+    bot.logger.info(f"Módulo {name} carregado em {(time.perf_counter() - start) * 1000:.1f} ms.")
+
 async def load_modules():
     """Função para carregar todos os módulos de comandos."""
     bot.logger.info("Carregando módulos...")
-    loaded_modules = 0
+    owner_id = config.get('owner_id')
 
-    try:
+    # Os setups são independentes entre si e rodam em paralelo
+    modules_to_load = [
         # Módulos com cogs
-        await bot.add_cog(Personalization(bot, bot.db_client))
-        loaded_modules += 1
-        await bot.add_cog(AntiNuke(bot))
-        loaded_modules += 1
-        await bot.add_cog(AutoQuarantine(bot))
-        loaded_modules += 1
-        await bot.add_cog(AuditLogs(bot)) # Linha para o novo módulo de logs
-        loaded_modules += 1
-        
-        # Módulos que usam a função setup
-        await setup_antiraid_command(bot.tree, bot, bot.db_client)
-        loaded_modules += 1
-        await setup_ticket_module(bot)
-        loaded_modules += 1
-        await setup_welcome_goodbye_module(bot)
-        loaded_modules += 1
-        await setup_economy(bot, bot.db_client)
-        loaded_modules += 1
-        await setup_avatar_module(bot)
-        loaded_modules += 1
-        await setup_clear_command(bot.tree, bot)
-        loaded_modules += 1
-        await setup_autorole_command(bot)
-        loaded_modules += 1
-        await setup_antispam_antilink_module(bot)
-        loaded_modules += 1
-        await setup_verify_command(bot)
-        loaded_modules += 1
-        await bot.add_cog(HelpCommand(bot))
-        loaded_modules += 1
-        await bot.add_cog(BackupRestore(bot))
-        loaded_modules += 1
-
+        ("Personalization", lambda: bot.add_cog(Personalization(bot, bot.db_client))),
+        ("AntiNuke", lambda: bot.add_cog(AntiNuke(bot))),
+        ("AutoQuarantine", lambda: bot.add_cog(AutoQuarantine(bot))),
+        ("AuditLogs", lambda: bot.add_cog(AuditLogs(bot))), # Linha para o novo módulo de logs
+        ("HelpCommand", lambda: bot.add_cog(HelpCommand(bot))),
+        ("BackupRestore", lambda: bot.add_cog(BackupRestore(bot))),
 
+        # Módulos que usam a função setup
+        ("antiraid", lambda: setup_antiraid_command(bot.tree, bot, bot.db_client)),
+        ("ticket", lambda: setup_ticket_module(bot)),
+        ("welcome_goodbye", lambda: setup_welcome_goodbye_module(bot)),
+        ("economy", lambda: setup_economy(bot, bot.db_client)),
+        ("avatar", lambda: setup_avatar_module(bot)),
+        ("clear", lambda: setup_clear_command(bot.tree, bot)),
+        ("autorole", lambda: setup_autorole_command(bot)),
+        ("antispam_antilink", lambda: setup_antispam_antilink_module(bot)),
+        ("word_filter", lambda: setup_word_filter_module(bot)),
+        ("verify", lambda: setup_verify_command(bot)),
 
+        # Módulos não assíncronos
+        ("status", lambda: setup_status_command(bot.tree, bot, bot.db_client)),
+        ("embed_creator", lambda: setup_embed_creator(bot.tree)),
+        ("mod_panel", lambda: setup_mod_panel(bot.tree, config, bot.repos)),
+        ("admin_panel", lambda: setup_admin_panel(bot.tree, config, bot.repos)),
+        ("embed_panel", lambda: setup_embed_panel(bot.tree, bot)),
+        ("slowmode", lambda: setup_slowmode_command(bot.tree, bot)),
+        ("userinfo", lambda: setup_userinfo_command(bot.tree, bot)),
 
+        # NOVOS COMANDOS CRIADOS JUNTOS
+        ("secret_room", lambda: setup_secret_room_command(bot.tree, bot)),
+        ("quarantine", lambda: setup_quarantine_command(bot.tree, bot)),
+        ("quarantine_config", lambda: setup_quarantine_config_command(bot.tree, bot)),
+        ("unquarantine", lambda: setup_unquarantine_command(bot.tree, bot)),
+        ("selective_clear", lambda: setup_selective_clear_command(bot.tree, bot)),
+        ("suspicious_member", lambda: setup_suspicious_member_command(bot.tree, bot)),
+        ("judgment", lambda: setup_judgment_command(bot.tree, bot)),
+        ("crime_file", lambda: setup_crime_file_command(bot.tree, bot)),
+        ("anti_clone", lambda: setup_anti_clone_command(bot.tree, bot)),
+        ("list_commands", lambda: setup_list_commands(bot.tree, bot, config)),
+        ("purge_commands", lambda: setup_purge_commands(bot.tree, bot, config)),
+        ("sync_commands", lambda: setup_sync_commands_command(bot.tree, bot, config)),
+        ("giveaway", lambda: setup_giveaway_command(bot.tree, bot)),
+        ("handler_stats", lambda: setup_handler_stats_command(bot.tree, bot, config)),
+        ("query_stats", lambda: setup_query_stats_command(bot.tree, bot, config)),
+        ("raid_drill", lambda: setup_raid_drill_command(bot.tree, bot, config)),
+        ("social", lambda: setup_social_commands(bot.tree, bot, owner_id)),
+    ]
 
+    if not owner_id:
+        bot.logger.warning("ERRO: O ID do dono do bot não está configurado em config.json. O comando '/disable' não funcionará.")
+    else:
+        modules_to_load.append(("disable", lambda: setup_disable_command(bot, int(owner_id))))
 
+    results = await asyncio.gather(*(load_module(name, setup_call) for name, setup_call in modules_to_load), return_exceptions=True)
+    errors = [(name, result) for (name, _), result in zip(modules_to_load, results) if isinstance(result, Exception)]
+    for name, error in errors:
+        bot.logger.error(f"Erro ao carregar o módulo {name}: {error}")
+    if errors:
+        raise errors[0][1]
 
-        
-        # Módulos não assíncronos
-        setup_status_command(bot.tree, bot, bot.db_client)
-        loaded_modules += 1
-        setup_embed_creator(bot.tree)
-        loaded_modules += 1
-        setup_mod_panel(bot.tree, config, bot.db_client)
-        loaded_modules += 1
-        setup_admin_panel(bot.tree, config, bot.db_client)
-        loaded_modules += 1
-        setup_embed_panel(bot.tree, bot)
-        loaded_modules += 1
-        setup_slowmode_command(bot.tree, bot)
-        loaded_modules += 1
-        setup_userinfo_command(bot.tree, bot)
-        loaded_modules += 1
-        
-        # NOVOS COMANDOS CRIADOS JUNTOS
-        setup_secret_room_command(bot.tree, bot)
-        loaded_modules += 1
-        setup_quarantine_command(bot.tree, bot)
-        loaded_modules += 1
-        setup_quarantine_config_command(bot.tree, bot)
-        loaded_modules += 1
-        setup_unquarantine_command(bot.tree, bot)
-        loaded_modules += 1
-        setup_selective_clear_command(bot.tree, bot)
-        loaded_modules += 1
-        setup_suspicious_member_command(bot.tree, bot)
-        loaded_modules += 1
-        setup_judgment_command(bot.tree, bot)
-        loaded_modules += 1
-        setup_crime_file_command(bot.tree, bot)
-        loaded_modules += 1
-        setup_anti_clone_command(bot.tree, bot)
-        loaded_modules += 1
-        setup_list_commands(bot.tree, bot, config)
-        loaded_modules += 1
-        setup_purge_commands(bot.tree, bot, config)
-        loaded_modules += 1
-        setup_giveaway_command(bot.tree, bot)
-        loaded_modules += 1
-        
-        owner_id = config.get('owner_id')
-        setup_social_commands(bot.tree, bot, owner_id)
-        loaded_modules += 1
-        
-        if not owner_id:
-            bot.logger.warning("ERRO: O ID do dono do bot não está configurado em config.json. O comando '/disable' não funcionará.")
-        else:
-            await setup_disable_command(bot, int(owner_id))
-            loaded_modules += 1
+    # Mede chamadas, erros e latência de todos os listeners registrados pelos Cogs
+    bot.instrumentation.instrument_listeners()
 
-        bot.logger.info(f"Carregamento concluído. {loaded_modules} módulos carregados com sucesso.")
-    except Exception as e:
-        bot.logger.error(f"Erro ao carregar os módulos: {e}")
-        raise
+    bot.logger.info(f"Carregamento concluído. {len(modules_to_load)} módulos carregados com sucesso.")
 
 async def sync_commands():
     """Sincroniza os comandos slash e exibe o status no console."""
@@ -196,49 +261,99 @@ async def sync_commands():
     
     if not guild_id:
         bot.logger.warning("Aviso: Variável 'guild_id' não encontrada no config.json. Sincronizando comandos globalmente...")
-        synced = await bot.tree.sync()
     else:
         bot.logger.info(f"Iniciando a sincronização de comandos para o servidor {guild_id}...")
-        guild = discord.Object(id=int(guild_id))
-        bot.tree.copy_global_to(guild=guild)
-        synced = await bot.tree.sync(guild=guild)
-    
-    commands_synced = len(synced)
-    bot.logger.info(f"\nSincronização concluída. {commands_synced} comandos sincronizados.")
+
+    # Só chama a API quando a árvore de comandos mudou; FORCE_COMMAND_SYNC=1 força a sincronização
+    report = await sync_configured_target(bot, force=os.getenv('FORCE_COMMAND_SYNC') == '1')
+    commands_synced = report["count"]
+    bot.logger.info(f"\nSincronização concluída. {commands_synced} comandos registrados.")
     
     if commands_synced < 20:
         bot.logger.warning("Aviso: O número de comandos sincronizados é menor que o esperado (20). Verifique se todos os módulos estão sendo carregados corretamente.")
 
-# -----------------
-# EVENTOS DO BOT
-# -----------------
-@bot.event
-async def on_ready():
-    """Evento disparado quando o bot se conecta ao Discord."""
-    bot.logger.info(f'Logado como {bot.user} (ID: {bot.user.id})')
+async def startup():
+    """Inicialização do bot: banco de dados, módulos, comandos e web service."""
+    start = time.perf_counter()
+    bot.loop_monitor.start()
     
     bot.logger.info("Conectando ao banco de dados...")
     bot.db_client = await setup_database()
     
     if not bot.db_client:
         bot.logger.error("Não foi possível conectar ao banco de dados. Encerrando o bot.")
-        await bot.close()
-        return
+        raise RuntimeError("Não foi possível conectar ao banco de dados.")
+
+    # Os módulos leem só de `bot_data`: rodar antes da migração criaria documentos novos
+    # que fariam a migração ignorar os dados antigos (XP, moedas, configurações)
+    legacy = await unmigrated_sources(bot.db_client)
+    if legacy:
+        bot.logger.error(f"Há dados no layout antigo que ainda não foram migrados: {', '.join(legacy)}. Execute `python -m database.migrate` antes de iniciar o bot.")
+        raise RuntimeError("Migração do banco de dados pendente.")
+    bot.db_client = bot.query_profiler.wrap_client(bot.db_client)
+    bot.repos = Repositories(bot.db_client)
     
     try:
         await load_modules()
-        await sync_commands()
-        run_web_service(bot) 
-        await bot.change_presence(activity=discord.Game(name="Online e operando!"))
-        bot.logger.info("Web service iniciado.")
-        bot.logger.info("Bot está pronto para operar.")
+        # A sincronização, os índices do banco e o web service não dependem um do outro
+        await asyncio.gather(sync_commands(), reconcile_indexes(bot), start_web_service(bot))
+        if bot.cluster:
+            bot.cluster.start()
+        bot.logger.info(f"Inicialização concluída em {time.perf_counter() - start:.2f}s.")
     except Exception as e:
         bot.logger.error(f"Ocorreu um erro fatal durante a inicialização do bot: {e}")
-        await bot.close()
+        raise
+
+# -----------------
+# EVENTOS DO BOT
+# -----------------
+@bot.event
+async def on_ready():
+    """Evento disparado quando o bot se conecta ao Discord (e de novo após reconexões)."""
+    bot.logger.info(f'Logado como {bot.user} (ID: {bot.user.id})')
+    bot.logger.info("Bot está pronto para operar.")
+
+@bot.event
+async def on_app_command_completion(interaction: discord.Interaction, command):
+    """Registra a latência dos comandos slash concluídos."""
+    elapsed = command_elapsed(interaction)
+    if elapsed is not None:
+        bot.instrumentation.record(command_module(command), command.qualified_name, interaction.guild, elapsed)
+
+@bot.tree.error
+async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    """Registra os erros dos comandos slash e mantém o log do erro."""
+    command = interaction.command
+    elapsed = command_elapsed(interaction)
+    if command and elapsed is not None:
+        bot.instrumentation.record(command_module(command), command.qualified_name, interaction.guild, elapsed, failed=True)
+    bot.logger.error(f"Erro no comando {command.qualified_name if command else '?'}: {error}", exc_info=error)
+
+def command_elapsed(interaction: discord.Interaction):
+    """Segundos desde que a árvore aceitou o comando; None se ele foi recusado antes de começar."""
+    started_at = interaction.extras.get('started_at')
+    return None if started_at is None else time.perf_counter() - started_at
+
+def command_module(command) -> str:
+    """Nome do módulo (cog ou arquivo) de um comando slash."""
+    if getattr(command, 'binding', None) is not None:
+        return type(command.binding).__name__
+    return (command.module or 'unknown').rsplit('.', 1)[-1]
+
+@bot.event
+async def on_message(message: discord.Message):
+    """Passa a mensagem pelo pipeline dos módulos e despacha os comandos de prefixo uma única vez."""
+    if not bot.shutdown.admit():
+        return
+    await bot.message_pipeline.dispatch(message)
+    await bot.process_commands(message)
 
 @bot.event
 async def on_member_join(member: discord.Member):
-    pass
+    """Passa a entrada do membro pelo pipeline: risco → quarentena/antiraid → autorole → boas-vindas."""
+    if not bot.shutdown.admit():
+        return
+    await bot.join_pipeline.dispatch(member)
 
 @bot.event
 async def on_member_remove(member: discord.Member):
@@ -247,8 +362,20 @@ async def on_member_remove(member: discord.Member):
 # -----------------
 # INICIA A EXECUÇÃO
 # -----------------
+async def run_bot():
+    """Inicia o bot; Ctrl-C e SIGTERM (ex: parada do contêiner ou do launcher) disparam o desligamento gracioso."""
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signal_number, lambda name=signal_number.name: asyncio.ensure_future(bot.close(reason=name)))
+        except NotImplementedError:
+            pass  # Windows: o Ctrl-C chega como KeyboardInterrupt e o `async with` fecha o bot
+
+    async with bot:
+        await bot.start(os.getenv('DISCORD_BOT_TOKEN'))
+
 if __name__ == "__main__":
     try:
-        bot.run(os.getenv('DISCORD_BOT_TOKEN'))
+        asyncio.run(run_bot())
     except KeyboardInterrupt:
         bot.logger.info("Bot encerrado manualmente.")
\ No newline at end of file
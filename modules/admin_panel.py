@@ -1,29 +1,22 @@
 import discord
 from discord import app_commands
 
-def setup(tree: app_commands.CommandTree, config: dict, db_client):
+def setup(tree: app_commands.CommandTree, config: dict, repos):
     """Seta os comandos de administração e o comando para definir o cargo."""
     
-    # Acessa a coleção de configurações no seu banco de dados
-    settings_collection = db_client.seu_banco.settings_collection
+    # Acessa as configurações dos painéis no banco de dados
+    settings = repos.panel_settings
     
     # Função para buscar o ID do cargo de administrador no banco de dados
     async def get_admin_role_id():
-        settings = await settings_collection.find_one({"_id": "roles"})
-        if settings:
-            return settings.get("admin_role_id")
-        return None
+        return await settings.get_role_id("admin_role_id")
 
     # Comando para definir o cargo de administrador
     @tree.command(name="setadminrole", description="Define o cargo de administrador.")
     @app_commands.describe(cargo="O cargo que terá permissão de administrador.")
     @app_commands.checks.has_permissions(administrator=True) # Só admins podem usar este comando
     async def set_admin_role(interaction: discord.Interaction, cargo: discord.Role):
-        await settings_collection.update_one(
-            {"_id": "roles"},
-            {"$set": {"admin_role_id": cargo.id}},
-            upsert=True
-        )
+        await settings.set_role_id("admin_role_id", cargo.id)
         await interaction.response.send_message(f"Cargo de administrador definido para **{cargo.name}**.", ephemeral=True)
 
     # Comando de ban, que agora verifica a permissão pelo banco de dados
@@ -1,32 +1,38 @@
 import discord
 from discord.ext import commands
 import asyncio
-import collections
+from utils.rest_executor import PRIORITY_SECURITY
+from utils.sliding_window import SlidingWindowCounter
 
 class AntiNuke(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        # Um dicionário para rastrear ações de moderação por usuário
-        # Ex: {user_id: [timestamp1, timestamp2, ...]}
-        self.mod_actions = collections.defaultdict(list)
 
         # Configurações do Anti-Nuke
         self.threshold = 5  # Número de ações antes de reagir
         self.time_frame = 10  # Tempo em segundos para a detecção (10 segundos)
 
-    async def check_for_nuke(self, user: discord.Member, action: str):
-        """Verifica se um usuário está realizando uma ação de "nuke"."""
-        now = discord.utils.utcnow()
-        self.mod_actions[user.id].append(now)
+        # Ações de moderação recentes por (servidor, usuário), dentro de `time_frame`
+        self.mod_actions = SlidingWindowCounter(window=self.time_frame, max_keys=bot.config.get('antinuke_max_tracked_users', 10000))
 
-        # Remove timestamps antigos (fora do tempo de detecção)
-        self.mod_actions[user.id] = [t for t in self.mod_actions[user.id] if (now - t).total_seconds() <= self.time_frame]
+    async def cog_load(self):
+        # Os contadores só existem em memória; o desligamento informa quantos estavam ativos
+        self.bot.shutdown.register_volatile('antinuke_counters', lambda: len(self.mod_actions))
 
-        if len(self.mod_actions[user.id]) >= self.threshold:
+    async def cog_unload(self):
+        self.bot.shutdown.unregister_volatile('antinuke_counters')
+
+    async def check_for_nuke(self, guild: discord.Guild, user: discord.abc.User, action: str):
+        """
+        Verifica se um usuário está realizando uma ação de "nuke". `user` vem do log de auditoria e
+        pode ser um `discord.User` (sem `.guild`) quando o membro não está em cache.
+        """
+        key = (guild.id, user.id)
+        if self.mod_actions.hit(key) >= self.threshold:
             self.bot.logger.warning(f"Atenção! Possível ataque de 'nuke' detectado por {user.display_name} (ID: {user.id})! Ação: {action}")
             
             # Limpa o histórico de ações para este usuário para evitar múltiplas punições
-            self.mod_actions[user.id].clear()
+            self.mod_actions.reset(key)
 
             # Evita punir o dono do bot
             if user.id == self.bot.config.get('owner_id'):
@@ -34,16 +40,17 @@ class AntiNuke(commands.Cog):
                 return
 
             # Ação de proteção: remove todos os cargos do usuário e o expulsa do servidor
+            member = guild.get_member(user.id)
             try:
-                # Remove todos os cargos do usuário
-                for role in user.roles:
+                # Remove todos os cargos do usuário (o @everyone não pode ser removido)
+                for role in (member.roles[1:] if member else []):
                     try:
-                        await user.remove_roles(role)
+                        await self.bot.rest.run(member.remove_roles, role, guild_id=guild.id, priority=PRIORITY_SECURITY)
                     except discord.Forbidden:
                         self.bot.logger.warning(f"Não foi possível remover o cargo {role.name} de {user.display_name} por falta de permissões.")
 
-                # Kika o usuário
-                await user.kick(reason=f"Ativou o sistema Anti-Nuke: {self.threshold} ações de moderação em {self.time_frame} segundos.")
+                # Kika o usuário (guild.kick aceita também um discord.User)
+                await self.bot.rest.run(guild.kick, user, guild_id=guild.id, priority=PRIORITY_SECURITY, reason=f"Ativou o sistema Anti-Nuke: {self.threshold} ações de moderação em {self.time_frame} segundos.")
                 self.bot.logger.info(f"O usuário {user.display_name} foi kickado por ativar o Anti-Nuke.")
             except discord.Forbidden:
                 self.bot.logger.error("O bot não tem permissão para kikar o usuário. Ajuste as permissões do bot!")
@@ -58,7 +65,7 @@ class AntiNuke(commands.Cog):
         async for entry in audit_logs:
             if entry.user.bot:
                 return
-            await self.check_for_nuke(entry.user, "deletar canal")
+            await self.check_for_nuke(channel.guild, entry.user, "deletar canal")
             break
 
     @commands.Cog.listener()
@@ -68,7 +75,7 @@ class AntiNuke(commands.Cog):
         async for entry in audit_logs:
             if entry.user.bot:
                 return
-            await self.check_for_nuke(entry.user, "deletar cargo")
+            await self.check_for_nuke(role.guild, entry.user, "deletar cargo")
             break
 
     @commands.Cog.listener()
@@ -78,7 +85,7 @@ class AntiNuke(commands.Cog):
         async for entry in audit_logs:
             if entry.user.bot:
                 return
-            await self.check_for_nuke(entry.user, "banir membro")
+            await self.check_for_nuke(guild, entry.user, "banir membro")
             break
 
 def setup(bot: commands.Bot):
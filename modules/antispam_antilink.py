@@ -1,8 +1,25 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from database.database import get_collection
-import re
+from utils.message_pipeline import STAGE_FILTER, STAGE_MODERATION
+from utils.bulk_delete import DeletionJob
+from utils.rest_executor import PRIORITY_COSMETIC
+from utils.sliding_window import SlidingWindowCounter
+from utils.message_index import RecentMessageIndex
+from utils.content_fingerprint import DuplicateContentDetector
+from utils.link_filter import LinkPolicy, parse_domain
+import asyncio
+from utils.index_manager import declare_index
+
+# Índices das consultas deste módulo (criados na inicialização)
+declare_index('antispam_antilink', 'bot_data', 'antispam_configs', [('guild_id', 1)])
+declare_index('antispam_antilink', 'bot_data', 'antilink_configs', [('guild_id', 1)])
+
+# Mesmo conteúdo repetido N vezes pelo mesmo usuário na janela (sempre ativo com o anti-spam)
+DEFAULT_REPEAT_LIMIT = 5
+# O mesmo conteúdo vindo de N usuários distintos só é apagado se o servidor definir `duplicate_limit`,
+# já que mensagens comuns ("parabéns", "bom dia") se repetem entre pessoas diferentes
+MIN_DUPLICATE_LIMIT = 3
 
 # -----------------
 # CLASSES MODAIS
@@ -14,6 +31,12 @@ class AntispamModal(discord.ui.Modal, title="Configurar Anti-Spam"):
         required=True,
         max_length=5
     )
+    duplicate_limit = discord.ui.TextInput(
+        label="Cópias entre usuários (opcional)",
+        placeholder="Apaga o mesmo texto enviado por N usuários. Vazio: desativado",
+        required=False,
+        max_length=3
+    )
     
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(thinking=True, ephemeral=True)
@@ -21,18 +44,15 @@ class AntispamModal(discord.ui.Modal, title="Configurar Anti-Spam"):
         
         try:
             limit_val = int(self.limit.value)
-            if limit_val <= 0:
+            duplicate_val = int(self.duplicate_limit.value) if self.duplicate_limit.value else None
+            if limit_val <= 0 or (duplicate_val is not None and duplicate_val < MIN_DUPLICATE_LIMIT):
                 raise ValueError
         except ValueError:
-            await interaction.followup.send("❌ O limite de mensagens deve ser um número inteiro positivo.", ephemeral=True)
+            await interaction.followup.send(f"❌ O limite de mensagens deve ser um número inteiro positivo e o de cópias entre usuários, no mínimo {MIN_DUPLICATE_LIMIT}.", ephemeral=True)
             return
 
-        collection = get_collection(interaction.client.db_client, 'antispam_configs')
-        await collection.update_one(
-            {'guild_id': guild_id},
-            {'$set': {'limit': limit_val, 'enabled': True}},
-            upsert=True
-        )
+        await interaction.client.repos.guild_config('antispam_configs').save(guild_id, {'limit': limit_val, 'duplicate_limit': duplicate_val, 'enabled': True})
+        interaction.client.config_cache.invalidate('antispam_configs', guild_id)
         
         await interaction.followup.send(f"✅ Limite de anti-spam definido para {limit_val} mensagens por minuto.", ephemeral=True)
 
@@ -51,12 +71,8 @@ class AntilinkModal(discord.ui.Modal, title="Configurar Anti-Link"):
         
         enabled_val = self.enabled.value.lower() == 'sim'
 
-        collection = get_collection(interaction.client.db_client, 'antilink_configs')
-        await collection.update_one(
-            {'guild_id': guild_id},
-            {'$set': {'enabled': enabled_val}},
-            upsert=True
-        )
+        await interaction.client.repos.guild_config('antilink_configs').save(guild_id, {'enabled': enabled_val})
+        interaction.client.config_cache.invalidate('antilink_configs', guild_id)
         
         status = "ativado" if enabled_val else "desativado"
         await interaction.followup.send(f"✅ O sistema anti-link foi {status} com sucesso.", ephemeral=True)
@@ -67,9 +83,19 @@ class AntilinkModal(discord.ui.Modal, title="Configurar Anti-Link"):
 class AntiSpamAntilinkModule(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.spam_cooldowns = {}
-        # Expressão regular para encontrar URLs
-        self.url_regex = re.compile(r'https?://\S+|www\.\S+|\S+\.\S{2,}')
+        # Mensagens do último minuto por (servidor, usuário); usuários inativos são descartados sozinhos
+        self.spam_cooldowns = self._new_spam_window()
+        # Conteúdo recente de cada servidor, para detectar mensagens copiadas entre contas
+        self.duplicates = self._new_duplicate_detector()
+        # Políticas de links compiladas por servidor: {guild_id: (documento de configuração, LinkPolicy)}
+        self._link_policies = {}
+
+    links = app_commands.Group(
+        name="links",
+        description="Domínios permitidos e bloqueados pelo anti-link e as exceções.",
+        default_permissions=discord.Permissions(manage_messages=True),
+        guild_only=True
+    )
 
     @app_commands.command(name="antispam", description="Configura o sistema de anti-spam.")
     @app_commands.default_permissions(manage_messages=True)
@@ -81,57 +107,207 @@ class AntiSpamAntilinkModule(commands.Cog):
     async def antilink(self, interaction: discord.Interaction):
         await interaction.response.send_modal(AntilinkModal())
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
+    async def cog_load(self):
+        # Registra os estágios no pipeline de mensagens (anti-link antes do anti-spam)
+        self.bot.message_pipeline.register('antilink', STAGE_FILTER, self.antilink_stage)
+        self.bot.message_pipeline.register('antispam', STAGE_MODERATION, self.antispam_stage)
+        self.bot.message_pipeline.register('duplicates', STAGE_MODERATION, self.duplicates_stage)
+        self.bot.shutdown.register_volatile('antispam_windows', lambda: len(self.spam_cooldowns))
+
+    async def cog_unload(self):
+        self.bot.message_pipeline.unregister('antilink')
+        self.bot.message_pipeline.unregister('antispam')
+        self.bot.message_pipeline.unregister('duplicates')
+        self.bot.shutdown.unregister_volatile('antispam_windows')
+
+    def _new_spam_window(self) -> SlidingWindowCounter:
+        return SlidingWindowCounter(window=60, max_keys=self.bot.config.get('antispam_max_tracked_users', 50000))
+
+    def _new_duplicate_detector(self) -> DuplicateContentDetector:
+        return DuplicateContentDetector(window=self.bot.config.get('duplicate_window_seconds', 120))
+
+    def link_policy(self, guild_id: int, config: dict) -> LinkPolicy:
+        """Política da configuração atual; só é recompilada quando o cache devolve outro documento."""
+        cached = self._link_policies.get(guild_id)
+        if cached and cached[0] is config:
+            return cached[1]
+        policy = LinkPolicy(config)
+        self._link_policies[guild_id] = (config, policy)
+        return policy
+
+    async def antilink_stage(self, ctx):
+        """Estágio de filtro: remove mensagens com links de domínios bloqueados quando o anti-link está ativo."""
+        message = ctx.message
+        antilink_config = await ctx.config('antilink_configs')
+        if not antilink_config or not antilink_config.get('enabled'):
             return
 
-        # Lógica Anti-Link
-        antilink_collection = get_collection(self.bot.db_client, 'antilink_configs')
-        antilink_config = await antilink_collection.find_one({'guild_id': message.guild.id})
-        
-        if antilink_config and antilink_config.get('enabled') and self.url_regex.search(message.content):
+        policy = self.link_policy(message.guild.id, antilink_config)
+        if policy.is_exempt(message.channel, message.author):
+            return
+        if policy.blocked_hosts(message.content):
             try:
-                await message.delete()
-                await message.channel.send(f"❌ {message.author.mention}, links não são permitidos neste servidor.", delete_after=5)
-                return  # Parar a execução para não verificar anti-spam
+                await ctx.rest.run(message.delete, route=f"delete_message:{message.channel.id}")
+                await ctx.rest.run(message.channel.send, f"❌ {message.author.mention}, links não são permitidos neste servidor.", delete_after=5, guild_id=ctx.guild_id, priority=PRIORITY_COSMETIC)
+                ctx.stop()  # Parar a execução para não verificar anti-spam nem dar XP
 
             except discord.errors.Forbidden:
-                print(f"Erro: Sem permissão para excluir mensagens no canal {message.channel.name}.")
+                self.bot.logger.warning(f"Sem permissão para excluir mensagens no canal {message.channel.name}.")
+
+    async def delete_recent_messages(self, ctx, user_id: int) -> int:
+        """
+        Apaga em massa as mensagens recentes do usuário em todos os canais, usando o índice do
+        pipeline de mensagens (sem buscar o histórico e sem apagar mensagens de outros usuários).
+        """
+        guild = ctx.guild
+        index = ctx.service('recent_messages', self.bot.message_pipeline.recent_messages, RecentMessageIndex)
+        jobs = []
+        for channel_id, message_ids in index.recent(guild.id, user_id).items():
+            channel = guild.get_channel_or_thread(channel_id)
+            if channel is None:
+                continue
+            messages = [message for message in map(channel.get_partial_message, message_ids) if message is not None]
+            job = DeletionJob(self.bot, channel, reason="Anti-spam", rest=ctx.rest)
+            jobs.append(job.run(messages))
+        index.discard(guild.id, user_id)
+
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        for result in results:
+            if isinstance(result, discord.Forbidden):
+                raise result
+            if isinstance(result, Exception):
+                self.bot.logger.error(f"Erro ao apagar as mensagens de spam de {user_id}: {result!r}")
+        return sum(result for result in results if isinstance(result, int))
+
+    # -----------------
+    # DOMÍNIOS E EXCEÇÕES DO ANTI-LINK
+    # -----------------
+    async def _update_links(self, guild_id: int, update: dict):
+        await self.bot.repos.guild_config('antilink_configs').update_one({'guild_id': guild_id}, update, upsert=True)
+        self.bot.config_cache.invalidate('antilink_configs', guild_id)
+
+    @links.command(name="permitir", description="Permite links de um domínio e dos seus subdomínios.")
+    @app_commands.describe(dominio="O domínio, ex: youtube.com")
+    async def links_permitir(self, interaction: discord.Interaction, dominio: str):
+        host = parse_domain(dominio)
+        if not host:
+            await interaction.response.send_message("❌ Domínio inválido.", ephemeral=True)
+            return
+        await self._update_links(interaction.guild.id, {'$addToSet': {'allowed_domains': host}, '$pull': {'blocked_domains': host}})
+        await interaction.response.send_message(f"✅ Links de `{host}` (e subdomínios) são permitidos.", ephemeral=True)
+
+    @links.command(name="bloquear", description="Bloqueia links de um domínio e dos seus subdomínios.")
+    @app_commands.describe(dominio="O domínio, ex: discord.gg")
+    async def links_bloquear(self, interaction: discord.Interaction, dominio: str):
+        host = parse_domain(dominio)
+        if not host:
+            await interaction.response.send_message("❌ Domínio inválido.", ephemeral=True)
+            return
+        await self._update_links(interaction.guild.id, {'$addToSet': {'blocked_domains': host}, '$pull': {'allowed_domains': host}})
+        await interaction.response.send_message(f"✅ Links de `{host}` (e subdomínios) são bloqueados.", ephemeral=True)
+
+    @links.command(name="remover", description="Remove um domínio das listas de permitidos e bloqueados.")
+    @app_commands.describe(dominio="O domínio cadastrado.")
+    async def links_remover(self, interaction: discord.Interaction, dominio: str):
+        host = parse_domain(dominio) or dominio.strip().lower()
+        await self._update_links(interaction.guild.id, {'$pull': {'allowed_domains': host, 'blocked_domains': host}})
+        await interaction.response.send_message(f"✅ `{host}` removido das listas.", ephemeral=True)
+
+    @links.command(name="outros", description="Define o que fazer com links de domínios que não estão em nenhuma lista.")
+    @app_commands.describe(bloquear="Bloquear (padrão) ou permitir os domínios não listados.")
+    async def links_outros(self, interaction: discord.Interaction, bloquear: bool):
+        await self._update_links(interaction.guild.id, {'$set': {'block_unlisted': bloquear}})
+        status = "bloqueados" if bloquear else "permitidos (só a lista de bloqueados é aplicada)"
+        await interaction.response.send_message(f"✅ Links de domínios não listados serão {status}.", ephemeral=True)
 
-        # Lógica Anti-Spam
-        antispam_collection = get_collection(self.bot.db_client, 'antispam_configs')
-        antispam_config = await antispam_collection.find_one({'guild_id': message.guild.id})
+    @links.command(name="isentar-canal", description="Isenta (ou deixa de isentar) um canal do anti-link.")
+    @app_commands.describe(canal="O canal em que links são liberados.")
+    async def links_isentar_canal(self, interaction: discord.Interaction, canal: discord.TextChannel):
+        config = await self.bot.config_cache.get('antilink_configs', interaction.guild.id) or {}
+        exempt = canal.id not in config.get('exempt_channels', [])
+        await self._update_links(interaction.guild.id, {('$addToSet' if exempt else '$pull'): {'exempt_channels': canal.id}})
+        await interaction.response.send_message(f"✅ {canal.mention} {'agora é isento do' if exempt else 'não é mais isento do'} anti-link.", ephemeral=True)
+
+    @links.command(name="isentar-cargo", description="Isenta (ou deixa de isentar) um cargo do anti-link.")
+    @app_commands.describe(cargo="O cargo cujos membros podem enviar links.")
+    async def links_isentar_cargo(self, interaction: discord.Interaction, cargo: discord.Role):
+        config = await self.bot.config_cache.get('antilink_configs', interaction.guild.id) or {}
+        exempt = cargo.id not in config.get('exempt_roles', [])
+        await self._update_links(interaction.guild.id, {('$addToSet' if exempt else '$pull'): {'exempt_roles': cargo.id}})
+        await interaction.response.send_message(f"✅ {cargo.mention} {'agora é isento do' if exempt else 'não é mais isento do'} anti-link.", ephemeral=True)
+
+    @links.command(name="listar", description="Mostra os domínios permitidos, bloqueados e as exceções do anti-link.")
+    async def links_listar(self, interaction: discord.Interaction):
+        config = await self.bot.config_cache.get('antilink_configs', interaction.guild.id) or {}
+
+        def field(values, fmt) -> str:
+            text = "\n".join(fmt(value) for value in values) or "Nenhum"
+            return text if len(text) <= 1024 else text[:1020].rsplit("\n", 1)[0] + "\n…"
+
+        embed = discord.Embed(
+            title="🔗 Anti-link",
+            description=(
+                f"Status: {'ativado' if config.get('enabled') else 'desativado'}\n"
+                f"Domínios não listados: {'bloqueados' if config.get('block_unlisted', True) else 'permitidos'}"
+            ),
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Permitidos", value=field(config.get('allowed_domains', []), lambda host: f"`{host}`"), inline=True)
+        embed.add_field(name="Bloqueados", value=field(config.get('blocked_domains', []), lambda host: f"`{host}`"), inline=True)
+        embed.add_field(name="Canais isentos", value=field(config.get('exempt_channels', []), lambda channel_id: f"<#{channel_id}>"), inline=False)
+        embed.add_field(name="Cargos isentos", value=field(config.get('exempt_roles', []), lambda role_id: f"<@&{role_id}>"), inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    async def antispam_stage(self, ctx):
+        """Estágio de moderação: conta as mensagens do autor e limpa o spam."""
+        message = ctx.message
+        antispam_config = await ctx.config('antispam_configs')
 
         if antispam_config and antispam_config.get('enabled'):
-            user_id = str(message.author.id)
-            if user_id not in self.spam_cooldowns:
-                self.spam_cooldowns[user_id] = []
-
-            self.spam_cooldowns[user_id].append(message.created_at)
-            
-            # Remove mensagens antigas da lista
-            one_minute_ago = discord.utils.utcnow() - discord.timedelta(minutes=1)
-            self.spam_cooldowns[user_id] = [ts for ts in self.spam_cooldowns[user_id] if ts > one_minute_ago]
-            
-            if len(self.spam_cooldowns[user_id]) > antispam_config['limit']:
+            key = (message.guild.id, message.author.id)
+            # A janela guarda no máximo `max_events` mensagens, então limites maiores nunca seriam alcançados
+            spam_cooldowns = ctx.service('spam_cooldowns', self.spam_cooldowns, self._new_spam_window)
+            limit = min(antispam_config['limit'], spam_cooldowns.max_events - 1)
+
+            if spam_cooldowns.hit(key) > limit:
                 try:
-                    await message.channel.send(f"🛑 {message.author.mention}, não faça spam! As suas mensagens serão excluídas.", delete_after=5)
-                    # Exclui as mensagens recentes do usuário individualmente com delay
-                    messages_to_delete = [msg async for msg in message.channel.history(limit=antispam_config['limit'] + 1, before=message.created_at)]
-                    for msg in messages_to_delete:
-                        try:
-                            await msg.delete()
-                            await asyncio.sleep(0.5)  # Delay de 0.5 segundos
-                        except discord.errors.NotFound:
-                            pass  # Mensagem já foi excluída
-                        except discord.errors.Forbidden:
-                            print(f"Erro: Sem permissão para excluir mensagens no canal {message.channel.name}.")
-                            break  # Parar de excluir se não tiver permissão
-
-                    self.spam_cooldowns[user_id] = []  # Limpa o registro do usuário
+                    await ctx.rest.run(message.channel.send, f"🛑 {message.author.mention}, não faça spam! As suas mensagens serão excluídas.", delete_after=5, guild_id=ctx.guild_id, priority=PRIORITY_COSMETIC)
+                    await self.delete_recent_messages(ctx, message.author.id)
+
+                    spam_cooldowns.reset(key)  # Limpa o registro do usuário
+                    ctx.stop()  # Mensagens de spam não geram recompensas
                 except discord.errors.Forbidden:
-                    print(f"Erro: Sem permissão para gerir mensagens no canal {message.channel.name}.")
+                    self.bot.logger.warning(f"Sem permissão para gerir mensagens no canal {message.channel.name}.")
+
+    async def duplicates_stage(self, ctx):
+        """
+        Estágio de moderação: apaga conteúdo igual ou quase igual repetido pela mesma conta ou,
+        quando o servidor definiu `duplicate_limit`, enviado por várias contas.
+        """
+        message = ctx.message
+        antispam_config = await ctx.config('antispam_configs')
+        if not (antispam_config and antispam_config.get('enabled')) or not message.content:
+            return
+
+        users_limit = antispam_config.get('duplicate_limit')
+        duplicates = ctx.service('duplicates', self.duplicates, self._new_duplicate_detector)
+        users, repeats = duplicates.check(message.guild.id, message.author.id, message.content)
+        repeated = repeats >= DEFAULT_REPEAT_LIMIT
+        if not repeated and not (users_limit and users >= users_limit):
+            return
+
+        try:
+            await ctx.rest.run(message.delete, route=f"delete_message:{message.channel.id}")
+            if repeated:
+                await ctx.rest.run(message.channel.send, f"🛑 {message.author.mention}, não repita a mesma mensagem.", delete_after=5, guild_id=ctx.guild_id, priority=PRIORITY_COSMETIC)
+            else:
+                # Raid de copiar e colar: sem aviso no canal (seria um por conta), só no log
+                self.bot.logger.warning(f"Conteúdo repetido por {users} usuários em {message.guild.name}; mensagem de {message.author} apagada.")
+            ctx.stop()  # Mensagens repetidas não geram recompensas
+        except discord.NotFound:
+            ctx.stop()
+        except discord.errors.Forbidden:
+            self.bot.logger.warning(f"Sem permissão para excluir mensagens no canal {message.channel.name}.")
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(AntiSpamAntilinkModule(bot))
@@ -2,8 +2,15 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 import datetime
-import re
 import asyncio
+from utils.join_pipeline import MemberFeatures, STAGE_RISK, STAGE_QUARANTINE
+from utils.rest_executor import PRIORITY_SECURITY, PRIORITY_COSMETIC
+from utils.sharding import owns_guild, owned_guilds_filter
+from utils.index_manager import declare_index
+
+# Índices das consultas deste módulo (criados na inicialização)
+declare_index('auto_quarantine', 'bot_data', 'quarantined_users', [('quarantined_at', 1)])
+declare_index('auto_quarantine', 'bot_data', 'quarantined_users', [('guild_id', 1), ('user_id', 1)])
 
 class AutoQuarantine(commands.Cog):
     def __init__(self, bot):
@@ -15,11 +22,11 @@ class AutoQuarantine(commands.Cog):
         self.risk_threshold = 50 # Pontos necessários para ativar a quarentena
         self.quarantine_duration_hours = 24 # Duração da quarentena em horas
 
-    def calculate_risk_score(self, member: discord.Member) -> int:
+    def calculate_risk_score(self, member: discord.Member, features: MemberFeatures = None) -> int:
         """Calcula a pontuação de risco de um membro com base em critérios de segurança."""
+        features = features or MemberFeatures(member)
         score = 0
-        now = discord.utils.utcnow()
-        account_age = now - member.created_at
+        account_age = features.account_age
 
         # Critério 1: Idade da conta
         if account_age <= datetime.timedelta(days=2):
@@ -28,24 +35,38 @@ class AutoQuarantine(commands.Cog):
             score += 20
         
         # Critério 2: Falta de avatar
-        if not member.avatar:
+        if not features.has_avatar:
             score += 30
 
         # Critério 3: Nome de usuário suspeito
-        if re.search(r'[^a-zA-Z\s]{5,}', member.name) or re.match(r'\d+', member.name):
+        if features.has_symbol_run or features.starts_with_digits:
             score += 25
-        if len(member.name) <= 2:
+        if features.name_length <= 2:
             score += 15
 
         return score
 
-    @commands.Cog.listener()
-    async def on_member_join(self, member: discord.Member):
-        
+    async def cog_load(self):
+        # A pontuação é calculada primeiro para que os demais estágios da entrada possam usá-la
+        self.bot.join_pipeline.register('risk_score', STAGE_RISK, self.risk_stage)
+        self.bot.join_pipeline.register('auto_quarantine', STAGE_QUARANTINE, self.quarantine_stage)
+        # Inicia a tarefa de verificação uma única vez (on_ready dispara de novo a cada reconexão)
+        if not self.check_quarantine_expiry.is_running():
+            self.check_quarantine_expiry.start()
+
+    async def risk_stage(self, ctx):
+        """Estágio de pontuação de risco da entrada de membros."""
+        if ctx.member.bot:
+            return
+        ctx.risk_score = self.calculate_risk_score(ctx.member, ctx.features)
+
+    async def quarantine_stage(self, ctx):
+        """Estágio de quarentena automática da entrada de membros."""
+        member = ctx.member
         if member.bot:
             return
 
-        risk_score = self.calculate_risk_score(member)
+        risk_score = ctx.risk_score
         
         if risk_score >= self.risk_threshold:
             self.bot.logger.info(f"Membro {member.name} (ID: {member.id}) com pontuação de risco de {risk_score} (pontuação limite: {self.risk_threshold}).")
@@ -57,18 +78,16 @@ class AutoQuarantine(commands.Cog):
                 return
 
             try:
-                await member.add_roles(quarantine_role, reason=f"Quarentena automática: pontuação de risco {risk_score}.")
+                await ctx.rest.run(member.add_roles, quarantine_role, guild_id=member.guild.id, priority=PRIORITY_SECURITY, reason=f"Quarentena automática: pontuação de risco {risk_score}.")
+                ctx.quarantined = True
+                ctx.actions.append('quarantine')
                 
-                quarantine_collection = self.bot.db_client.giveaway_database.quarantined_users
-                await quarantine_collection.insert_one({
-                    "user_id": member.id,
-                    "quarantined_at": datetime.datetime.utcnow(),
-                    "guild_id": member.guild.id
-                })
+                if not ctx.dry_run:
+                    await self.bot.repos.quarantined_users.add(member.guild.id, member.id, datetime.datetime.utcnow())
                 
                 quarantine_channel = member.guild.get_channel(self.quarantine_channel_id)
                 if quarantine_channel:
-                    await quarantine_channel.send(f"🚨 Alerta de Segurança: O membro {member.mention} foi colocado em quarentena automaticamente por ser uma conta suspeita (pontuação de risco: **{risk_score}**). A quarentena durará **{self.quarantine_duration_hours} horas**.")
+                    await ctx.rest.run(quarantine_channel.send, f"🚨 Alerta de Segurança: O membro {member.mention} foi colocado em quarentena automaticamente por ser uma conta suspeita (pontuação de risco: **{risk_score}**). A quarentena durará **{self.quarantine_duration_hours} horas**.", guild_id=member.guild.id, priority=PRIORITY_COSMETIC)
 
                 self.bot.logger.info(f"Membro {member.name} (ID: {member.id}) colocado em quarentena automaticamente por {self.quarantine_duration_hours} horas.")
                 
@@ -80,13 +99,15 @@ class AutoQuarantine(commands.Cog):
     @tasks.loop(minutes=1)
     async def check_quarantine_expiry(self):
         """Verifica e remove a quarentena de membros cujo tempo expirou."""
-        quarantine_collection = self.bot.db_client.giveaway_database.quarantined_users
+        quarantine_collection = self.bot.repos.quarantined_users
         
         # Pega a data de agora menos a duração da quarentena
         expiry_time = datetime.datetime.utcnow() - datetime.timedelta(hours=self.quarantine_duration_hours)
         
-        # Pega todos os usuários que estão em quarentena por mais tempo que o permitido
-        async for quarantined_user_data in quarantine_collection.find({"quarantined_at": {"$lte": expiry_time}}):
+        # Pega os usuários dos servidores deste shard que estão em quarentena por mais tempo que o permitido
+        async for quarantined_user_data in quarantine_collection.expired(expiry_time, owned_guilds_filter(self.bot)):
+            if not owns_guild(self.bot, quarantined_user_data["guild_id"]):
+                continue  # Outro processo cuida deste servidor
             guild = self.bot.get_guild(quarantined_user_data["guild_id"])
             if not guild:
                 await quarantine_collection.delete_one({"_id": quarantined_user_data["_id"]})
@@ -107,14 +128,16 @@ class AutoQuarantine(commands.Cog):
             # Remove o registro do banco de dados
             await quarantine_collection.delete_one({"_id": quarantined_user_data["_id"]})
 
-    @commands.Cog.listener()
-    async def on_ready(self):
-        # Inicia a tarefa de verificação quando o bot está pronto
-        self.check_quarantine_expiry.start()
+    @check_quarantine_expiry.before_loop
+    async def before_check_quarantine_expiry(self):
+        # Espera o cache de servidores ficar pronto antes da primeira verificação
+        await self.bot.wait_until_ready()
 
     def cog_unload(self):
         # Para a tarefa quando o cog é descarregado
         self.check_quarantine_expiry.cancel()
+        self.bot.join_pipeline.unregister('risk_score')
+        self.bot.join_pipeline.unregister('auto_quarantine')
     
     # --- NOVO COMANDO ---
     @app_commands.command(name="remova_quarentena", description="Remove a quarentena de um membro.")
@@ -136,8 +159,7 @@ class AutoQuarantine(commands.Cog):
             await membro.remove_roles(quarantine_role, reason=f"Quarentena removida manualmente por {interaction.user.display_name}.")
             
             # Remove o registro do banco de dados
-            quarantine_collection = self.bot.db_client.giveaway_database.quarantined_users
-            await quarantine_collection.delete_one({"user_id": membro.id, "guild_id": interaction.guild.id})
+            await self.bot.repos.quarantined_users.remove(interaction.guild.id, membro.id)
             
             await interaction.response.send_message(f"✅ Quarentena de {membro.mention} removida com sucesso.", ephemeral=True)
 
@@ -148,4 +170,4 @@ class AutoQuarantine(commands.Cog):
 
 def setup(bot):
     bot.add_cog(AutoQuarantine(bot))
-    print("Módulo de Quarentena Automática (com duração) carregado.")
\ No newline at end of file
+    bot.logger.info("Módulo de Quarentena Automática (com duração) carregado.")
\ No newline at end of file
@@ -3,6 +3,7 @@ from discord.ext import commands
 from discord import app_commands
 import json
 import io
+import asyncio
 
 class BackupRestore(commands.Cog):
     def __init__(self, bot):
@@ -109,7 +110,8 @@ class BackupRestore(commands.Cog):
                 backup_data["channels"].append(channel_data)
 
         # 4. Cria o arquivo JSON
-        file_content = json.dumps(backup_data, indent=4)
+        # Serializa fora do event loop: o backup de um servidor grande pode levar centenas de ms
+        file_content = await asyncio.to_thread(json.dumps, backup_data, indent=4)
         file = discord.File(io.StringIO(file_content), filename=f"backup-{guild.id}.json")
 
         await interaction.followup.send(
@@ -246,4 +248,4 @@ class BackupRestore(commands.Cog):
 
 async def setup(bot):
     await bot.add_cog(BackupRestore(bot))
-    print("Módulo de Backup e Restauração carregado.")
\ No newline at end of file
+    bot.logger.info("Módulo de Backup e Restauração carregado.")
\ No newline at end of file
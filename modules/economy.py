@@ -1,17 +1,146 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands, utils
+from pymongo import UpdateOne
+from utils.message_pipeline import STAGE_REWARDS
+from utils.rest_executor import PRIORITY_COSMETIC
 import time
 import math
 import random
+from utils.index_manager import declare_index
+
+# Índices dos rankings /topxp e /topcoins (criados na inicialização)
+declare_index('economy', 'bot_data', 'economy_users', [('guild_id', 1), ('xp', -1)])
+declare_index('economy', 'bot_data', 'economy_users', [('guild_id', 1), ('coins', -1)])
+
+class XPAccumulator:
+    """
+    Acumulador write-behind de XP e moedas.
+
+    Mantém em memória o estado de cada `{user}_{guild}` ativo (para checar o cooldown
+    sem ir ao banco) e soma os ganhos pendentes, que são gravados em lote com
+    `bulk_write` de `$inc`. Subidas de nível são gravadas na hora, numa única operação.
+    """
+    def __init__(self, collection, idle_eviction_seconds: int = 3600):
+        self.collection = collection
+        self.idle_eviction_seconds = idle_eviction_seconds
+        self.states = {}  # {user_data_id: documento do usuário com os ganhos já aplicados}
+        self.pending = {}  # {user_data_id: ganhos ainda não gravados}
+        self.flushed_ops = 0
+
+    async def get_state(self, user_data_id: str, user_id: str, guild_id: str) -> dict:
+        """Retorna o estado do usuário, buscando no banco apenas na primeira mensagem."""
+        state = self.states.get(user_data_id)
+        if state is None:
+            document = await self.collection.find_one({'_id': user_data_id})
+            state = self.states.setdefault(user_data_id, document or {
+                '_id': user_data_id,
+                'user_id': user_id,
+                'guild_id': guild_id,
+                'xp': 0,
+                'level': 1,
+                'coins': 0,
+                'last_message_time': 0
+            })
+        return state
+
+    def add(self, state: dict, xp_gain: int, coins_gain: int, current_time: float):
+        """Aplica o ganho ao estado em memória e o acumula para a próxima gravação."""
+        state['xp'] += xp_gain
+        state['coins'] += coins_gain
+        state['last_message_time'] = current_time
+
+        delta = self.pending.setdefault(state['_id'], {
+            'user_id': state['user_id'],
+            'guild_id': state['guild_id'],
+            'xp': 0,
+            'coins': 0,
+            'last_message_time': 0
+        })
+        delta['xp'] += xp_gain
+        delta['coins'] += coins_gain
+        delta['last_message_time'] = current_time
+
+    async def level_up(self, state: dict, required_xp: int):
+        """Sobe o nível do usuário e grava imediatamente, junto com os ganhos pendentes."""
+        state['level'] += 1
+        state['xp'] -= required_xp
+
+        delta = self.pending.pop(state['_id'], None) or {
+            'user_id': state['user_id'],
+            'guild_id': state['guild_id'],
+            'xp': 0,
+            'coins': 0,
+            'last_message_time': state['last_message_time']
+        }
+        delta['xp'] -= required_xp
+        delta['level'] = state['level']
+        try:
+            await self.collection.update_one({'_id': state['_id']}, self._build_update(delta), upsert=True)
+        except Exception:
+            delta.pop('level')
+            delta['xp'] += required_xp
+            self._merge_back({state['_id']: delta})
+            state['level'] -= 1
+            state['xp'] += required_xp
+            raise
+
+    def _build_update(self, delta: dict) -> dict:
+        update = {
+            '$setOnInsert': {'user_id': delta['user_id'], 'guild_id': delta['guild_id']},
+            '$max': {'last_message_time': delta['last_message_time']}
+        }
+        inc = {field: delta[field] for field in ('xp', 'coins') if delta[field]}
+        if inc:
+            update['$inc'] = inc
+        if 'level' in delta:
+            update['$set'] = {'level': delta['level']}
+        else:
+            update['$setOnInsert']['level'] = 1
+        return update
+
+    def _merge_back(self, batch: dict):
+        # Devolve ganhos que não puderam ser gravados para a próxima tentativa
+        for user_data_id, delta in batch.items():
+            current = self.pending.get(user_data_id)
+            if current is None:
+                self.pending[user_data_id] = delta
+            else:
+                current['xp'] += delta['xp']
+                current['coins'] += delta['coins']
+                current['last_message_time'] = max(current['last_message_time'], delta['last_message_time'])
+
+    async def flush(self) -> int:
+        """Grava todos os ganhos pendentes em um único bulk_write e retorna quantos usuários foram gravados."""
+        if not self.pending:
+            self._evict_idle()
+            return 0
+
+        batch, self.pending = self.pending, {}
+        operations = [UpdateOne({'_id': user_data_id}, self._build_update(delta), upsert=True) for user_data_id, delta in batch.items()]
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except Exception:
+            self._merge_back(batch)
+            raise
+        self.flushed_ops += len(operations)
+        self._evict_idle()
+        return len(operations)
+
+    def _evict_idle(self):
+        # Remove da memória usuários inativos que não têm ganhos pendentes
+        cutoff = time.time() - self.idle_eviction_seconds
+        for user_data_id in [key for key, state in self.states.items() if state['last_message_time'] < cutoff and key not in self.pending]:
+            del self.states[user_data_id]
+
 
 # A classe Cog é a forma recomendada de estruturar módulos em discord.py
 class EconomySystem(commands.Cog):
     def __init__(self, bot, db_client):
         self.bot = bot
-        self.db = db_client['your_database_name'] # Substitua pelo nome do seu banco de dados
-        self.users_collection = self.db['users'] # Coleção para armazenar os dados dos usuários
+        self.users_collection = bot.repos.economy # Coleção para armazenar os dados dos usuários
         self.xp_cooldown_seconds = 60 # Tempo de espera entre ganhos de XP (em segundos)
+        self.accumulator = XPAccumulator(self.users_collection) # Ganhos acumulados em memória e gravados em lote
         self.level_up_messages = [
             "Parabéns, {user}! Você subiu de nível para **{level}**!",
             "Uau! {user} agora é nível **{level}**! Continue assim!",
@@ -33,64 +162,70 @@ class EconomySystem(commands.Cog):
         
         return f"[{bar}] {int(percentage * 100)}%"
 
-    # Evento disparado quando uma mensagem é enviada
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        # Ignora mensagens de bots ou de DMs
-        if message.author.bot or not message.guild:
-            return
+    async def cog_load(self):
+        # Recompensas são o último estágio do pipeline: mensagens filtradas não chegam aqui
+        self.bot.message_pipeline.register('economy', STAGE_REWARDS, self.rewards_stage)
+        # No desligamento, o XP pendente é gravado depois que as chamadas REST forem drenadas
+        self.bot.shutdown.register_flush('economy_xp', self.accumulator.flush)
+        self.flush_xp.start()
+
+    async def cog_unload(self):
+        self.bot.message_pipeline.unregister('economy')
+        self.bot.shutdown.unregister_flush('economy_xp')
+        self.flush_xp.cancel()
+        # Grava o que ainda estiver pendente antes de descarregar (inclusive no desligamento do bot)
+        try:
+            await self.accumulator.flush()
+        except Exception as e:
+            self.bot.logger.error(f"Erro ao gravar o XP pendente ao descarregar a economia: {e}")
+
+    @tasks.loop(seconds=15)
+    async def flush_xp(self):
+        """Grava periodicamente os ganhos de XP e moedas acumulados."""
+        try:
+            await self.accumulator.flush()
+        except Exception as e:
+            self.bot.logger.error(f"Erro ao gravar o XP acumulado: {e}")
 
+    # Estágio do pipeline executado para cada mensagem que passou pelos filtros
+    async def rewards_stage(self, ctx):
+        if ctx.dry_run:
+            return  # Mensagens simuladas não geram XP
+        message = ctx.message
         user_id = str(message.author.id)
         guild_id = str(message.guild.id)
         
         # Cria um ID único para o usuário no servidor
         user_data_id = f"{user_id}_{guild_id}"
 
-        # Busca ou cria o documento do usuário
-        user_data = await self.users_collection.find_one({'_id': user_data_id})
-        
-        if not user_data:
-            user_data = {
-                '_id': user_data_id,
-                'user_id': user_id,
-                'guild_id': guild_id,
-                'xp': 0,
-                'level': 1,
-                'coins': 0,
-                'last_message_time': 0
-            }
-            await self.users_collection.insert_one(user_data)
+        # Busca o estado do usuário na memória (o banco só é lido na primeira mensagem)
+        user_data = await self.accumulator.get_state(user_data_id, user_id, guild_id)
 
         current_time = time.time()
         
         # Verifica o cooldown
         if current_time - user_data['last_message_time'] >= self.xp_cooldown_seconds:
-            # Ganho de XP e moedas
+            # Ganho de XP e moedas, gravados em lote pelo flush periódico
             xp_gain = random.randint(15, 25)
             coins_gain = random.randint(1, 5)
-            
-            user_data['xp'] += xp_gain
-            user_data['coins'] += coins_gain
-            user_data['last_message_time'] = current_time
+            self.accumulator.add(user_data, xp_gain, coins_gain, current_time)
             
             # Verifica se o usuário subiu de nível
             required_xp = self.calculate_required_xp(user_data['level'])
             if user_data['xp'] >= required_xp:
-                user_data['level'] += 1
-                user_data['xp'] -= required_xp
+                await self.accumulator.level_up(user_data, required_xp)
                 
                 # Envia mensagem de nível
                 level_up_message = random.choice(self.level_up_messages)
-                await message.channel.send(level_up_message.format(user=message.author.mention, level=user_data['level']))
+                await ctx.rest.run(message.channel.send, level_up_message.format(user=message.author.mention, level=user_data['level']), guild_id=ctx.guild_id, priority=PRIORITY_COSMETIC)
 
-            await self.users_collection.update_one({'_id': user_data_id}, {'$set': user_data})
-        
-        # Garante que outros comandos continuem funcionando
-        await self.bot.process_commands(message)
+        # Disponibiliza os dados do autor aos estágios seguintes
+        ctx.author_state['economy'] = user_data
 
     @app_commands.command(name="profile", description="Mostra o seu perfil de level e economia.")
     async def profile_command(self, interaction: discord.Interaction):
-        user_data = await self.users_collection.find_one({'_id': f"{interaction.user.id}_{interaction.guild.id}"})
+        user_data_id = f"{interaction.user.id}_{interaction.guild.id}"
+        user_data = self.accumulator.states.get(user_data_id) or await self.users_collection.find_one({'_id': user_data_id})
 
         if not user_data:
             await interaction.response.send_message("Você ainda não tem um perfil. Envie uma mensagem no servidor para começar!", ephemeral=True)
@@ -119,12 +254,21 @@ class EconomySystem(commands.Cog):
         
         await interaction.response.send_message(embed=embed)
 
+    async def _flush_for_ranking(self):
+        """Grava os ganhos ainda em memória para que o ranking os inclua; se falhar, usa o ranking já gravado."""
+        try:
+            await self.accumulator.flush()
+        except Exception as e:
+            self.bot.logger.error(f"Erro ao gravar o XP acumulado antes do ranking: {e}")
+
     @app_commands.command(name="topxp", description="Mostra o ranking de usuários por XP.")
     async def topxp_command(self, interaction: discord.Interaction):
-        leaderboard = await self.users_collection.find({'guild_id': str(interaction.guild.id)}).sort('xp', -1).limit(10).to_list(10)
+        await interaction.response.defer()
+        await self._flush_for_ranking()
+        leaderboard = await self.users_collection.leaderboard(str(interaction.guild.id), 'xp')
         
         if not leaderboard:
-            await interaction.response.send_message("Não há dados de ranking neste servidor ainda.", ephemeral=True)
+            await interaction.followup.send("Não há dados de ranking neste servidor ainda.", ephemeral=True)
             return
 
         embed = discord.Embed(
@@ -139,14 +283,16 @@ class EconomySystem(commands.Cog):
                 rank_text += f"**{i + 1}.** {member.mention} - Nível **{user_data['level']}**\n"
         
         embed.description = rank_text
-        await interaction.response.send_message(embed=embed)
+        await interaction.followup.send(embed=embed)
         
     @app_commands.command(name="topcoins", description="Mostra o ranking de usuários por moedas.")
     async def topcoins_command(self, interaction: discord.Interaction):
-        leaderboard = await self.users_collection.find({'guild_id': str(interaction.guild.id)}).sort('coins', -1).limit(10).to_list(10)
+        await interaction.response.defer()
+        await self._flush_for_ranking()
+        leaderboard = await self.users_collection.leaderboard(str(interaction.guild.id), 'coins')
 
         if not leaderboard:
-            await interaction.response.send_message("Não há dados de ranking neste servidor ainda.", ephemeral=True)
+            await interaction.followup.send("Não há dados de ranking neste servidor ainda.", ephemeral=True)
             return
 
         embed = discord.Embed(
@@ -161,7 +307,7 @@ class EconomySystem(commands.Cog):
                 rank_text += f"**{i + 1}.** {member.mention} - {user_data['coins']} moedas\n"
 
         embed.description = rank_text
-        await interaction.response.send_message(embed=embed)
+        await interaction.followup.send(embed=embed)
     
 async def setup(bot, db_client):
     """Adiciona o cog de economia ao bot."""
@@ -4,6 +4,11 @@ from discord import app_commands
 from pymongo import MongoClient
 import os
 import asyncio
+from utils.index_manager import declare_index
+
+# Índices das consultas deste módulo (criados na inicialização)
+declare_index('help', 'bot_data', 'help_commands', [('command_name', 1)])
+declare_index('help', 'bot_data', 'help_commands', [('category', 1)])
 
 class HelpView(discord.ui.View):
     def __init__(self, bot, help_data):
@@ -87,13 +92,13 @@ class HelpCommand(commands.Cog):
         self.bot = bot
         self.help_data = {}
         
-    @commands.Cog.listener()
-    async def on_ready(self):
+    async def cog_load(self):
+        # Carrega os dados de ajuda uma única vez, e não a cada reconexão
         await self._load_help_data_from_db()
         
     async def _load_help_data_from_db(self):
         self.help_data = {}
-        collection = self.bot.db_client.giveaway_database.help_commands
+        collection = self.bot.repos.help_commands
         
         async for doc in collection.find():
             category = doc.get('category')
@@ -118,7 +123,7 @@ class HelpCommand(commands.Cog):
     @app_commands.check(lambda interaction: str(interaction.user.id) == interaction.client.config.get('owner_id'))
     @app_commands.describe(category="A categoria do comando.", command_name="O nome do comando (ex: ban).", description="A descrição do comando.")
     async def add_help_entry(self, interaction: discord.Interaction, category: str, command_name: str, description: str):
-        collection = self.bot.db_client.giveaway_database.help_commands
+        collection = self.bot.repos.help_commands
         
         # Garante que o nome do comando seja salvo sem barras extras
         command_name = command_name.lstrip('/')
@@ -147,7 +152,7 @@ class HelpCommand(commands.Cog):
     async def sync_help_command(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
 
-        collection = self.bot.db_client.giveaway_database.help_commands
+        collection = self.bot.repos.help_commands
         
         all_commands = []
         for cmd in self.bot.tree.get_commands():
@@ -195,7 +200,7 @@ class HelpCommand(commands.Cog):
     async def remove_help_category(self, interaction: discord.Interaction, category: str):
         await interaction.response.defer(ephemeral=True)
 
-        collection = self.bot.db_client.giveaway_database.help_commands
+        collection = self.bot.repos.help_commands
         
         if category not in self.help_data:
             await interaction.followup.send(f"❌ A categoria `{category}` não existe no menu de ajuda.")
@@ -215,7 +220,7 @@ class HelpCommand(commands.Cog):
     async def clean_help_category(self, interaction: discord.Interaction, category: str):
         await interaction.response.defer(ephemeral=True)
 
-        collection = self.bot.db_client.giveaway_database.help_commands
+        collection = self.bot.repos.help_commands
 
         if category not in self.help_data:
             await interaction.followup.send(f"❌ A categoria `{category}` não existe no menu de ajuda. Nada a ser limpo.")
@@ -240,7 +245,7 @@ class HelpCommand(commands.Cog):
     @app_commands.describe(categoria_origem="A categoria de onde os comandos serão movidos.", categoria_destino="A categoria para onde os comandos serão enviados.")
     async def move_commands(self, interaction: discord.Interaction, categoria_origem: str, categoria_destino: str):
         await interaction.response.defer(ephemeral=True)
-        collection = self.bot.db_client.giveaway_database.help_commands
+        collection = self.bot.repos.help_commands
 
         result = await collection.update_many(
             {"category": categoria_origem},
@@ -255,7 +260,7 @@ class HelpCommand(commands.Cog):
     @app_commands.describe(nome_comando="O nome do comando a ser movido.", nova_categoria="A nova categoria do comando.")
     async def move_specific_command(self, interaction: discord.Interaction, nome_comando: str, nova_categoria: str):
         await interaction.response.defer(ephemeral=True)
-        collection = self.bot.db_client.giveaway_database.help_commands
+        collection = self.bot.repos.help_commands
         
         nome_comando = nome_comando.lstrip('/')
 
@@ -274,7 +279,7 @@ class HelpCommand(commands.Cog):
     @app_commands.check(lambda interaction: str(interaction.user.id) == interaction.client.config.get('owner_id'))
     async def reorganize_help_command(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
-        collection = self.bot.db_client.giveaway_database.help_commands
+        collection = self.bot.repos.help_commands
 
         updated_count = 0
         
@@ -307,7 +312,7 @@ class HelpCommand(commands.Cog):
     @app_commands.check(lambda interaction: str(interaction.user.id) == interaction.client.config.get('owner_id'))
     async def fix_slashes(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
-        collection = self.bot.db_client.giveaway_database.help_commands
+        collection = self.bot.repos.help_commands
 
         corrected_count = 0
         
@@ -331,7 +336,7 @@ class HelpCommand(commands.Cog):
     @app_commands.describe(nome_comando="O nome do comando a ser removido (ex: ban).")
     async def remove_command_entry(self, interaction: discord.Interaction, nome_comando: str):
         await interaction.response.defer(ephemeral=True)
-        collection = self.bot.db_client.giveaway_database.help_commands
+        collection = self.bot.repos.help_commands
 
         # Remove barras extras para garantir que a busca funcione
         nome_comando = nome_comando.lstrip('/')
@@ -350,7 +355,7 @@ class HelpCommand(commands.Cog):
     @app_commands.check(lambda interaction: str(interaction.user.id) == interaction.client.config.get('owner_id'))
     async def fix_all_help_entries(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
-        collection = self.bot.db_client.giveaway_database.help_commands
+        collection = self.bot.repos.help_commands
 
         # 1. Obter todos os documentos e limpar as barras extras
         cleaned_docs = {}
@@ -376,4 +381,4 @@ class HelpCommand(commands.Cog):
 
 def setup(bot):
     bot.add_cog(HelpCommand(bot))
-    print("Módulo de ajuda carregado.")
\ No newline at end of file
+    bot.logger.info("Módulo de ajuda carregado.")
\ No newline at end of file
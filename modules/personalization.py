@@ -6,12 +6,17 @@ from discord.utils import get
 import logging
 from typing import Optional, Union
 from motor.motor_asyncio import AsyncIOMotorClient
-from motor.core import AgnosticCollection
-import asyncio
+from database.repositories import Repository
+from utils.index_manager import declare_index
 
 # Configuração de logging para este módulo
 logger = logging.getLogger(__name__)
 
+# Índices das coleções de personalização (criados na inicialização)
+declare_index('personalization', 'bot_data', 'profiles', [('user_id', 1)], unique=True)
+declare_index('personalization', 'bot_data', 'shop_items', [('item_id', 1)], unique=True)
+declare_index('personalization', 'bot_data', 'user_inventory', [('user_id', 1), ('item_id', 1)], unique=True)
+
 # --- Checks personalizados ---
 def is_bot_owner():
     """Verifica se o usuário que executou o comando é o proprietário do bot."""
@@ -20,7 +25,7 @@ def is_bot_owner():
     return app_commands.check(predicate)
 
 # --- Funções de Ajuda ---
-async def get_or_create_profile(collection: AgnosticCollection, user_id: int):
+async def get_or_create_profile(collection: Repository, user_id: int):
     """Obtém o perfil do usuário ou cria um novo se não existir."""
     profile = await collection.find_one({"user_id": user_id})
     if not profile:
@@ -36,7 +41,7 @@ async def get_or_create_profile(collection: AgnosticCollection, user_id: int):
         await collection.insert_one(profile)
     return profile
 
-async def get_profile_embed(member: discord.Member, profiles: AgnosticCollection, shop: AgnosticCollection):
+async def get_profile_embed(member: discord.Member, profiles: Repository, shop: Repository):
     """Cria o embed do perfil com base nos dados do usuário."""
     profile_data = await get_or_create_profile(profiles, member.id)
     
@@ -66,7 +71,7 @@ async def get_profile_embed(member: discord.Member, profiles: AgnosticCollection
     
     return embed
 
-async def _use_item(interaction: discord.Interaction, item_id: int, profiles: AgnosticCollection, inventory: AgnosticCollection, shop: AgnosticCollection):
+async def _use_item(interaction: discord.Interaction, item_id: int, profiles: Repository, inventory: Repository, shop: Repository):
     """Lógica unificada para usar um item do inventário."""
     inventory_item = await inventory.find_one({"user_id": interaction.user.id, "item_id": item_id})
     if not inventory_item:
@@ -119,7 +124,7 @@ class ProfileView(View):
     @discord.ui.button(label="Ver Inventário", style=discord.ButtonStyle.secondary)
     async def view_inventory_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer(ephemeral=False)
-        inventory_items_cursor = self.inventory_collection.find({"user_id": interaction.user.id})
+        inventory_items_cursor = self.inventory_collection.find({"user_id": interaction.user.id}, ["item_id"])
         inventory_item_ids = [item['item_id'] for item in await inventory_items_cursor.to_list(length=None)]
         
         shop_items_cursor = self.shop_collection.find({"item_id": {"$in": inventory_item_ids}})
@@ -216,7 +221,7 @@ class ShopView(View):
         await interaction.response.send_modal(BuyModal(self.profiles_collection, self.inventory_collection, self.shop_collection))
 
 class BuyModal(discord.ui.Modal, title="Comprar Item"):
-    def __init__(self, profiles: AgnosticCollection, inventory: AgnosticCollection, shop: AgnosticCollection):
+    def __init__(self, profiles: Repository, inventory: Repository, shop: Repository):
         super().__init__()
         self.profiles_collection = profiles
         self.inventory_collection = inventory
@@ -338,7 +343,7 @@ class InventoryView(View):
         await interaction.response.send_modal(UseModal(self.profiles_collection, self.inventory_collection, self.shop_collection))
 
 class UseModal(discord.ui.Modal, title="Usar Item"):
-    def __init__(self, profiles: AgnosticCollection, inventory: AgnosticCollection, shop: AgnosticCollection):
+    def __init__(self, profiles: Repository, inventory: Repository, shop: Repository):
         super().__init__()
         self.profiles_collection = profiles
         self.inventory_collection = inventory
@@ -360,23 +365,10 @@ class UseModal(discord.ui.Modal, title="Usar Item"):
 class Personalization(commands.Cog):
     def __init__(self, bot: commands.Bot, db_client: AsyncIOMotorClient):
         self.bot = bot
-        self.db = db_client.mydatabase
-        self.profiles_collection = self.db.profiles
-        self.shop_collection = self.db.shop_items
-        self.inventory_collection = self.db.user_inventory
-
-        # Cria os índices do banco de dados para otimização
-        asyncio.create_task(self.setup_db_indexes())
-
-    async def setup_db_indexes(self):
-        """Cria índices para otimização de consultas nas coleções."""
-        try:
-            await self.profiles_collection.create_index([("user_id", 1)], unique=True)
-            await self.shop_collection.create_index([("item_id", 1)], unique=True)
-            await self.inventory_collection.create_index([("user_id", 1), ("item_id", 1)], unique=True)
-            logger.info("Índices do MongoDB para personalização criados com sucesso.")
-        except Exception as e:
-            logger.error(f"Erro ao criar índices do MongoDB: {e}", exc_info=True)
+        # Os repositórios têm a mesma interface das coleções, então as views continuam recebendo-os igual
+        self.profiles_collection = bot.repos.profiles
+        self.shop_collection = bot.repos.shop_items
+        self.inventory_collection = bot.repos.user_inventory
 
     @app_commands.command(name="perfil", description="Veja seu perfil personalizado ou o de outro usuário.")
     @app_commands.describe(membro="O membro cujo perfil você quer ver (opcional).")
@@ -406,7 +398,7 @@ class Personalization(commands.Cog):
     @app_commands.command(name="inventario", description="Veja todos os seus itens do inventário.")
     async def inventory_command(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=False)
-        inventory_items_cursor = self.inventory_collection.find({"user_id": interaction.user.id})
+        inventory_items_cursor = self.inventory_collection.find({"user_id": interaction.user.id}, ["item_id"])
         inventory_item_ids = [item['item_id'] for item in await inventory_items_cursor.to_list(length=None)]
         
         shop_items_cursor = self.shop_collection.find({"item_id": {"$in": inventory_item_ids}})
@@ -2,22 +2,19 @@ import discord
 from discord.ext import commands
 from discord import app_commands, ui
 import datetime
-from database.database import get_collection
 from bson import ObjectId
-import asyncio
-import os
-import asyncio
-
-async def handle_rate_limit(func, *args, **kwargs):
-    try:
-        return await func(*args, **kwargs)
-    except discord.errors.HTTPException as e:
-        if e.status == 429:
-            print("Rate limit atingido. Esperando...")
-            await asyncio.sleep(e.retry_after)
-            return await handle_rate_limit(func, *args, **kwargs)
-        else:
-            raise e
+from utils.rest_executor import PRIORITY_COSMETIC
+from utils.sharding import owned_guilds_filter
+from utils.index_manager import declare_index
+import io
+
+# Índices das consultas deste módulo (criados na inicialização)
+declare_index('tickets', 'bot_data', 'ticket_panels', [('guild_id', 1)])
+declare_index('tickets', 'bot_data', 'tickets', [('guild_id', 1), ('channel_id', 1)])
+
+async def mark_ticket_closed(bot, guild_id: int, channel_id: int):
+    """Marca o ticket como fechado, guardando quando foi fechado (o registro é mantido)."""
+    await bot.repos.tickets.mark_closed(guild_id, channel_id, datetime.datetime.utcnow())
 
 class TicketButton(discord.ui.Button):
     def __init__(self, bot):
@@ -52,7 +49,6 @@ class TicketModal(ui.Modal, title="Abrir Ticket"):
         await interaction.response.defer(ephemeral=True)
 
         guild_id = interaction.guild_id
-        collection = get_collection(self.bot.db_client, f"tickets_{guild_id}")
         
         channel_name = f"ticket-{interaction.user.name.lower().replace(' ', '-')}"
         
@@ -66,7 +62,8 @@ class TicketModal(ui.Modal, title="Abrir Ticket"):
             interaction.guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True)
         }
 
-        ticket_channel = await handle_rate_limit(interaction.guild.create_text_channel,
+        ticket_channel = await self.bot.rest.run(interaction.guild.create_text_channel,
+            guild_id=guild_id,
             name=channel_name,
             category=ticket_category,
             overwrites=overwrites
@@ -91,9 +88,9 @@ class TicketModal(ui.Modal, title="Abrir Ticket"):
         ticket_embed.set_footer(text=f"Ticket ID: {interaction.user.id}")
 
         view = TicketView(self.bot)
-        initial_message = await handle_rate_limit(ticket_channel.send, embed=ticket_embed, view=view)
+        initial_message = await self.bot.rest.run(ticket_channel.send, embed=ticket_embed, view=view, guild_id=guild_id)
         
-        await collection.insert_one({
+        await self.bot.repos.tickets.insert_one({
             "channel_id": ticket_channel.id,
             "user_id": interaction.user.id,
             "guild_id": guild_id,
@@ -121,20 +118,20 @@ class TicketView(discord.ui.View):
         async for message in interaction.channel.history(limit=100, oldest_first=True):
             transcript += f"[{message.created_at.strftime('%Y-%m-%d %H:%M:%S')}] {message.author.name}: {message.content}\n"
 
+        # Monta o arquivo na memória para não bloquear o event loop com escrita em disco
         file_name = f"ticket_{interaction.channel.id}_transcript.txt"
-        with open(file_name, "w", encoding="utf-8") as f:
-            f.write(transcript)
+        transcript_bytes = transcript.encode("utf-8")
 
         ticket_owner = interaction.guild.get_member(int(interaction.channel.topic)) if interaction.channel.topic else None
         
         try:
             if ticket_owner:
-                await handle_rate_limit(ticket_owner.send, f"Aqui está a transcrição do seu ticket no servidor {interaction.guild.name}:", file=discord.File(file_name))
+                await self.bot.rest.run(ticket_owner.send, f"Aqui está a transcrição do seu ticket no servidor {interaction.guild.name}:", file=discord.File(io.BytesIO(transcript_bytes), filename=file_name), priority=PRIORITY_COSMETIC)
         except discord.Forbidden:
             pass
         
+        await mark_ticket_closed(self.bot, interaction.guild_id, interaction.channel.id)
         await interaction.channel.delete()
-        os.remove(file_name)
 
 class PanelTicketView(discord.ui.View):
     def __init__(self, bot):
@@ -150,7 +147,7 @@ class TicketModule(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.bot_id = self.bot.user.id
-        self.panel_collection = get_collection(self.bot.db_client, "ticket_panels")
+        self.panel_collection = self.bot.repos.ticket_panels
         
     async def get_panel_data(self, guild_id: int):
         data = await self.panel_collection.find_one({"guild_id": guild_id})
@@ -218,7 +215,7 @@ class TicketModule(commands.Cog):
                         upsert=True
                     )
                 except Exception as e:
-                    print(f"Erro ao salvar o painel no MongoDB: {e}")
+                    self.bot.logger.error(f"Erro ao salvar o painel no MongoDB: {e}")
 
         await interaction.response.send_modal(PanelModal(self.bot, self.panel_collection))
 
@@ -235,20 +232,20 @@ class TicketModule(commands.Cog):
         async for message in interaction.channel.history(limit=None, oldest_first=True):
             transcript += f"[{message.created_at.strftime('%Y-%m-%d %H:%M:%S')}] {message.author.name}: {message.content}\n"
 
+        # Monta o arquivo na memória para não bloquear o event loop com escrita em disco
         file_name = f"ticket_{interaction.channel.id}_transcript.txt"
-        with open(file_name, "w", encoding="utf-8") as f:
-            f.write(transcript)
+        transcript_bytes = transcript.encode("utf-8")
 
         ticket_owner = interaction.guild.get_member(int(interaction.channel.topic)) if interaction.channel.topic else None
         
         try:
             if ticket_owner:
-                await ticket_owner.send(f"Aqui está a transcrição do seu ticket no servidor {interaction.guild.name}:", file=discord.File(file_name))
+                await ticket_owner.send(f"Aqui está a transcrição do seu ticket no servidor {interaction.guild.name}:", file=discord.File(io.BytesIO(transcript_bytes), filename=file_name))
         except discord.Forbidden:
             pass
         
+        await mark_ticket_closed(self.bot, interaction.guild_id, interaction.channel.id)
         await interaction.channel.delete()
-        os.remove(file_name)
 
     @app_commands.command(name="editar_ticket", description="Edita a mensagem inicial de um ticket.")
     @app_commands.checks.has_permissions(manage_channels=True)
@@ -257,8 +254,7 @@ class TicketModule(commands.Cog):
             await interaction.response.send_message("Este comando só pode ser usado em um canal de ticket.", ephemeral=True)
             return
 
-        ticket_collection = get_collection(self.bot.db_client, f"tickets_{interaction.guild_id}")
-        ticket_data = await ticket_collection.find_one({"channel_id": interaction.channel_id})
+        ticket_data = await self.bot.repos.tickets.get_by_channel(interaction.guild_id, interaction.channel_id, ['initial_message_id'])
 
         if not ticket_data or not ticket_data.get("initial_message_id"):
             await interaction.response.send_message("Não foi possível encontrar a mensagem inicial deste ticket.", ephemeral=True)
@@ -281,9 +277,14 @@ async def setup(bot: commands.Bot):
     # Carrega a View do botão de fechar para todos os tickets
     bot.add_view(TicketView(bot))
     
-    # Carrega os painéis de tickets salvos no banco de dados e os recria
-    collection = get_collection(bot.db_client, "ticket_panels")
-    async for panel_data in collection.find():
+    # Os painéis dependem do cache de canais, então são recriados depois que o bot fica pronto
+    bot.loop.create_task(restore_ticket_panels(bot))
+
+async def restore_ticket_panels(bot: commands.Bot):
+    """Carrega os painéis de tickets salvos no banco de dados e os recria."""
+    await bot.wait_until_ready()
+    collection = bot.repos.ticket_panels
+    async for panel_data in collection.find(owned_guilds_filter(bot)):
         try:
             channel = bot.get_channel(panel_data["channel_id"])
             if channel:
@@ -311,4 +312,4 @@ async def setup(bot: commands.Bot):
                         {"$set": {"message_id": message.id}}
                     )
         except Exception as e:
-            print(f"Erro ao carregar o painel de ticket da guilda {panel_data.get('guild_id')}: {e}")
\ No newline at end of file
+            bot.logger.error(f"Erro ao carregar o painel de ticket da guilda {panel_data.get('guild_id')}: {e}")
\ No newline at end of file
@@ -1,9 +1,14 @@
 import discord
 from discord.ext import commands
 from discord import app_commands, ui, TextStyle
-from database.database import get_collection
 from discord.ui import Modal, TextInput
 from discord.errors import Forbidden
+from utils.join_pipeline import STAGE_WELCOME
+from utils.rest_executor import PRIORITY_COSMETIC
+from utils.index_manager import declare_index
+
+# Índices das consultas deste módulo (criados na inicialização)
+declare_index('welcome_goodbye', 'bot_data', 'welcome_goodbye_configs', [('guild_id', 1)])
 
 # -----------------
 # CLASSES MODAIS
@@ -68,9 +73,6 @@ class WelcomeModal(Modal, title="Configurar Mensagem de Boas-Vindas"):
         welcome_data['welcome_color'] = extras[0] if len(extras) > 0 and extras[0].startswith('#') else None
         welcome_data['welcome_image_url'] = extras[1] if len(extras) > 1 and extras[1].startswith('http') else None
 
-        # Armazena os dados no banco de dados
-        collection = get_collection(interaction.client.db_client, 'welcome_goodbye_configs')
-        
         # Converte a cor HEX para inteiro para o preview
         try:
             color = int(welcome_data['welcome_color'].replace('#', ''), 16) if welcome_data['welcome_color'] else discord.Color.blue().value
@@ -93,14 +95,12 @@ class WelcomeModal(Modal, title="Configurar Mensagem de Boas-Vindas"):
         await interaction.followup.send("✅ Configurações de boas-vindas salvas com sucesso!", ephemeral=True)
         await interaction.followup.send(embed=preview_embed, ephemeral=True)
 
-        await collection.update_one(
-            {'guild_id': guild_id},
-            {'$set': {
-                'welcome_channel_id': channel_id,
-                'welcome_data': welcome_data
-            }},
-            upsert=True
-        )
+        # Armazena os dados no banco de dados
+        await interaction.client.repos.guild_config('welcome_goodbye_configs').save(guild_id, {
+            'welcome_channel_id': channel_id,
+            'welcome_data': welcome_data
+        })
+        interaction.client.config_cache.invalidate('welcome_goodbye_configs', guild_id)
 
 class GoodbyeModal(Modal, title="Configurar Mensagem de Despedida"):
     
@@ -162,9 +162,6 @@ class GoodbyeModal(Modal, title="Configurar Mensagem de Despedida"):
         goodbye_data['goodbye_color'] = extras[0] if len(extras) > 0 and extras[0].startswith('#') else None
         goodbye_data['goodbye_image_url'] = extras[1] if len(extras) > 1 and extras[1].startswith('http') else None
 
-        # Armazena os dados no banco de dados
-        collection = get_collection(interaction.client.db_client, 'welcome_goodbye_configs')
-        
         # Converte a cor HEX para inteiro para o preview
         try:
             color = int(goodbye_data['goodbye_color'].replace('#', ''), 16) if goodbye_data['goodbye_color'] else discord.Color.red().value
@@ -187,14 +184,12 @@ class GoodbyeModal(Modal, title="Configurar Mensagem de Despedida"):
         await interaction.followup.send("✅ Configurações de despedida salvas com sucesso!", ephemeral=True)
         await interaction.followup.send(embed=preview_embed, ephemeral=True)
 
-        await collection.update_one(
-            {'guild_id': guild_id},
-            {'$set': {
-                'goodbye_channel_id': channel_id,
-                'goodbye_data': goodbye_data
-            }},
-            upsert=True
-        )
+        # Armazena os dados no banco de dados
+        await interaction.client.repos.guild_config('welcome_goodbye_configs').save(guild_id, {
+            'goodbye_channel_id': channel_id,
+            'goodbye_data': goodbye_data
+        })
+        interaction.client.config_cache.invalidate('welcome_goodbye_configs', guild_id)
 
 # -----------------
 # CLASSES DOS BOTÕES E VIEW
@@ -238,10 +233,17 @@ class WelcomeGoodbyeModule(commands.Cog):
         view = ConfigPanelView(self.bot)
         await interaction.response.send_message(embed=embed, view=view)
 
-    @commands.Cog.listener()
-    async def on_member_join(self, member: discord.Member):
-        config_collection = get_collection(self.bot.db_client, 'welcome_goodbye_configs')
-        guild_config = await config_collection.find_one({'guild_id': member.guild.id})
+    async def cog_load(self):
+        # As boas-vindas são o último estágio: só saem depois da quarentena e do autorole
+        self.bot.join_pipeline.register('welcome', STAGE_WELCOME, self.welcome_stage)
+
+    async def cog_unload(self):
+        self.bot.join_pipeline.unregister('welcome')
+
+    async def welcome_stage(self, ctx):
+        """Estágio de boas-vindas da entrada de membros."""
+        member = ctx.member
+        guild_config = await ctx.config('welcome_goodbye_configs')
 
         if not guild_config or not guild_config.get('welcome_channel_id'):
             return
@@ -270,15 +272,15 @@ class WelcomeGoodbyeModule(commands.Cog):
             embed.set_footer(text=welcome_data.get('welcome_footer'))
 
         try:
-            await channel.send(content=personalized_message, embed=embed)
+            await ctx.rest.run(channel.send, content=personalized_message, embed=embed, guild_id=member.guild.id, priority=PRIORITY_COSMETIC)
+            ctx.actions.append('welcome')
         except Forbidden:
-            print(f"Erro: Sem permissão para enviar mensagem no canal {channel.name} no servidor {member.guild.name}.")
+            self.bot.logger.warning(f"Sem permissão para enviar mensagem no canal {channel.name} no servidor {member.guild.name}.")
 
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
-        config_collection = get_collection(self.bot.db_client, 'welcome_goodbye_configs')
-        guild_config = await config_collection.find_one({'guild_id': member.guild.id})
+        guild_config = await self.bot.config_cache.get('welcome_goodbye_configs', member.guild.id)
 
         if not guild_config or not guild_config.get('goodbye_channel_id'):
             return
@@ -307,9 +309,9 @@ class WelcomeGoodbyeModule(commands.Cog):
             embed.set_footer(text=goodbye_data.get('goodbye_footer'))
 
         try:
-            await channel.send(content=personalized_message, embed=embed)
+            await self.bot.rest.run(channel.send, content=personalized_message, embed=embed, guild_id=member.guild.id, priority=PRIORITY_COSMETIC)
         except Forbidden:
-            print(f"Erro: Sem permissão para enviar mensagem no canal {channel.name} no servidor {member.guild.name}.")
+            self.bot.logger.warning(f"Sem permissão para enviar mensagem no canal {channel.name} no servidor {member.guild.name}.")
 
 
 async def setup(bot: commands.Bot):
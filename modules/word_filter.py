@@ -0,0 +1,151 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+import collections
+from utils.message_pipeline import STAGE_FILTER
+from utils.rest_executor import PRIORITY_COSMETIC
+from utils.word_automaton import WordAutomaton, normalize_filter_text
+from utils.index_manager import declare_index
+
+declare_index('word_filter', 'bot_data', 'word_filter_configs', [('guild_id', 1)])
+
+MAX_TERMS = 500
+MAX_TERM_LENGTH = 50
+
+
+class WordFilter(commands.Cog):
+    """
+    Filtro de palavras bloqueadas por servidor. A lista fica em `word_filter_configs` e é compilada
+    num autômato de Aho–Corasick, guardado em memória até a configuração mudar.
+    """
+    filtro = app_commands.Group(
+        name="filtro-palavras",
+        description="Gerencia as palavras bloqueadas deste servidor.",
+        default_permissions=discord.Permissions(manage_messages=True),
+        guild_only=True
+    )
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._automata = {}  # {guild_id: (documento de configuração, autômato)}
+        self.hits = collections.defaultdict(collections.Counter)  # {guild_id: {termo: ocorrências}} desde que o bot iniciou
+
+    async def cog_load(self):
+        self.bot.message_pipeline.register('word_filter', STAGE_FILTER, self.word_filter_stage)
+
+    async def cog_unload(self):
+        self.bot.message_pipeline.unregister('word_filter')
+
+    def automaton(self, guild_id: int, config: dict) -> WordAutomaton:
+        """Autômato da configuração atual; só é recompilado quando o cache devolve outro documento."""
+        cached = self._automata.get(guild_id)
+        if cached and cached[0] is config:
+            return cached[1]
+        automaton = WordAutomaton(config.get('terms', []))
+        self._automata[guild_id] = (config, automaton)
+        return automaton
+
+    async def word_filter_stage(self, ctx):
+        """Estágio de filtro: apaga mensagens com termos bloqueados, numa única passada pelo texto."""
+        message = ctx.message
+        if not message.content:
+            return
+        config = await ctx.config('word_filter_configs')
+        if not config or not config.get('enabled') or not config.get('terms'):
+            return
+
+        found = self.automaton(message.guild.id, config).find(message.content)
+        if not found:
+            return
+        if ctx.dry_run:
+            ctx.stop()
+            return
+
+        self.hits[message.guild.id].update(found)
+        try:
+            await ctx.rest.run(message.delete, route=f"delete_message:{message.channel.id}")
+            await ctx.rest.run(message.channel.send, f"❌ {message.author.mention}, sua mensagem contém uma palavra bloqueada neste servidor.", delete_after=5, guild_id=ctx.guild_id, priority=PRIORITY_COSMETIC)
+            ctx.stop()  # Não verifica anti-spam nem dá XP
+        except discord.NotFound:
+            ctx.stop()
+        except discord.errors.Forbidden:
+            self.bot.logger.warning(f"Sem permissão para excluir mensagens no canal {message.channel.name}.")
+
+    async def _save(self, guild_id: int, values: dict):
+        await self.bot.repos.guild_config('word_filter_configs').save(guild_id, values)
+        self.bot.config_cache.invalidate('word_filter_configs', guild_id)
+
+    @filtro.command(name="adicionar", description="Bloqueia um ou mais termos (separados por vírgula).")
+    @app_commands.describe(termos="Os termos a bloquear, separados por vírgula.")
+    async def adicionar(self, interaction: discord.Interaction, termos: str):
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        config = await self.bot.repos.guild_config('word_filter_configs').get(interaction.guild.id) or {}
+        terms = list(config.get('terms', []))
+
+        added = []
+        for term in termos.split(','):
+            term = normalize_filter_text(term)
+            if not term or term in terms or term in added:
+                continue
+            if len(term) > MAX_TERM_LENGTH:
+                await interaction.followup.send(f"❌ Os termos podem ter no máximo {MAX_TERM_LENGTH} caracteres.", ephemeral=True)
+                return
+            added.append(term)
+        if len(terms) + len(added) > MAX_TERMS:
+            await interaction.followup.send(f"❌ O limite é de {MAX_TERMS} termos por servidor.", ephemeral=True)
+            return
+        if not added:
+            await interaction.followup.send("Nenhum termo novo para adicionar.", ephemeral=True)
+            return
+
+        await self._save(interaction.guild.id, {'terms': terms + added, 'enabled': config.get('enabled', True)})
+        await interaction.followup.send(f"✅ {len(added)} termo(s) bloqueado(s): {', '.join(f'`{term}`' for term in added)}", ephemeral=True)
+
+    @filtro.command(name="remover", description="Desbloqueia um ou mais termos (separados por vírgula).")
+    @app_commands.describe(termos="Os termos a desbloquear, separados por vírgula.")
+    async def remover(self, interaction: discord.Interaction, termos: str):
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        config = await self.bot.repos.guild_config('word_filter_configs').get(interaction.guild.id) or {}
+        removed = {normalize_filter_text(term) for term in termos.split(',')}
+        terms = [term for term in config.get('terms', []) if term not in removed]
+        if len(terms) == len(config.get('terms', [])):
+            await interaction.followup.send("Nenhum desses termos estava bloqueado.", ephemeral=True)
+            return
+
+        await self._save(interaction.guild.id, {'terms': terms})
+        for term in removed:
+            self.hits[interaction.guild.id].pop(term, None)
+        await interaction.followup.send(f"✅ {len(config.get('terms', [])) - len(terms)} termo(s) desbloqueado(s).", ephemeral=True)
+
+    @filtro.command(name="ativar", description="Ativa ou desativa o filtro de palavras.")
+    @app_commands.describe(ativo="Se o filtro deve apagar as mensagens com termos bloqueados.")
+    async def ativar(self, interaction: discord.Interaction, ativo: bool):
+        await self._save(interaction.guild.id, {'enabled': ativo})
+        await interaction.response.send_message(f"✅ O filtro de palavras foi {'ativado' if ativo else 'desativado'}.", ephemeral=True)
+
+    @filtro.command(name="listar", description="Mostra os termos bloqueados e quantas mensagens cada um apagou.")
+    async def listar(self, interaction: discord.Interaction):
+        config = await self.bot.config_cache.get('word_filter_configs', interaction.guild.id)
+        terms = (config or {}).get('terms', [])
+        if not terms:
+            await interaction.response.send_message("Nenhum termo bloqueado neste servidor.", ephemeral=True)
+            return
+
+        hits = self.hits[interaction.guild.id]
+        ordered = sorted(terms, key=lambda term: (-hits[term], term))
+        lines = [f"`{term}` — {hits[term]}" for term in ordered]
+        description = "\n".join(lines)
+        if len(description) > 4000:
+            description = description[:4000].rsplit("\n", 1)[0] + "\n…"
+
+        embed = discord.Embed(
+            title="🚫 Palavras bloqueadas",
+            description=description,
+            color=discord.Color.red() if config.get('enabled') else discord.Color.dark_grey()
+        )
+        embed.set_footer(text=f"{len(terms)} termo(s) | Filtro {'ativo' if config.get('enabled') else 'desativado'} | Ocorrências desde o último reinício")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(WordFilter(bot))
@@ -0,0 +1,21 @@
+from utils.content_fingerprint import DuplicateContentDetector, normalize_content
+
+
+def test_normalize_strips_punctuation_case_and_accents():
+    assert normalize_content("Bom dia, pessoal!") == normalize_content("bom dia pessoal")
+    assert normalize_content("PARABÉNS!!!") == "parabens"
+
+
+def test_short_messages_are_ignored():
+    detector = DuplicateContentDetector()
+    for user_id, content in enumerate(["parabéns!!!!!!!!", "PARABÉNS!!!!!!!!!", "alguém vai jogar hoje"]):
+        assert detector.check(1, user_id, content, now=user_id)[0] <= 1
+
+
+def test_counts_distinct_users_and_repeats():
+    detector = DuplicateContentDetector()
+    content = "Entrem todos no servidor novo agora mesmo!!"
+    assert detector.check(1, 1, content, now=0) == (1, 1)
+    assert detector.check(1, 2, content.upper(), now=1) == (2, 1)
+    assert detector.check(1, 1, content, now=2) == (2, 2)
+    assert detector.check(1, 3, content, now=500) == (1, 1)  # Fora da janela
@@ -0,0 +1,28 @@
+from utils.link_filter import LinkPolicy, SuffixTrie, extract_hosts
+
+
+def test_prose_is_not_a_link():
+    assert extract_hosts("Traga frutas, e.g. banana.") == set()
+    assert extract_hosts("Mandei o arquivo.txt no canal") == set()
+    assert extract_hosts("Acabou.Depois eu volto") == set()
+
+
+def test_capitalised_tld_with_path_is_a_link():
+    assert extract_hosts("entrem em discord.Gg/abc") == {'discord.gg'}
+    assert extract_hosts("https://Discord.Gg/abc") == {'discord.gg'}
+
+
+def test_blocked_domain_is_a_link_even_capitalised():
+    assert extract_hosts("olha x.Com") == set()
+    assert extract_hosts("olha x.Com", SuffixTrie(['x.com'])) == {'x.com'}
+    policy = LinkPolicy({'blocked_domains': ['x.com'], 'block_unlisted': False})
+    assert policy.blocked_hosts("olha x.Com") == ['x.com']
+
+
+def test_unicode_hosts_without_scheme():
+    policy = LinkPolicy({'blocked_domains': ['bücher.de'], 'block_unlisted': False})
+    assert policy.blocked_hosts("compre em bücher.de/promo") == ['xn--bcher-kva.de']
+    # Homógrafo com "і" cirílico: não é o discord.gg permitido
+    policy = LinkPolicy({'allowed_domains': ['discord.gg']})
+    assert policy.blocked_hosts("entrem em dіscord.gg/abc") == ['xn--dscord-pvf.gg']
+    assert policy.blocked_hosts("entrem em discord.gg/abc") == []
@@ -0,0 +1,27 @@
+from utils.word_automaton import WordAutomaton, normalize_filter_text
+
+
+def test_finds_terms_followed_by_punctuation():
+    automaton = WordAutomaton(['merda', 'idiota'])
+    assert automaton.find('que merda!') == ['merda']
+    assert automaton.find('MERDA!!!') == ['merda']
+    assert automaton.find('seu idiota!') == ['idiota']
+
+
+def test_leet_symbols_inside_words():
+    assert normalize_filter_text('p!ranha') == 'piranha'
+    assert normalize_filter_text('a$$im') == 'assim'
+    assert normalize_filter_text('merd@') == 'merda'
+    assert normalize_filter_text('fim!') == 'fim!'
+
+
+def test_whole_words_only():
+    automaton = WordAutomaton(['ass'])
+    assert automaton.find('classe') == []
+    assert automaton.find('ASS') == ['ass']
+    assert automaton.find('@ss') == ['ass']
+
+
+def test_accents_and_leet_digits():
+    automaton = WordAutomaton(['bobão', 'palavra feia'])
+    assert automaton.find('b0b4o e p4l@vra FEIA') == ['bobao', 'palavra feia']
@@ -0,0 +1,118 @@
+import datetime
+import discord
+
+# O Discord só aceita exclusão em massa de até 100 mensagens com menos de 14 dias
+BULK_DELETE_LIMIT = 100
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14) - datetime.timedelta(minutes=5)  # Margem de segurança
+
+
+class DeletionJob:
+    """
+    Exclui mensagens de um canal usando a exclusão em massa sempre que possível.
+
+    As mensagens são consumidas de um iterador assíncrono (ex: `channel.history()`),
+    sem montar a lista inteira na memória. Mensagens recentes são apagadas em lotes de
+    até 100; as mais antigas que 14 dias são apagadas uma a uma pelo executor REST.
+    """
+    def __init__(self, bot, channel, check=None, progress_callback=None, reason: str = None, rest=None):
+        self.bot = bot
+        self.rest = rest or bot.rest  # Executor das exclusões (a simulação de raid passa o seu)
+        self.channel = channel
+        self.check = check  # Filtro opcional: só apaga mensagens em que check(message) é verdadeiro
+        self.progress_callback = progress_callback  # Corrotina chamada após cada lote: callback(job)
+        self.reason = reason
+        self.cancelled = False
+        self.scanned = 0
+        self.bulk_deleted = 0
+        self.single_deleted = 0
+        self.failed = 0
+
+    @property
+    def deleted(self) -> int:
+        return self.bulk_deleted + self.single_deleted
+
+    def cancel(self):
+        """Interrompe a exclusão após o lote atual."""
+        self.cancelled = True
+
+    async def run(self, messages) -> int:
+        """Apaga as mensagens do iterador (assíncrono ou uma lista) e retorna quantas foram excluídas."""
+        if not hasattr(messages, '__aiter__'):
+            messages = _iterate(messages)
+        cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        batch = []
+        async for message in messages:
+            if self.cancelled:
+                break
+            self.scanned += 1
+            if self.check and not self.check(message):
+                continue
+
+            if message.created_at < cutoff:
+                await self._delete_single(message)
+                continue
+
+            batch.append(message)
+            if len(batch) >= BULK_DELETE_LIMIT:
+                await self._delete_batch(batch)
+                batch = []
+
+        if batch and not self.cancelled:
+            await self._delete_batch(batch)
+        return self.deleted
+
+    async def _delete_batch(self, batch: list):
+        if len(batch) == 1 or not hasattr(self.channel, 'delete_messages'):
+            for message in batch:
+                await self._delete_single(message)
+        else:
+            try:
+                await self.rest.run(self.channel.delete_messages, batch, reason=self.reason, route=f"bulk_delete:{self.channel.id}")
+                self.bulk_deleted += len(batch)
+            except discord.NotFound:
+                # Alguma mensagem do lote já foi apagada; tenta as restantes individualmente
+                for message in batch:
+                    await self._delete_single(message)
+        await self._report_progress()
+
+    async def _delete_single(self, message):
+        try:
+            await self.rest.run(message.delete, route=f"delete_message:{self.channel.id}")
+            self.single_deleted += 1
+            if self.single_deleted % 10 == 0:
+                await self._report_progress()
+        except discord.NotFound:
+            pass  # Mensagem já foi excluída
+        except discord.Forbidden:
+            raise  # Sem permissão no canal: não adianta continuar
+        except discord.HTTPException:
+            self.failed += 1
+
+    async def _report_progress(self):
+        if self.progress_callback:
+            try:
+                await self.progress_callback(self)
+            except discord.HTTPException:
+                pass
+
+
+async def _iterate(messages):
+    for message in messages:
+        yield message
+
+
+class CancelDeletionView(discord.ui.View):
+    """View com um botão para cancelar uma exclusão em andamento."""
+    def __init__(self, job: DeletionJob, author_id: int):
+        super().__init__(timeout=600)
+        self.job = job
+        self.author_id = author_id
+
+    @discord.ui.button(label="Cancelar", style=discord.ButtonStyle.danger)
+    async def cancel_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Apenas quem iniciou a limpeza pode cancelá-la.", ephemeral=True)
+            return
+        self.job.cancel()
+        button.disabled = True
+        await interaction.response.edit_message(content=f"⏹️ Cancelando... {self.job.deleted} mensagens apagadas até agora.", view=self)
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import os
+from utils.web_service import build_status
+
+# O Discord permite uma identificação por bucket (shard_id % max_concurrency) a cada 5 segundos
+IDENTIFY_INTERVAL = 5.0
+
+
+def shard_ranges(shard_count: int, cluster_count: int) -> list:
+    """Divide os shards em `cluster_count` faixas contíguas, o mais equilibradas possível."""
+    cluster_count = max(1, min(cluster_count, shard_count))
+    base, extra = divmod(shard_count, cluster_count)
+    ranges, start = [], 0
+    for cluster_id in range(cluster_count):
+        size = base + (1 if cluster_id < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+def parse_address(address: str) -> tuple:
+    """Converte "host:porta" em (host, porta)."""
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+async def ipc_request(address: tuple, payload: dict, timeout: float = None) -> dict:
+    """Envia uma mensagem JSON (uma linha) ao launcher e espera a resposta na mesma conexão."""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(*address), 5)
+    try:
+        writer.write(json.dumps(payload).encode('utf-8') + b'\n')
+        await writer.drain()
+        line = await asyncio.wait_for(reader.readline(), timeout)
+        return json.loads(line) if line else {}
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+class ClusterClient:
+    """
+    Lado do worker na comunicação com o launcher (launcher.py).
+    Pede permissão antes de identificar cada shard e envia o status do processo periodicamente.
+    """
+    def __init__(self, bot, address: tuple, cluster_id: int, health_interval: float = 10.0):
+        self.bot = bot
+        self.address = address
+        self.cluster_id = cluster_id
+        self.health_interval = health_interval
+        self._task = None
+
+    @classmethod
+    def from_env(cls, bot):
+        """Cria o cliente se o processo foi iniciado pelo launcher (variável CLUSTER_IPC)."""
+        address = os.getenv('CLUSTER_IPC')
+        if not address:
+            return None
+        return cls(bot, parse_address(address), int(os.getenv('CLUSTER_ID', 0)))
+
+    async def before_identify(self, shard_id: int, initial: bool):
+        """Espera a vez do shard no bucket de identificação, coordenado entre todos os workers."""
+        try:
+            await ipc_request(self.address, {"op": "identify", "cluster_id": self.cluster_id, "shard_id": shard_id})
+        except (OSError, asyncio.TimeoutError, ValueError) as e:
+            # Sem o launcher, volta ao comportamento padrão do discord.py
+            self.bot.logger.warning(f"Launcher indisponível para identificar o shard {shard_id}: {e}")
+            if not initial:
+                await asyncio.sleep(IDENTIFY_INTERVAL)
+
+    def start(self):
+        """Inicia o envio periódico do status. Chamadas repetidas não criam outra tarefa."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._report_health())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _report_health(self):
+        while True:
+            payload = {"op": "health", "cluster_id": self.cluster_id, "pid": os.getpid(), "status": build_status(self.bot)}
+            try:
+                await ipc_request(self.address, payload, timeout=5)
+            except (OSError, asyncio.TimeoutError, ValueError) as e:
+                self.bot.logger.warning(f"Não foi possível enviar o status ao launcher: {e}")
+            await asyncio.sleep(self.health_interval)
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import discord
+
+
+def _command_hashes(tree, guild=None) -> dict:
+    """Serializa os comandos do alvo e retorna {nome: hash} de cada um."""
+    hashes = {}
+    for command in tree.get_commands(guild=guild):
+        payload = json.dumps(command.to_dict(tree), sort_keys=True, separators=(',', ':'), default=str)
+        hashes[f"{command.type.name}:{command.name}"] = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    return hashes
+
+def tree_fingerprint(command_hashes: dict) -> str:
+    """Hash estável da árvore inteira, independente da ordem de registro dos comandos."""
+    payload = json.dumps(command_hashes, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+async def sync_if_changed(bot, guild: discord.abc.Snowflake = None, force: bool = False) -> dict:
+    """
+    Sincroniza os comandos slash do alvo (global ou um servidor) somente se a árvore mudou
+    desde a última sincronização.
+    Args:
+        bot: O bot, com `db_client` conectado.
+        guild: O servidor alvo, ou None para os comandos globais.
+        force: Sincroniza mesmo que a impressão digital seja igual à armazenada.
+    Returns:
+        Um relatório com o alvo, se sincronizou e os comandos adicionados, removidos e alterados.
+    """
+    target = f"guild:{guild.id}" if guild else "global"
+    command_hashes = _command_hashes(bot.tree, guild)
+    fingerprint = tree_fingerprint(command_hashes)
+
+    collection = bot.repos.command_sync_state
+    state = await collection.find_one({'_id': target}) or {}
+    previous = state.get('commands', {})
+
+    report = {
+        "target": target,
+        "synced": False,
+        "count": len(command_hashes),
+        "added": sorted(name for name in command_hashes if name not in previous),
+        "removed": sorted(name for name in previous if name not in command_hashes),
+        "changed": sorted(name for name, digest in command_hashes.items() if name in previous and previous[name] != digest),
+    }
+
+    if not force and state.get('fingerprint') == fingerprint:
+        bot.logger.info(f"Comandos de {target} inalterados ({len(command_hashes)} comandos). Sincronização ignorada.")
+        return report
+
+    synced = await bot.tree.sync(guild=guild)
+    report["synced"] = True
+    report["count"] = len(synced)
+    await collection.update_one(
+        {'_id': target},
+        {'$set': {'fingerprint': fingerprint, 'commands': command_hashes}},
+        upsert=True
+    )
+    bot.logger.info(
+        f"Comandos de {target} sincronizados: {len(synced)} no total, "
+        f"{len(report['added'])} adicionados, {len(report['removed'])} removidos, {len(report['changed'])} alterados."
+    )
+    return report
+
+async def sync_configured_target(bot, force: bool = False) -> dict:
+    """Sincroniza o alvo configurado: o servidor de `guild_id` do config.json, ou os comandos globais."""
+    guild_id = bot.config.get('guild_id')
+    if not guild_id:
+        return await sync_if_changed(bot, force=force)
+
+    guild = discord.Object(id=int(guild_id))
+    # Recria a cópia dos comandos globais no servidor, refletindo comandos desativados/reativados
+    bot.tree.clear_commands(guild=guild)
+    bot.tree.copy_global_to(guild=guild)
+    return await sync_if_changed(bot, guild=guild, force=force)
+
+def format_sync_report(report: dict) -> str:
+    """Texto curto do relatório de sincronização para respostas de comandos."""
+    if not report["synced"]:
+        return f"Nenhuma mudança nos comandos de `{report['target']}`. Sincronização ignorada."
+    lines = [f"Comandos de `{report['target']}` sincronizados ({report['count']} no total)."]
+    for label, key in (("Adicionados", "added"), ("Removidos", "removed"), ("Alterados", "changed")):
+        if report[key]:
+            lines.append(f"**{label}:** " + ", ".join(f"`{name.split(':', 1)[-1]}`" for name in report[key]))
+    return "\n".join(lines)
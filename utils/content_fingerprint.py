@@ -0,0 +1,144 @@
+import collections
+import heapq
+import itertools
+import time
+import unicodedata
+
+SHINGLE_SIZE = 5  # Caracteres por shingle
+SKETCH_SIZE = 16  # Menores hashes guardados por mensagem (bottom-k)
+_BASE = 257
+_MODULUS = (1 << 61) - 1
+_BASE_POWER = pow(_BASE, SHINGLE_SIZE - 1, _MODULUS)
+# Categorias descartadas na normalização: marcas combinantes (zalgo) e caracteres invisíveis
+_STRIPPED_CATEGORIES = {'Mn', 'Me', 'Cf'}
+
+
+def fold_text(content: str) -> str:
+    """Minúsculas, sem acentos/zalgo, sem caracteres invisíveis e com os espaços colapsados."""
+    decomposed = unicodedata.normalize('NFKD', content.casefold())
+    kept = (char for char in decomposed if unicodedata.category(char) not in _STRIPPED_CATEGORIES)
+    return " ".join("".join(kept).split())
+
+
+def normalize_content(content: str) -> str:
+    """Como `fold_text`, trocando também a pontuação por espaço ("Bom dia, pessoal!" → "bom dia pessoal")."""
+    folded = fold_text(content)
+    return " ".join("".join(" " if unicodedata.category(char).startswith('P') else char for char in folded).split())
+
+
+def shingle_hashes(text: str):
+    """Hashes (Rabin-Karp) de todos os trechos de SHINGLE_SIZE caracteres, em O(len(text))."""
+    if len(text) < SHINGLE_SIZE:
+        if text:
+            yield hash(text) & _MODULUS
+        return
+    value = 0
+    for char in text[:SHINGLE_SIZE]:
+        value = (value * _BASE + ord(char)) % _MODULUS
+    yield value
+    for index in range(SHINGLE_SIZE, len(text)):
+        value = ((value - ord(text[index - SHINGLE_SIZE]) * _BASE_POWER) * _BASE + ord(text[index])) % _MODULUS
+        yield value
+
+
+def fingerprint(content: str) -> tuple:
+    """
+    Retorna (texto normalizado, esboço) da mensagem. O esboço são os SKETCH_SIZE menores hashes
+    de shingle: textos quase iguais compartilham a maioria deles (estimativa de Jaccard por bottom-k).
+    """
+    text = normalize_content(content)
+    return text, frozenset(heapq.nsmallest(SKETCH_SIZE, set(shingle_hashes(text))))
+
+
+class DuplicateContentDetector:
+    """
+    Janela limitada, por servidor, das mensagens recentes, para detectar o mesmo conteúdo (ou quase
+    o mesmo) enviado por vários usuários ou repetido por um só usuário.
+
+    Os esboços ficam num índice invertido {hash: entradas}, então cada mensagem só é comparada com
+    as que compartilham algum hash do esboço; o custo por mensagem é O(tamanho da mensagem) mais
+    o das poucas candidatas.
+    """
+    def __init__(self, window: float = 120, max_entries_per_guild: int = 500, similarity: float = 0.8,
+                 min_length: int = 20, max_guilds: int = 10000):
+        self.window = window
+        self.max_entries_per_guild = max_entries_per_guild
+        self.similarity = similarity
+        self.min_length = min_length  # Mensagens curtas ("bom dia", "parabéns") se repetem naturalmente
+        self.max_guilds = max_guilds
+        self._guilds = collections.OrderedDict()  # {guild_id: _GuildWindow}, menos ativo primeiro
+        self._ids = itertools.count()
+
+    def check(self, guild_id: int, user_id: int, content: str, now: float = None) -> tuple:
+        """
+        Registra a mensagem e retorna (usuários distintos, envios do próprio usuário) entre as
+        mensagens iguais ou quase iguais da janela, contando esta. Retorna (0, 0) para mensagens curtas.
+        """
+        now = time.monotonic() if now is None else now
+        text, sketch = fingerprint(content)
+        if len(text) < self.min_length:
+            return 0, 0
+
+        window = self._guilds.get(guild_id)
+        if window is None:
+            window = self._guilds[guild_id] = _GuildWindow()
+        else:
+            self._guilds.move_to_end(guild_id)
+        while len(self._guilds) > self.max_guilds:
+            self._guilds.popitem(last=False)
+
+        window.expire(now - self.window, self.max_entries_per_guild - 1)
+        users = {user_id}
+        repeats = 1
+        for entry_user, entry_text, entry_sketch in window.candidates(text, sketch):
+            if entry_text == text or len(sketch & entry_sketch) >= self.similarity * max(len(sketch), len(entry_sketch)):
+                users.add(entry_user)
+                if entry_user == user_id:
+                    repeats += 1
+        window.add(next(self._ids), now, user_id, text, sketch)
+        return len(users), repeats
+
+    def forget(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
+
+    def __len__(self) -> int:
+        return sum(len(window.entries) for window in self._guilds.values())
+
+
+class _GuildWindow:
+    def __init__(self):
+        self.order = collections.deque()  # IDs das entradas, da mais antiga para a mais recente
+        self.entries = {}  # {id: (instante, usuário, texto, esboço)}
+        self.by_hash = collections.defaultdict(set)  # {hash do esboço: IDs}
+        self.by_text = collections.defaultdict(set)  # {texto normalizado: IDs}
+
+    def add(self, entry_id: int, now: float, user_id: int, text: str, sketch: frozenset):
+        self.order.append(entry_id)
+        self.entries[entry_id] = (now, user_id, text, sketch)
+        self.by_text[text].add(entry_id)
+        for value in sketch:
+            self.by_hash[value].add(entry_id)
+
+    def candidates(self, text: str, sketch: frozenset):
+        entry_ids = set(self.by_text.get(text, ()))
+        for value in sketch:
+            entry_ids.update(self.by_hash.get(value, ()))
+        for entry_id in entry_ids:
+            _, user_id, entry_text, entry_sketch = self.entries[entry_id]
+            yield user_id, entry_text, entry_sketch
+
+    def expire(self, cutoff: float, max_entries: int):
+        while self.order and (len(self.order) > max_entries or self.entries[self.order[0]][0] <= cutoff):
+            entry_id = self.order.popleft()
+            _, _, text, sketch = self.entries.pop(entry_id)
+            self._unindex(self.by_text, text, entry_id)
+            for value in sketch:
+                self._unindex(self.by_hash, value, entry_id)
+
+    @staticmethod
+    def _unindex(index: dict, key, entry_id: int):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(entry_id)
+            if not ids:
+                del index[key]
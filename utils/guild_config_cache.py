@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+
+class GuildConfigCache:
+    """
+    Cache em memória dos documentos de configuração por servidor.
+
+    Os documentos são buscados uma única vez por (coleção, guild_id) e servidos
+    da memória até serem invalidados pelos modais de configuração ou até o TTL
+    expirar, o que cobre escritas feitas fora do bot.
+    """
+    def __init__(self, bot, ttl_seconds: int = 300):
+        self.bot = bot
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}  # {(coleção, guild_id): (expira_em, documento)}
+        self._pending = {}  # Buscas em andamento, para não repetir a mesma consulta
+        self._version = 0  # Incrementado a cada invalidação, descarta buscas que ficaram obsoletas
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, collection_name: str, guild_id: int, loader=None):
+        """
+        Retorna a configuração do servidor (ou None), buscando no banco só quando necessário.
+        Args:
+            collection_name: Nome da coleção em `bot_data` (ou chave do cache, quando há `loader`).
+            guild_id: O ID do servidor.
+            loader: Corrotina opcional `loader(guild_id)` para configurações guardadas fora de `bot_data`.
+        """
+        key = (collection_name, guild_id)
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        pending = self._pending.get(key)
+        if pending:
+            return await pending
+
+        task = asyncio.ensure_future(self._load(collection_name, guild_id, loader))
+        self._pending[key] = task
+        try:
+            return await task
+        finally:
+            if self._pending.get(key) is task:
+                del self._pending[key]
+
+    async def _load(self, collection_name: str, guild_id: int, loader=None):
+        version = self._version
+        if loader:
+            document = await loader(guild_id)
+        else:
+            document = await self.bot.repos.guild_config(collection_name).get(guild_id)
+        if version == self._version:
+            self._entries[(collection_name, guild_id)] = (time.monotonic() + self.ttl_seconds, document)
+        return document
+
+    def invalidate(self, collection_name: str, guild_id: int = None):
+        """Descarta a configuração em cache de um servidor (ou da coleção inteira)."""
+        self._version += 1
+        if guild_id is not None:
+            self._entries.pop((collection_name, guild_id), None)
+            self._pending.pop((collection_name, guild_id), None)
+            return
+        for key in [k for k in self._entries if k[0] == collection_name]:
+            del self._entries[key]
+        for key in [k for k in self._pending if k[0] == collection_name]:
+            del self._pending[key]
+
+    def clear(self):
+        """Descarta todas as configurações em cache."""
+        self._version += 1
+        self._entries.clear()
+        self._pending.clear()
+
+    def stats(self) -> dict:
+        """Retorna os contadores de acertos/falhas do cache."""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0
+        }
@@ -0,0 +1,159 @@
+import asyncio
+import fnmatch
+
+# Índices declarados pelos módulos com `declare_index`, criados na inicialização por `reconcile_indexes`
+index_registry = []
+
+
+class IndexSpec:
+    """
+    Um índice que um módulo precisa.
+    `collection` aceita curingas (ex: "tickets_*") para coleções criadas por servidor.
+    """
+    __slots__ = ('module', 'database', 'collection', 'keys', 'unique', 'ttl_seconds', 'name')
+
+    def __init__(self, module: str, database: str, collection: str, keys: list, unique: bool = False, ttl_seconds: int = None, name: str = None):
+        if ttl_seconds is not None and len(keys) != 1:
+            raise ValueError("Índices TTL devem ter um único campo.")
+        self.module = module
+        self.database = database
+        self.collection = collection
+        self.keys = [(field, direction) for field, direction in keys]
+        self.unique = unique
+        self.ttl_seconds = ttl_seconds
+        # Mesmo nome padrão do pymongo, para reconhecer índices criados antes do registro
+        self.name = name or "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+    @property
+    def is_pattern(self) -> bool:
+        return any(char in self.collection for char in '*?[')
+
+    def options(self) -> dict:
+        options = {'name': self.name}
+        if self.unique:
+            options['unique'] = True
+        if self.ttl_seconds is not None:
+            options['expireAfterSeconds'] = self.ttl_seconds
+        return options
+
+    def differences(self, info: dict) -> list:
+        """Compara com o `index_information()` de um índice existente com o mesmo nome."""
+        differences = []
+        if [(field, int(direction)) for field, direction in info.get('key', [])] != self.keys:
+            differences.append('campos')
+        if bool(info.get('unique')) != self.unique:
+            differences.append('unique')
+        if info.get('expireAfterSeconds') != self.ttl_seconds:
+            differences.append('ttl')
+        return differences
+
+
+def declare_index(module: str, database: str, collection: str, keys: list, unique: bool = False, ttl_seconds: int = None, name: str = None) -> IndexSpec:
+    """
+    Declara um índice usado pelas consultas de um módulo.
+    Args:
+        module: Nome do módulo dono do índice (aparece no relatório).
+        database: Banco de dados da coleção.
+        collection: Nome da coleção, ou um padrão como "tickets_*".
+        keys: Lista de (campo, direção), como no `create_index` do pymongo.
+        unique: Cria um índice único.
+        ttl_seconds: Remove os documentos esse tempo depois da data do campo (índice TTL).
+        name: Nome do índice; o padrão do pymongo se omitido.
+    """
+    spec = IndexSpec(module, database, collection, keys, unique, ttl_seconds, name)
+    for declared in index_registry:
+        if (declared.database, declared.collection, declared.name) == (spec.database, spec.collection, spec.name):
+            return declared
+    index_registry.append(spec)
+    return spec
+
+async def _reconcile_collection(db, collection_name: str, specs: list, report: dict, apply: bool, drop_unused: bool):
+    collection = db.get_collection(collection_name)
+    label = f"{db.name}.{collection_name}"
+    try:
+        existing = await collection.index_information()
+    except Exception:
+        existing = {}  # A coleção ainda não existe
+
+    for spec in specs:
+        target = f"{label}.{spec.name} ({spec.module})"
+        info = existing.get(spec.name)
+        if info is not None:
+            differences = spec.differences(info)
+            if differences == ['ttl'] and apply:
+                # O tempo de expiração pode ser alterado sem recriar o índice
+                await db.command('collMod', collection_name, index={'name': spec.name, 'expireAfterSeconds': spec.ttl_seconds})
+                report["updated"].append(target)
+            elif differences:
+                report["mismatched"].append(f"{target}: {', '.join(differences)}")
+            continue
+
+        report["missing"].append(target)
+        if not apply:
+            continue
+        try:
+            await collection.create_index(spec.keys, **spec.options())
+            report["created"].append(target)
+        except Exception as e:
+            report["failed"].append(f"{target}: {e}")
+
+    declared_names = {spec.name for spec in specs}
+    for index_name in existing:
+        if index_name == '_id_' or index_name in declared_names:
+            continue
+        report["unused"].append(f"{label}.{index_name}")
+        if apply and drop_unused:
+            await collection.drop_index(index_name)
+            report["dropped"].append(f"{label}.{index_name}")
+
+async def reconcile_indexes(bot, apply: bool = True, drop_unused: bool = False) -> dict:
+    """
+    Confere os índices declarados com os existentes no MongoDB e cria os que faltam.
+    Pode ser chamada a cada inicialização: índices já existentes não são recriados.
+    Args:
+        bot: O bot, com `db_client` conectado.
+        apply: Se False, apenas relata o que falta sem alterar nada.
+        drop_unused: Remove os índices das coleções registradas que nenhum módulo declarou.
+    Returns:
+        Um relatório com os índices ausentes, criados, atualizados, divergentes, com falha e não usados.
+    """
+    report = {"missing": [], "created": [], "updated": [], "mismatched": [], "failed": [], "unused": [], "dropped": []}
+
+    databases = {}
+    for spec in index_registry:
+        databases.setdefault(spec.database, []).append(spec)
+
+    jobs = []
+    for database_name, specs in databases.items():
+        db = bot.db_client.get_database(database_name)
+        try:
+            collection_names = await db.list_collection_names() if any(spec.is_pattern for spec in specs) else []
+        except Exception as e:
+            report["failed"].append(f"{database_name}: {e}")
+            continue
+
+        by_collection = {}
+        for spec in specs:
+            targets = [name for name in collection_names if fnmatch.fnmatchcase(name, spec.collection)] if spec.is_pattern else [spec.collection]
+            for collection_name in targets:
+                by_collection.setdefault(collection_name, []).append(spec)
+
+        for collection_name, collection_specs in by_collection.items():
+            jobs.append(_reconcile_collection(db, collection_name, collection_specs, report, apply, drop_unused))
+
+    results = await asyncio.gather(*jobs, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            report["failed"].append(str(result))
+
+    bot.logger.info(
+        f"Índices conferidos: {len(report['created'])} criados, {len(report['missing']) - len(report['created'])} ausentes, "
+        f"{len(report['mismatched'])} divergentes, {len(report['unused'])} não usados."
+    )
+    for entry in report["mismatched"]:
+        bot.logger.warning(f"Índice divergente da declaração: {entry}")
+    for entry in report["failed"]:
+        bot.logger.error(f"Falha ao criar índice: {entry}")
+    if report["unused"] and not drop_unused:
+        bot.logger.info(f"Índices não declarados por nenhum módulo: {', '.join(report['unused'])}")
+    return report
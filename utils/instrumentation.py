@@ -0,0 +1,169 @@
+import bisect
+import random
+import time
+import discord
+
+# Limites (em segundos) dos buckets do histograma de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def guild_bucket(guild) -> str:
+    """Agrupa os servidores por tamanho para não criar um rótulo por servidor."""
+    if guild is None:
+        return "dm"
+    member_count = getattr(guild, 'member_count', None) or 0
+    if member_count < 100:
+        return "small"
+    if member_count < 1000:
+        return "medium"
+    if member_count < 10000:
+        return "large"
+    return "huge"
+
+
+def handler_module(func) -> str:
+    """Nome do módulo (cog ou arquivo) dono de um handler."""
+    owner = getattr(func, '__self__', None)
+    if owner is not None:
+        return type(owner).__name__
+    return getattr(func, '__module__', 'unknown').rsplit('.', 1)[-1]
+
+
+def _guild_from_args(args):
+    # Os eventos recebem objetos diferentes; usa o primeiro que tenha servidor
+    for arg in args:
+        if isinstance(arg, discord.Guild):
+            return arg
+        guild = getattr(arg, 'guild', None)
+        if guild is not None:
+            return guild
+    return None
+
+
+class HandlerStats:
+    """Contadores e histograma de latência de um handler em um bucket de servidor."""
+    __slots__ = ('calls', 'errors', 'total_time', 'max_time', 'bucket_counts')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, elapsed: float):
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+
+class InstrumentedListener:
+    """
+    Envolve um listener de Cog medindo chamadas, erros e latência.
+    Compara como igual ao listener original para que `remove_listener` continue funcionando.
+    """
+    def __init__(self, instrumentation, event_name: str, func):
+        self.instrumentation = instrumentation
+        self.event_name = event_name
+        self.func = func
+        self.module = handler_module(func)
+        self.__name__ = getattr(func, '__name__', event_name)
+
+    async def __call__(self, *args, **kwargs):
+        return await self.instrumentation.call(self.module, self.event_name, _guild_from_args(args), self.func, *args, **kwargs)
+
+    def __eq__(self, other):
+        if isinstance(other, InstrumentedListener):
+            return self.func == other.func
+        return self.func == other
+
+    def __hash__(self):
+        return hash(self.func)
+
+
+class Instrumentation:
+    """
+    Registro de métricas por handler (listeners, estágios dos pipelines e comandos slash),
+    rotuladas por módulo, handler e tamanho do servidor.
+
+    Com `sample_rate` 0 os handlers são chamados diretamente, sem nenhuma medição.
+    """
+    def __init__(self, bot, sample_rate: float = 1.0):
+        self.bot = bot
+        self.sample_rate = sample_rate
+        self.stats = {}  # {(módulo, handler, bucket): HandlerStats}
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def _stats_for(self, module: str, handler: str, guild) -> HandlerStats:
+        key = (module, handler, guild_bucket(guild))
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = HandlerStats()
+        return stats
+
+    def _sampled(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    async def call(self, module: str, handler: str, guild, func, *args, **kwargs):
+        """Executa `func` registrando a chamada, o erro (se houver) e a latência."""
+        if not self.enabled or not self._sampled():
+            return await func(*args, **kwargs)
+
+        stats = self._stats_for(module, handler, guild)
+        stats.calls += 1
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.observe(time.perf_counter() - start)
+
+    def record(self, module: str, handler: str, guild, elapsed: float, failed: bool = False):
+        """Registra uma execução já medida (usado pelos comandos slash)."""
+        if not self.enabled or not self._sampled():
+            return
+        stats = self._stats_for(module, handler, guild)
+        stats.calls += 1
+        if failed:
+            stats.errors += 1
+        stats.observe(elapsed)
+
+    def instrument_listeners(self):
+        """Envolve todos os listeners registrados pelos Cogs. Pode ser chamada de novo sem duplicar."""
+        for event_name, listeners in self.bot.extra_events.items():
+            for index, func in enumerate(listeners):
+                if not isinstance(func, InstrumentedListener):
+                    listeners[index] = InstrumentedListener(self, event_name, func)
+
+    def top(self, limit: int = 10, key: str = 'total_time') -> list:
+        """Retorna os handlers com maior tempo total (ou outro atributo de HandlerStats)."""
+        aggregated = {}
+        for (module, handler, _), stats in self.stats.items():
+            entry = aggregated.setdefault((module, handler), {'calls': 0, 'errors': 0, 'total_time': 0.0, 'max_time': 0.0})
+            entry['calls'] += stats.calls
+            entry['errors'] += stats.errors
+            entry['total_time'] += stats.total_time
+            entry['max_time'] = max(entry['max_time'], stats.max_time)
+        ranked = sorted(aggregated.items(), key=lambda item: item[1][key], reverse=True)
+        return ranked[:limit]
+
+    def metrics(self, bot) -> list:
+        """Amostras no formato do web service (/metrics), incluindo o histograma de latência."""
+        samples = []
+        for (module, handler, bucket), stats in self.stats.items():
+            labels = {"module": module, "handler": handler, "guild_bucket": bucket}
+            samples.append(("swityis_handler_calls_total", labels, stats.calls))
+            samples.append(("swityis_handler_errors_total", labels, stats.errors))
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), stats.bucket_counts):
+                cumulative += count
+                samples.append(("swityis_handler_latency_seconds_bucket", {**labels, "le": bound}, cumulative))
+            samples.append(("swityis_handler_latency_seconds_sum", labels, round(stats.total_time, 6)))
+            samples.append(("swityis_handler_latency_seconds_count", labels, cumulative))
+        return samples
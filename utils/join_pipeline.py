@@ -0,0 +1,51 @@
+import datetime
+import re
+import discord
+from utils.pipeline import StagedPipeline, EventContext
+
+# Ordem dos estágios: pontuação de risco → quarentena/antiraid → autorole → boas-vindas
+STAGE_RISK = 10
+STAGE_QUARANTINE = 20
+STAGE_AUTOROLE = 30
+STAGE_WELCOME = 40
+
+SYMBOL_RUN_REGEX = re.compile(r'[^a-zA-Z\s]{5,}')
+LEADING_DIGITS_REGEX = re.compile(r'\d+')
+
+
+class MemberFeatures:
+    """Características de um membro calculadas uma única vez na entrada e reutilizadas por todos os estágios."""
+    __slots__ = ('account_age', 'has_avatar', 'name_length', 'has_symbol_run', 'starts_with_digits')
+
+    def __init__(self, member: discord.Member, now: datetime.datetime = None):
+        now = now or discord.utils.utcnow()
+        self.account_age = now - member.created_at
+        self.has_avatar = member.avatar is not None
+        self.name_length = len(member.name)
+        self.has_symbol_run = SYMBOL_RUN_REGEX.search(member.name) is not None
+        self.starts_with_digits = LEADING_DIGITS_REGEX.match(member.name) is not None
+
+    @property
+    def account_age_days(self) -> float:
+        return self.account_age.total_seconds() / 86400
+
+
+class JoinContext(EventContext):
+    """Contexto de uma entrada de membro compartilhado entre os estágios do pipeline."""
+    def __init__(self, bot, member: discord.Member, dry_run: bool = False):
+        super().__init__(bot, member.guild, dry_run)
+        self.member = member
+        self.features = MemberFeatures(member)
+        self.risk_score = 0
+        self.quarantined = False  # Definido pelo estágio de quarentena; autorole não deve conceder cargos
+        self.actions = []  # Ações tomadas pelos estágios, ex: ['quarantine', 'autorole']
+
+
+class JoinPipeline(StagedPipeline):
+    """Executa, em ordem, os estágios registrados pelos módulos para cada membro que entra."""
+    def __init__(self, bot):
+        super().__init__(bot, "entrada de membros")
+
+    async def dispatch(self, member: discord.Member) -> JoinContext:
+        """Processa a entrada do membro pelos estágios até o fim ou até um deles interromper."""
+        return await self.run(JoinContext(self.bot, member))
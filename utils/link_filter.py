@@ -0,0 +1,134 @@
+import re
+import unicodedata
+
+# Links com esquema: o host é o trecho até a primeira barra, interrogação, cerquilha ou espaço
+_EXPLICIT_LINK = re.compile(r'https?://([^\s/?#<>"\'`]+)\S*', re.IGNORECASE)
+# Domínios sem esquema (ex: discord.gg/abc): rótulos separados por ponto e terminando num TLD alfabético.
+# Os rótulos aceitam letras Unicode ("bücher.de", homógrafos como "dіscord.gg"), convertidas para punycode
+# por `normalize_host`; o TLD também pode já estar em punycode (xn--p1ai)
+_BARE_DOMAIN = re.compile(
+    r'(?<![\w@.-])((?:[^\W_](?:(?:[^\W_]|-){0,61}[^\W_])?\.)+(?:[^\W\d_]{2,63}|xn--[a-z0-9-]{1,59}))\.?(?![\w-])',
+    re.IGNORECASE
+)
+# Extensões de arquivo que também parecem TLDs: sem esquema, "arquivo.txt" não é link
+FILE_EXTENSIONS = frozenset({
+    'txt', 'log', 'md', 'py', 'js', 'ts', 'rs', 'sh', 'json', 'yml', 'yaml', 'xml', 'csv', 'ini', 'cfg',
+    'html', 'htm', 'css', 'php', 'java', 'kt', 'lua', 'exe', 'dll', 'bat', 'jar', 'zip', 'rar', 'gz', '7z',
+    'pdf', 'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx', 'png', 'jpg', 'jpeg', 'gif', 'webp', 'bmp', 'svg',
+    'mp3', 'mp4', 'wav', 'ogg', 'mov', 'mkv', 'avi', 'iso', 'apk', 'dat', 'bak', 'tmp',
+})
+# Pontos alternativos que alguns clientes aceitam como separador de rótulos
+_DOT_VARIANTS = str.maketrans({'。': '.', '．': '.', '｡': '.'})
+
+
+def normalize_host(host: str) -> str:
+    """Host em minúsculas, sem usuário/porta/ponto final e com rótulos Unicode em punycode (IDNA)."""
+    host = unicodedata.normalize('NFKC', host).translate(_DOT_VARIANTS)
+    host = host.rsplit('@', 1)[-1]
+    if host.startswith('['):  # IPv6
+        return host.split(']', 1)[0].lstrip('[').lower()
+    host = host.split(':', 1)[0].strip('.').lower()
+    try:
+        return host.encode('idna').decode('ascii')
+    except UnicodeError:
+        return host
+
+
+def parse_domain(text: str):
+    """Domínio informado num comando (aceita "https://exemplo.com/x"), normalizado; None se for inválido."""
+    host = normalize_host(text.strip().split('://', 1)[-1].split('/', 1)[0])
+    return host if _BARE_DOMAIN.fullmatch(host) else None
+
+
+def extract_hosts(content: str, deny=None) -> set:
+    """
+    Hosts normalizados dos links da mensagem (com ou sem esquema). `deny` (SuffixTrie) é a lista
+    de bloqueados do servidor: um domínio dela sempre conta como link, mesmo parecendo texto.
+    """
+    if '.' not in content and '。' not in content and '．' not in content:
+        return set()  # Caminho rápido: a maioria das mensagens não tem nenhum ponto
+    content = content.translate(_DOT_VARIANTS)
+    hosts = {normalize_host(match.group(1)) for match in _EXPLICIT_LINK.finditer(content)}
+    if hosts:
+        content = _EXPLICIT_LINK.sub(' ', content)  # Os caminhos dos links não são procurados de novo
+    for match in _BARE_DOMAIN.finditer(content):
+        domain = match.group(1)
+        host = normalize_host(domain)
+        # Com "www.", um caminho ("discord.Gg/abc") ou um domínio bloqueado, é link mesmo parecendo texto
+        if not (domain.lower().startswith('www.') or content.startswith('/', match.end())
+                or (deny is not None and deny.match_depth(host))):
+            tld = domain.rsplit('.', 1)[-1]
+            # "arquivo.txt" e "frase.Outra" (ponto sem espaço antes de uma frase) não são links
+            if tld.lower() in FILE_EXTENSIONS or (tld[0].isupper() and tld[1:].islower()):
+                continue
+        hosts.add(host)
+    hosts.discard('')
+    return hosts
+
+
+class SuffixTrie:
+    """
+    Trie de domínios pelos rótulos invertidos ("discord.gg" → gg → discord): um domínio cadastrado
+    também cobre todos os subdomínios. A busca custa O(rótulos do host).
+    """
+    _END = object()
+
+    def __init__(self, domains=()):
+        self._root = {}
+        self.size = 0
+        for domain in domains:
+            self.add(domain)
+
+    def add(self, domain: str):
+        node = self._root
+        for label in reversed(normalize_host(domain).split('.')):
+            node = node.setdefault(label, {})
+        if self._END not in node:
+            node[self._END] = True
+            self.size += 1
+
+    def match_depth(self, host: str) -> int:
+        """Quantidade de rótulos do maior domínio cadastrado que cobre o host (0 = nenhum)."""
+        node = self._root
+        depth = 0
+        for index, label in enumerate(reversed(host.split('.')), start=1):
+            node = node.get(label)
+            if node is None:
+                break
+            if self._END in node:
+                depth = index
+        return depth
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class LinkPolicy:
+    """
+    Política de links de um servidor, compilada a partir de `antilink_configs`:
+    - `blocked_domains` sempre são bloqueados; `allowed_domains` sempre são permitidos;
+      quando os dois cobrem o host, vale o mais específico (ex: permitir youtube.com e bloquear music.youtube.com).
+    - Os demais links são bloqueados se `block_unlisted` (padrão) estiver ativo.
+    - Canais (e tópicos dentro deles) em `exempt_channels` e membros com cargos em `exempt_roles` são ignorados.
+    """
+    def __init__(self, config: dict):
+        self.allow = SuffixTrie(config.get('allowed_domains', ()))
+        self.deny = SuffixTrie(config.get('blocked_domains', ()))
+        self.block_unlisted = config.get('block_unlisted', True)
+        self.exempt_channels = frozenset(config.get('exempt_channels', ()))
+        self.exempt_roles = frozenset(config.get('exempt_roles', ()))
+
+    def is_exempt(self, channel, member) -> bool:
+        if channel.id in self.exempt_channels or getattr(channel, 'parent_id', None) in self.exempt_channels:
+            return True
+        return bool(self.exempt_roles) and any(role.id in self.exempt_roles for role in getattr(member, 'roles', ()))
+
+    def is_blocked(self, host: str) -> bool:
+        denied = self.deny.match_depth(host)
+        allowed = self.allow.match_depth(host)
+        if denied or allowed:
+            return denied > allowed
+        return self.block_unlisted
+
+    def blocked_hosts(self, content: str) -> list:
+        return [host for host in extract_hosts(content, self.deny) if self.is_blocked(host)]
@@ -0,0 +1,183 @@
+import asyncio
+import atexit
+import copy
+import datetime
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+TEXT_FORMAT = '%(asctime)s:%(levelname)s:%(name)s: %(message)s'
+# Atributos padrão do LogRecord; o resto veio de `extra=` e vai como campo do JSON
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'sample_rate'}
+
+_listener = None
+_handler = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro, com os campos de `extra=` e os campos fixos do processo."""
+    def __init__(self, static_fields: dict = None):
+        super().__init__()
+        self.static_fields = {key: value for key, value in (static_fields or {}).items() if value is not None}
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, tz=datetime.timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **self.static_fields,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """O formato de texto de sempre, indicando quantos registros repetidos foram suprimidos."""
+    def __init__(self):
+        super().__init__(TEXT_FORMAT)
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        return f"{text} (+{suppressed} suprimidas)" if suppressed else text
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limita os registros por ponto de chamada (logger + arquivo + linha) com um token bucket:
+    até `burst` registros seguidos e depois `rate` por segundo. O próximo registro que passar
+    informa em `suppressed` quantos foram descartados. Registros CRITICAL nunca são descartados.
+
+    Registros com `extra={'sample_rate': 0.1}` são amostrados antes do limite (ex: logs por evento).
+    """
+    def __init__(self, rate: float = 5.0, burst: int = 20):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.suppressed_total = 0
+        self._buckets = {}  # {(logger, arquivo, linha): [tokens, último instante, suprimidos]}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sample_rate = getattr(record, 'sample_rate', None)
+        if sample_rate is not None and random.random() >= sample_rate:
+            return False
+        if self.rate <= 0 or record.levelno >= logging.CRITICAL:
+            return True
+
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                self.suppressed_total += 1
+                return False
+            bucket[0] = tokens - 1
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Coloca os registros numa fila limitada, consumida por uma thread que formata e escreve.
+    Com a fila cheia o registro é descartado (e contado) em vez de bloquear o event loop.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve a mensagem e a exceção agora (os objetos podem mudar depois); o JSON é montado na thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(level: int = logging.INFO, json_output: bool = True, rate: float = 5.0, burst: int = 20,
+                  queue_size: int = 10000, static_fields: dict = None):
+    """
+    Direciona todos os logs (bot, módulos e discord.py) para uma fila escrita por uma thread,
+    para que a escrita no console nunca bloqueie o event loop.
+    Args:
+        level: Nível mínimo do logger raiz.
+        json_output: Uma linha JSON por registro; False mantém o formato de texto.
+        rate, burst: Limite de registros por ponto de chamada (veja RateLimitFilter); rate 0 desativa.
+        queue_size: Registros aguardando escrita antes de começar a descartar.
+        static_fields: Campos incluídos em todo registro JSON (ex: {"cluster": 0}).
+    """
+    global _listener, _handler
+    stop_logging()
+
+    output = logging.StreamHandler()
+    output.setFormatter(JsonFormatter(static_fields) if json_output else TextFormatter())
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    _handler = NonBlockingQueueHandler(log_queue)
+    _handler.addFilter(RateLimitFilter(rate, burst))
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_handler)
+    root.setLevel(level)
+    return _handler
+
+def stop_logging():
+    """Escreve os registros que ainda estão na fila e encerra a thread (também chamada na saída do processo)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(stop_logging)
+
+async def flush_logging(timeout: float = 5.0) -> bool:
+    """Espera a thread escrever os registros já enfileirados, sem encerrá-la. Retorna False se o prazo acabar."""
+    if _handler is None or _listener is None:
+        return True
+    deadline = time.monotonic() + timeout
+    while _handler.queue.unfinished_tasks and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    return not _handler.queue.unfinished_tasks
+
+def metrics(bot) -> list:
+    """Amostras no formato do web service (/metrics)."""
+    if _handler is None:
+        return []
+    suppressed = sum(log_filter.suppressed_total for log_filter in _handler.filters if isinstance(log_filter, RateLimitFilter))
+    return [
+        ("swityis_log_records_suppressed_total", {}, suppressed),
+        ("swityis_log_records_dropped_total", {}, _handler.dropped),
+        ("swityis_log_queue_depth", {}, _handler.queue.qsize()),
+    ]
@@ -0,0 +1,101 @@
+import asyncio
+import collections
+import sys
+import threading
+import time
+import traceback
+
+
+class LoopLagMonitor:
+    """
+    Mede continuamente o atraso (lag) do event loop e detecta callbacks lentos.
+
+    Uma tarefa no loop acorda a cada `interval` segundos e registra quanto atrasou.
+    Uma thread de vigia confere se essa tarefa está acordando; se o loop ficar travado
+    por mais de `slow_threshold` segundos, registra no log a pilha da thread do loop,
+    apontando a corrotina ou a função que está bloqueando.
+    """
+    def __init__(self, bot, interval: float = 0.5, slow_threshold: float = 0.25, history_size: int = 1200):
+        self.bot = bot
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.samples = collections.deque(maxlen=history_size)  # Lags recentes, em segundos
+        self.max_lag = 0.0
+        self.slow_callbacks = 0
+        self._heartbeat = time.monotonic()
+        self._task = None
+        self._watchdog = None
+        self._stop_event = threading.Event()
+        self._loop_thread_id = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Inicia o monitor no loop atual. Chamadas repetidas não criam outro monitor."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop_event.clear()
+        self._task = asyncio.get_running_loop().create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        """Para o monitor e a thread de vigia."""
+        self._stop_event.set()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _measure(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.samples.append(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+            self._heartbeat = time.monotonic()
+
+    def _watch(self):
+        # Roda fora do loop: se o heartbeat parar, o loop está bloqueado por algum callback
+        reported_heartbeat = None
+        check_every = min(self.slow_threshold / 2, 0.1)
+        while not self._stop_event.wait(check_every):
+            heartbeat = self._heartbeat
+            stalled_for = time.monotonic() - heartbeat - self.interval
+            if stalled_for < self.slow_threshold or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat  # Registra cada travamento uma única vez
+            self.slow_callbacks += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "pilha indisponível"
+            self.bot.logger.warning(f"Event loop bloqueado há {stalled_for:.3f}s. Pilha atual do loop:\n{stack}")
+
+    def percentiles(self) -> dict:
+        """Retorna p50/p95/p99 e o máximo do lag recente, em segundos."""
+        if not self.samples:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": self.max_lag}
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {
+            "p50": ordered[int(last * 0.50)],
+            "p95": ordered[int(last * 0.95)],
+            "p99": ordered[int(last * 0.99)],
+            "max": self.max_lag,
+        }
+
+    def metrics(self, bot) -> list:
+        """Amostras no formato do web service (/metrics)."""
+        lag = self.percentiles()
+        return [
+            ("swityis_loop_lag_seconds", {"quantile": "0.5"}, round(lag["p50"], 6)),
+            ("swityis_loop_lag_seconds", {"quantile": "0.95"}, round(lag["p95"], 6)),
+            ("swityis_loop_lag_seconds", {"quantile": "0.99"}, round(lag["p99"], 6)),
+            ("swityis_loop_lag_max_seconds", {}, round(lag["max"], 6)),
+            ("swityis_loop_slow_callbacks_total", {}, self.slow_callbacks),
+        ]
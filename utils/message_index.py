@@ -0,0 +1,62 @@
+import collections
+import time
+
+
+class RecentMessageIndex:
+    """
+    Índice em memória das mensagens recentes de cada (servidor, usuário), com os IDs separados
+    por canal. Permite apagar exatamente as mensagens de um autor em todos os canais, sem chamar
+    `channel.history()` e sem tocar nas mensagens dos outros usuários.
+
+    Cada usuário guarda no máximo `max_messages` mensagens dos últimos `window` segundos. Os usuários
+    ficam em ordem de último uso: os ociosos saem a cada `add` e, acima de `max_users`, os menos
+    ativos são descartados.
+    """
+    def __init__(self, window: float = 60, max_messages: int = 100, max_users: int = 50000):
+        self.window = window
+        self.max_messages = max_messages
+        self.max_users = max_users
+        self._users = collections.OrderedDict()  # {(guild_id, user_id): deque de (instante, canal, mensagem)}
+        self.evicted = 0
+
+    def add(self, message, now: float = None):
+        """Registra uma mensagem de servidor (chamado pelo pipeline de mensagens)."""
+        now = time.monotonic() if now is None else now
+        key = (message.guild.id, message.author.id)
+        entries = self._users.get(key)
+        if entries is None:
+            entries = self._users[key] = collections.deque(maxlen=self.max_messages)
+        else:
+            self._users.move_to_end(key)
+        entries.append((now, message.channel.id, message.id))
+        self._evict(now)
+
+    def recent(self, guild_id: int, user_id: int, now: float = None) -> dict:
+        """Retorna {channel_id: [message_id, ...]} com as mensagens do usuário ainda dentro da janela."""
+        entries = self._users.get((guild_id, user_id))
+        if not entries:
+            return {}
+        cutoff = (time.monotonic() if now is None else now) - self.window
+        by_channel = collections.defaultdict(list)
+        for timestamp, channel_id, message_id in entries:
+            if timestamp > cutoff:
+                by_channel[channel_id].append(message_id)
+        return dict(by_channel)
+
+    def discard(self, guild_id: int, user_id: int):
+        """Esquece as mensagens do usuário (ex: depois de apagá-las)."""
+        self._users.pop((guild_id, user_id), None)
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def _evict(self, now: float):
+        cutoff = now - self.window
+        while self._users:
+            key, entries = next(iter(self._users.items()))
+            if entries and entries[-1][0] > cutoff:
+                break
+            del self._users[key]
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+            self.evicted += 1
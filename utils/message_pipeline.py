@@ -0,0 +1,38 @@
+from utils.pipeline import StagedPipeline, EventContext
+from utils.message_index import RecentMessageIndex
+
+# Ordem dos estágios: filtros de conteúdo → moderação → recompensas
+STAGE_FILTER = 10
+STAGE_MODERATION = 20
+STAGE_REWARDS = 30
+
+
+class MessageContext(EventContext):
+    """
+    Contexto compartilhado por todos os estágios durante o processamento de uma mensagem.
+    Guarda as configurações já buscadas e o estado do autor para que cada estágio
+    não repita as mesmas consultas.
+    """
+    def __init__(self, bot, message, dry_run: bool = False):
+        super().__init__(bot, message.guild, dry_run)
+        self.message = message
+        self.author_id = message.author.id
+        self.author_state = {}  # Estado do autor compartilhado entre os estágios
+
+
+class MessagePipeline(StagedPipeline):
+    """Executa, em ordem, os estágios registrados pelos módulos para cada mensagem de servidor."""
+    def __init__(self, bot):
+        super().__init__(bot, "mensagens")
+        # Mensagens recentes por autor, usadas pelo anti-spam para apagar só as mensagens do infrator
+        self.recent_messages = RecentMessageIndex()
+
+    async def run(self, ctx: MessageContext) -> MessageContext:
+        ctx.service('recent_messages', self.recent_messages, RecentMessageIndex).add(ctx.message)
+        return await super().run(ctx)
+
+    async def dispatch(self, message) -> MessageContext:
+        """Processa a mensagem pelos estágios até o fim ou até um deles interromper."""
+        if message.author.bot or not message.guild:
+            return None
+        return await self.run(MessageContext(self.bot, message))
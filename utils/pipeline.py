@@ -0,0 +1,80 @@
+import bisect
+from utils.instrumentation import handler_module
+
+
+class StagedPipeline:
+    """Base dos pipelines de eventos: mantém os estágios ordenados e os executa até um deles interromper."""
+    def __init__(self, bot, name: str):
+        self.bot = bot
+        self.name = name
+        self._stages = []  # Lista ordenada de (ordem, nome, callback)
+
+    def register(self, name: str, order: int, callback):
+        """Registra (ou substitui) um estágio. `callback` recebe o contexto do evento."""
+        self.unregister(name)
+        bisect.insort(self._stages, (order, name, callback), key=lambda stage: (stage[0], stage[1]))
+
+    def unregister(self, name: str):
+        """Remove um estágio pelo nome, se existir."""
+        self._stages = [stage for stage in self._stages if stage[1] != name]
+
+    @property
+    def stage_names(self) -> list:
+        return [name for _, name, _ in self._stages]
+
+    async def run(self, ctx):
+        """Executa os estágios em ordem sobre o contexto até o fim ou até `ctx.stop()`."""
+        instrumentation = self.bot.instrumentation
+        for _, name, callback in list(self._stages):
+            try:
+                await instrumentation.call(handler_module(callback), name, ctx.guild, callback, ctx)
+            except Exception as e:
+                self.bot.logger.error(f"Erro no estágio '{name}' do pipeline de {self.name}: {e}")
+            if ctx.stopped:
+                ctx.stopped_by = name
+                break
+        return ctx
+
+
+class EventContext:
+    """
+    Contexto base compartilhado pelos estágios de um pipeline.
+    Com `dry_run`, o evento é simulado (ex: /raid-drill): os estágios não gravam nada no banco.
+    A simulação também troca `rest` e `sandbox` para não disputar o executor nem o estado em
+    memória do tráfego real.
+    """
+    def __init__(self, bot, guild, dry_run: bool = False):
+        self.bot = bot
+        self.guild = guild
+        self.guild_id = guild.id
+        self.dry_run = dry_run
+        self.stopped = False
+        self.stopped_by = None
+        self.rest = bot.rest  # Executor das chamadas à API feitas pelos estágios
+        self.sandbox = None  # {nome: instância} dos serviços próprios da simulação; None usa os compartilhados
+        self._configs = {}
+
+    async def config(self, collection_name: str, loader=None):
+        """Retorna a configuração do servidor da coleção, buscando no cache uma única vez por evento."""
+        if collection_name not in self._configs:
+            self._configs[collection_name] = await self.bot.config_cache.get(collection_name, self.guild_id, loader=loader)
+        return self._configs[collection_name]
+
+    def service(self, name: str, shared, factory):
+        """
+        Retorna o serviço compartilhado ou, num evento simulado com `sandbox`, a instância própria
+        da simulação, criada por `factory()` no primeiro uso e mantida entre os eventos dela.
+        """
+        if self.sandbox is None:
+            return shared
+        if name not in self.sandbox:
+            self.sandbox[name] = factory()
+        return self.sandbox[name]
+
+    def set_config(self, collection_name: str, document):
+        """Define a configuração usada neste evento sem consultar o cache (None desativa o módulo)."""
+        self._configs[collection_name] = document
+
+    def stop(self):
+        """Interrompe o pipeline: os estágios seguintes não verão este evento."""
+        self.stopped = True
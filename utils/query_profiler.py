@@ -0,0 +1,248 @@
+import asyncio
+import time
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+# Operações que recebem um filtro como primeiro argumento
+FILTERED_OPERATIONS = (
+    'find_one', 'update_one', 'update_many', 'replace_one', 'delete_one', 'delete_many',
+    'count_documents', 'find_one_and_update', 'find_one_and_delete', 'find_one_and_replace', 'distinct',
+)
+# Operações sem filtro, medidas apenas pelo tempo
+UNFILTERED_OPERATIONS = ('insert_one', 'insert_many', 'bulk_write')
+
+
+def query_shape(query) -> str:
+    """
+    Forma da consulta: os campos e operadores do filtro, sem os valores.
+    Ex: {"guild_id": 1, "quarantined_at": {"$lte": data}} -> "{guild_id, quarantined_at.$lte}"
+    """
+    if not isinstance(query, dict) or not query:
+        return "{}"
+
+    def paths(document, prefix=''):
+        for key in sorted(document):
+            value = document[key]
+            if key in ('$and', '$or', '$nor') and isinstance(value, list):
+                inner = sorted({path for clause in value if isinstance(clause, dict) for path in paths(clause)})
+                yield f"{prefix}{key}[{', '.join(inner)}]"
+            elif isinstance(value, dict) and value and all(str(operator).startswith('$') for operator in value):
+                for operator in sorted(value):
+                    yield f"{prefix}{key}.{operator}"
+            else:
+                yield f"{prefix}{key}"
+
+    return "{" + ", ".join(paths(query)) + "}"
+
+def _plan_summary(plan: dict) -> str:
+    """Resume o plano vencedor do explain() (ex: "FETCH > IXSCAN guild_id_1")."""
+    stages = []
+    stage = plan.get('queryPlanner', {}).get('winningPlan', {})
+    while stage:
+        name = stage.get('stage', '?')
+        if stage.get('indexName'):
+            name += f" {stage['indexName']}"
+        stages.append(name)
+        stage = stage.get('inputStage') or (stage.get('inputStages') or [None])[0]
+    return " > ".join(stages) or "desconhecido"
+
+
+class QueryShapeStats:
+    __slots__ = ('calls', 'slow', 'total_time', 'max_time')
+
+    def __init__(self):
+        self.calls = 0
+        self.slow = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+
+class ProfiledCursor:
+    """Cursor que mede o tempo gasto buscando os documentos (to_list ou iteração)."""
+    def __init__(self, profiler, collection, operation: str, query, cursor):
+        self._profiler = profiler
+        self._collection = collection
+        self._operation = operation
+        self._query = query
+        self._cursor = cursor
+        self._elapsed = 0.0
+
+    def __getattr__(self, name):
+        attribute = getattr(self._cursor, name)
+        if not callable(attribute):
+            return attribute
+
+        def chained(*args, **kwargs):
+            # sort/limit/skip/batch_size retornam o próprio cursor; mantém o encadeamento medido
+            result = attribute(*args, **kwargs)
+            return self if result is self._cursor else result
+        return chained
+
+    async def to_list(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await self._cursor.to_list(*args, **kwargs)
+        finally:
+            self._profiler.record(self._collection, self._operation, self._query, time.perf_counter() - start)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        # Só conta o tempo esperando o banco, não o processamento de cada documento pelo chamador
+        start = time.perf_counter()
+        try:
+            return await self._cursor.__anext__()
+        except StopAsyncIteration:
+            self._profiler.record(self._collection, self._operation, self._query, self._elapsed + time.perf_counter() - start)
+            raise
+        finally:
+            self._elapsed += time.perf_counter() - start
+
+
+class ProfiledCollection:
+    """Coleção que registra a latência de cada operação no QueryProfiler."""
+    def __init__(self, profiler, collection):
+        self._profiler = profiler
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name in FILTERED_OPERATIONS or name in UNFILTERED_OPERATIONS:
+            return self._timed(name, attribute)
+        if name in ('find', 'aggregate'):
+            return self._cursor(name, attribute)
+        return attribute
+
+    def _timed(self, operation: str, method):
+        async def call(*args, **kwargs):
+            query = (args[0] if args else kwargs.get('filter')) if operation in FILTERED_OPERATIONS else None
+            start = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                self._profiler.record(self._collection, operation, query, time.perf_counter() - start)
+        return call
+
+    def _cursor(self, operation: str, method):
+        def call(*args, **kwargs):
+            if operation == 'find':
+                query = args[0] if args else kwargs.get('filter')
+            else:
+                # Em agregações, a forma é a do primeiro $match
+                pipeline = args[0] if args else kwargs.get('pipeline', [])
+                query = pipeline[0].get('$match') if pipeline and '$match' in pipeline[0] else None
+            return ProfiledCursor(self._profiler, self._collection, operation, query, method(*args, **kwargs))
+        return call
+
+
+class ProfiledDatabase:
+    def __init__(self, profiler, database):
+        self._profiler = profiler
+        self._database = database
+
+    def __getattr__(self, name):
+        return self._profiler._wrap(getattr(self._database, name))
+
+    def __getitem__(self, name):
+        return self._profiler._wrap(self._database[name])
+
+
+class ProfiledClient:
+    """
+    Cliente do MongoDB cujas coleções são medidas, tanto via `get_collection`/`get_database`
+    quanto por acesso de atributo (ex: `db_client.banco.colecao`).
+    """
+    def __init__(self, profiler, client):
+        self._profiler = profiler
+        self._client = client
+
+    def __getattr__(self, name):
+        return self._profiler._wrap(getattr(self._client, name))
+
+    def __getitem__(self, name):
+        return self._profiler._wrap(self._client[name])
+
+
+class QueryProfiler:
+    """
+    Estatísticas de latência por forma de consulta (coleção + operação + campos do filtro).
+    Consultas acima de `slow_threshold` segundos são explicadas com explain() e registradas no log,
+    no máximo uma vez a cada `explain_interval` segundos por forma.
+
+    Desativado (`enabled` False), o cliente do banco é usado diretamente, sem nenhuma medição.
+    """
+    def __init__(self, bot, enabled: bool = False, slow_threshold: float = 0.1, explain_interval: float = 300.0):
+        self.bot = bot
+        self.enabled = enabled
+        self.slow_threshold = slow_threshold
+        self.explain_interval = explain_interval
+        self.stats = {}  # {(coleção, operação, forma): QueryShapeStats}
+        self._last_explain = {}
+        self._explain_tasks = set()
+
+    def wrap_client(self, client):
+        """Retorna o cliente com as coleções medidas (ou o próprio cliente, se desativado)."""
+        return ProfiledClient(self, client) if self.enabled else client
+
+    def _wrap(self, value):
+        # Métodos como get_database/get_collection retornam objetos que também precisam ser medidos
+        if isinstance(value, AsyncIOMotorCollection):
+            return ProfiledCollection(self, value)
+        if isinstance(value, AsyncIOMotorDatabase):
+            return ProfiledDatabase(self, value)
+        if callable(value) and getattr(value, '__name__', None) in ('get_database', 'get_collection', 'get_default_database'):
+            return lambda *args, **kwargs: self._wrap(value(*args, **kwargs))
+        return value
+
+    def record(self, collection, operation: str, query, elapsed: float):
+        shape = query_shape(query)
+        key = (f"{collection.database.name}.{collection.name}", operation, shape)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = QueryShapeStats()
+        stats.calls += 1
+        stats.total_time += elapsed
+        if elapsed > stats.max_time:
+            stats.max_time = elapsed
+        if elapsed >= self.slow_threshold:
+            stats.slow += 1
+            self._schedule_explain(key, collection, query, elapsed)
+
+    def _schedule_explain(self, key, collection, query, elapsed: float):
+        now = time.monotonic()
+        if now - self._last_explain.get(key, -self.explain_interval) < self.explain_interval:
+            return
+        self._last_explain[key] = now
+        task = asyncio.get_running_loop().create_task(self._explain(key, collection, query, elapsed))
+        self._explain_tasks.add(task)
+        task.add_done_callback(self._explain_tasks.discard)
+
+    async def _explain(self, key, collection, query, elapsed: float):
+        namespace, operation, shape = key
+        plan_text = "sem filtro para explicar"
+        if isinstance(query, dict):
+            try:
+                plan = await collection.find(query).explain()
+                stats = plan.get('executionStats', {})
+                plan_text = _plan_summary(plan)
+                if stats:
+                    plan_text += f" ({stats.get('totalDocsExamined', '?')} documentos examinados, {stats.get('nReturned', '?')} retornados)"
+            except Exception as e:
+                plan_text = f"explain falhou: {e}"
+        self.bot.logger.warning(f"Consulta lenta ({elapsed * 1000:.1f} ms): {namespace}.{operation} {shape} — plano: {plan_text}")
+
+    def top(self, limit: int = 10, key: str = 'total_time') -> list:
+        """Retorna as formas de consulta com maior tempo total (ou outro atributo de QueryShapeStats)."""
+        ranked = sorted(self.stats.items(), key=lambda item: getattr(item[1], key), reverse=True)
+        return ranked[:limit]
+
+    def metrics(self, bot, limit: int = 50) -> list:
+        """Amostras no formato do web service (/metrics), limitadas às formas com maior tempo total."""
+        samples = []
+        for (namespace, operation, shape), stats in self.top(limit):
+            labels = {"collection": namespace, "operation": operation, "shape": shape}
+            samples.append(("swityis_query_calls_total", labels, stats.calls))
+            samples.append(("swityis_query_slow_total", labels, stats.slow))
+            samples.append(("swityis_query_seconds_sum", labels, round(stats.total_time, 6)))
+            samples.append(("swityis_query_seconds_max", labels, round(stats.max_time, 6)))
+        return samples
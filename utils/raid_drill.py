@@ -0,0 +1,302 @@
+import asyncio
+import collections
+import datetime
+import itertools
+import time
+import discord
+from utils.join_pipeline import JoinContext
+from utils.message_pipeline import MessageContext
+from utils.rest_executor import RestExecutor
+
+# Configurações usadas no modo simulado, independentes do que o servidor configurou
+DRILL_CONFIGS = {
+    'antiraid_configs': {
+        "is_active": True,
+        "kick_new_members": True,
+        "ban_new_members": False,
+        "required_account_age_days": 7,
+        "raid_threshold": 10
+    },
+    'antispam_configs': {'enabled': True, 'limit': 5, 'duplicate_limit': 3},
+    'antilink_configs': {'enabled': True},
+    'word_filter_configs': None,
+    'autorole_configs': None,
+    'welcome_goodbye_configs': None,
+}
+# Resultados dos estágios que contam como detecção
+JOIN_DETECTIONS = ('quarantine', 'antiraid_kick', 'antiraid_ban', 'raid_alert')
+MESSAGE_DETECTIONS = ('antilink', 'antispam', 'duplicates')
+
+SPAM_CONTENT = "RAID RAID RAID entrem todos"
+LINK_CONTENT = "nitro grátis em https://raid.example/nitro"
+
+_sequence = itertools.count(1)
+
+
+def _drill_snowflake() -> int:
+    return discord.utils.time_snowflake(discord.utils.utcnow()) + next(_sequence)
+
+
+class DrillRecorder:
+    """Registra as ações que os módulos tentaram executar, com uma latência de API simulada."""
+    def __init__(self, api_latency: float = 0.05):
+        self.api_latency = api_latency
+        self.actions = []  # (instante, ação)
+
+    async def record(self, action: str):
+        self.actions.append((time.perf_counter(), action))
+        if self.api_latency:
+            await asyncio.sleep(self.api_latency)
+
+    def counts(self) -> collections.Counter:
+        return collections.Counter(action for _, action in self.actions)
+
+
+class DrillRole:
+    """Cargo fictício usado quando o servidor não tem o cargo que o módulo procura."""
+    def __init__(self, name: str):
+        self.id = _drill_snowflake()
+        self.name = name
+        self.mention = f"@{name}"
+
+
+class DrillChannel:
+    """Canal do servidor em que envios e exclusões são apenas registrados."""
+    def __init__(self, guild, channel, recorder: DrillRecorder):
+        self.guild = guild
+        self.id = channel.id
+        self.name = channel.name
+        self.mention = channel.mention
+        self.recorder = recorder
+        self.messages = collections.deque(maxlen=200)  # Só as mensagens simuladas
+
+    async def send(self, *args, **kwargs):
+        await self.recorder.record('send')
+
+    async def delete_messages(self, messages, reason: str = None):
+        await self.recorder.record('bulk_delete')
+        for message in messages:
+            message.deleted = True
+
+    def get_partial_message(self, message_id: int):
+        return discord.utils.get(self.messages, id=message_id)
+
+
+class DrillGuild:
+    """
+    Visão do servidor real para a simulação: expõe os cargos e canais reais (para que os módulos
+    encontrem o que procuram), mas nenhuma chamada à API chega ao Discord.
+    """
+    def __init__(self, guild: discord.Guild, recorder: DrillRecorder, required_roles: tuple = ()):
+        self.id = guild.id
+        self.name = guild.name
+        self.member_count = guild.member_count
+        self.default_role = guild.default_role
+        self.roles = list(guild.roles)
+        for name in required_roles:
+            if not discord.utils.get(self.roles, name=name):
+                self.roles.append(DrillRole(name))
+        self.text_channels = [DrillChannel(self, channel, recorder) for channel in guild.text_channels]
+        self.members = {}
+
+    def get_channel(self, channel_id: int):
+        return discord.utils.get(self.text_channels, id=channel_id)
+
+    get_channel_or_thread = get_channel
+
+    def get_role(self, role_id: int):
+        return discord.utils.get(self.roles, id=role_id)
+
+    def get_member(self, user_id: int):
+        return self.members.get(user_id)
+
+
+class DrillMember:
+    """Membro sintético; cargos, expulsões e banimentos são apenas registrados."""
+    def __init__(self, guild: DrillGuild, recorder: DrillRecorder, name: str, created_at: datetime.datetime, avatar=None):
+        self.guild = guild
+        self.recorder = recorder
+        self.id = _drill_snowflake()
+        self.name = name
+        self.display_name = name
+        self.mention = f"@{name}"
+        self.bot = False
+        self.created_at = created_at
+        self.joined_at = discord.utils.utcnow()
+        self.avatar = avatar
+        self.display_avatar = avatar
+        self.roles = [guild.default_role]
+
+    async def add_roles(self, *roles, **kwargs):
+        await self.recorder.record('add_roles')
+        self.roles.extend(roles)
+
+    async def remove_roles(self, *roles, **kwargs):
+        await self.recorder.record('remove_roles')
+        self.roles = [role for role in self.roles if role not in roles]
+
+    async def kick(self, **kwargs):
+        await self.recorder.record('kick')
+
+    async def ban(self, **kwargs):
+        await self.recorder.record('ban')
+
+    async def send(self, *args, **kwargs):
+        await self.recorder.record('dm')
+
+
+class DrillMessage:
+    def __init__(self, channel: DrillChannel, author: DrillMember, content: str):
+        self.id = _drill_snowflake()
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.created_at = discord.utils.utcnow()
+        self.attachments = []
+        self.embeds = []
+        self.mentions = []
+        self.deleted = False
+
+    async def delete(self, **kwargs):
+        await self.channel.recorder.record('delete_message')
+        self.deleted = True
+
+
+class RaidDrill:
+    """
+    Exercício de raid em modo simulado: injeta uma onda de entradas e mensagens sintéticas nos
+    pipelines reais (pontuação de risco, quarentena, antiraid, anti-link, anti-spam) e mede
+    quanto tempo o bot leva para reagir. As ações são registradas em vez de executadas e os
+    estágios não gravam nada no banco (`ctx.dry_run`).
+
+    A simulação tem um executor REST próprio, com a mesma concorrência do real, e as suas próprias
+    janelas de anti-spam, de conteúdo repetido e de mensagens recentes (`ctx.sandbox`): ela não
+    ocupa vagas das ações de segurança reais nem deixa mensagens sintéticas no estado do servidor.
+    """
+    def __init__(self, bot, guild: discord.Guild, joins: int = 50, messages: int = 100, duration: float = 5.0,
+                 suspicious_ratio: float = 0.5, api_latency: float = 0.05, use_guild_config: bool = False):
+        self.bot = bot
+        self.joins = joins
+        self.messages = messages
+        self.duration = duration
+        self.suspicious_ratio = suspicious_ratio
+        self.use_guild_config = use_guild_config
+        self.recorder = DrillRecorder(api_latency)
+        self.rest = RestExecutor(bot, max_concurrency=bot.rest.max_concurrency)
+        self.sandbox = {}
+
+        quarantine = bot.get_cog('AutoQuarantine')
+        required_roles = () if use_guild_config or not quarantine else (quarantine.quarantine_role_name,)
+        self.guild = DrillGuild(guild, self.recorder, required_roles)
+
+        self.latencies = []
+        self.detections = collections.Counter()
+        self.first_detection = None
+        self.queue_samples = []
+
+    def _schedule(self) -> list:
+        """Lista de (instante relativo, tipo, índice) com as entradas e mensagens intercaladas."""
+        events = [('join', index) for index in range(self.joins)] + [('message', index) for index in range(self.messages)]
+        # Intercala proporcionalmente: a onda de mensagens acompanha a de entradas
+        events.sort(key=lambda event: event[1] / (self.joins if event[0] == 'join' else self.messages))
+        step = self.duration / len(events) if events else 0
+        return [(position * step, kind, index) for position, (kind, index) in enumerate(events)]
+
+    def _member(self, index: int) -> DrillMember:
+        now = discord.utils.utcnow()
+        # Os primeiros de cada bloco de 10 são contas novas, sem avatar e com nome suspeito
+        if index % 10 < round(self.suspicious_ratio * 10):
+            member = DrillMember(self.guild, self.recorder, f"{1000 + index}raid", now - datetime.timedelta(days=1))
+        else:
+            member = DrillMember(self.guild, self.recorder, f"visitante{index}", now - datetime.timedelta(days=400), avatar=self.bot.user.display_avatar)
+        self.guild.members[member.id] = member
+        return member
+
+    def _context(self, context_class, subject):
+        ctx = context_class(self.bot, subject, dry_run=True)
+        ctx.rest = self.rest
+        ctx.sandbox = self.sandbox
+        if not self.use_guild_config:
+            for collection_name, document in DRILL_CONFIGS.items():
+                ctx.set_config(collection_name, document)
+        return ctx
+
+    async def _dispatch(self, pipeline, ctx, detections: tuple, injected_at: float):
+        await pipeline.run(ctx)
+        finished = time.perf_counter()
+        self.latencies.append(finished - injected_at)
+
+        outcomes = [action for action in getattr(ctx, 'actions', ()) if action in detections]
+        if ctx.stopped_by in detections:
+            outcomes.append(ctx.stopped_by)
+        for outcome in outcomes:
+            self.detections[outcome] += 1
+        if outcomes and (self.first_detection is None or finished < self.first_detection):
+            self.first_detection = finished
+
+    async def _sample_queue(self):
+        while True:
+            self.queue_samples.append(self.rest.queue_depth)
+            await asyncio.sleep(0.01)
+
+    async def run(self) -> dict:
+        channels = self.guild.text_channels
+        if self.messages and not channels:
+            raise ValueError("O servidor não tem canais de texto para simular as mensagens.")
+
+        raiders = []
+        tasks = []
+        sampler = asyncio.create_task(self._sample_queue())
+        start = time.perf_counter()
+        try:
+            for offset, kind, index in self._schedule():
+                delay = start + offset - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                injected_at = time.perf_counter()
+
+                if kind == 'join':
+                    member = self._member(index)
+                    if len(raiders) < 5 and member.avatar is None:
+                        raiders.append(member)
+                    ctx = self._context(JoinContext, member)
+                    tasks.append(asyncio.create_task(self._dispatch(self.bot.join_pipeline, ctx, JOIN_DETECTIONS, injected_at)))
+                else:
+                    if not raiders:
+                        raiders.append(self._member(index))
+                    author = raiders[index % len(raiders)]
+                    channel = channels[0]
+                    message = DrillMessage(channel, author, LINK_CONTENT if index % 5 == 4 else SPAM_CONTENT)
+                    channel.messages.append(message)
+                    ctx = self._context(MessageContext, message)
+                    tasks.append(asyncio.create_task(self._dispatch(self.bot.message_pipeline, ctx, MESSAGE_DETECTIONS, injected_at)))
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            sampler.cancel()
+        elapsed = time.perf_counter() - start
+        return self.report(start, elapsed)
+
+    def report(self, start: float, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, max(0, round(fraction * len(latencies)) - 1))]
+
+        actions = self.recorder.counts()
+        total_actions = sum(actions.values())
+        return {
+            "events": len(latencies),
+            "elapsed": elapsed,
+            "time_to_first_detection": self.first_detection - start if self.first_detection else None,
+            "detections": dict(self.detections),
+            "actions": dict(actions),
+            "actions_per_second": total_actions / elapsed if elapsed else 0.0,
+            "p50": percentile(0.50),
+            "p99": percentile(0.99),
+            "queue_max": max(self.queue_samples, default=0),
+            "queue_avg": sum(self.queue_samples) / len(self.queue_samples) if self.queue_samples else 0.0,
+        }
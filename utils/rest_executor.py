@@ -0,0 +1,177 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+import discord
+
+# Classes de prioridade: quanto menor, mais cedo a ação sai da fila
+PRIORITY_SECURITY = 0  # Kick, ban, remoção de cargos, quarentena
+PRIORITY_NORMAL = 1  # Respostas de comandos e ações de moderação comuns
+PRIORITY_COSMETIC = 2  # Boas-vindas, mensagens de nível e afins
+
+PRIORITY_NAMES = {
+    PRIORITY_SECURITY: "security",
+    PRIORITY_NORMAL: "normal",
+    PRIORITY_COSMETIC: "cosmetic",
+}
+
+
+class RestExecutor:
+    """
+    Executor central das chamadas à API do Discord.
+
+    Limita quantas chamadas rodam ao mesmo tempo, entrega as vagas por prioridade
+    (ações de segurança passam na frente das cosméticas), respeita os buckets de
+    rate limit por rota/servidor e repete chamadas com um número máximo de tentativas
+    e espera com jitter.
+    """
+    def __init__(self, bot, max_concurrency: int = 8, max_retries: int = 3, jitter: float = 0.5):
+        self.bot = bot
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.jitter = jitter
+        self._running = 0
+        self._sleeping = 0  # Chamadas esperando um bucket ou a próxima tentativa, sem ocupar vaga
+        self._waiters = []  # Heap de (prioridade, sequência, future)
+        self._sequence = itertools.count()
+        self._blocked_until = {}  # {(rota, guild_id): instante em que o bucket libera}
+        self.metrics = {
+            "calls": 0,
+            "failures": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "calls_by_priority": {name: 0 for name in PRIORITY_NAMES.values()},
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        """Quantidade de chamadas aguardando uma vaga de execução."""
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    @property
+    def pending(self) -> int:
+        """Chamadas em execução, aguardando na fila ou esperando um rate limit para tentar de novo."""
+        return self._running + self.queue_depth + self._sleeping
+
+    async def _acquire(self, priority: int):
+        if self._running < self.max_concurrency and not self._waiters:
+            self._running += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Se a vaga já tinha sido entregue, devolve para o próximo da fila
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # A vaga passa direto para o próximo da fila, sem liberar o contador
+                future.set_result(None)
+                return
+        self._running -= 1
+
+    def _bucket_delay(self, bucket) -> float:
+        """Segundos até o bucket liberar (0 se já está livre)."""
+        blocked_until = self._blocked_until.get(bucket)
+        if blocked_until:
+            delay = blocked_until - time.monotonic()
+            if delay > 0:
+                return delay
+            del self._blocked_until[bucket]
+        return 0.0
+
+    async def _sleep(self, delay: float):
+        # Esperas de rate limit e de nova tentativa acontecem fora da vaga, para não segurar
+        # as ações de segurança atrás de chamadas cosméticas limitadas
+        self._sleeping += 1
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self._sleeping -= 1
+
+    async def run(self, func, *args, route: str = None, guild_id: int = None, priority: int = PRIORITY_NORMAL, **kwargs):
+        """
+        Executa `func(*args, **kwargs)` respeitando prioridade, concorrência e rate limits.
+        Args:
+            func: A corrotina da API do Discord, ex: `member.kick`.
+            route: Nome do bucket de rate limit. Por padrão, o nome qualificado da função.
+            guild_id: O servidor do bucket, quando a rota é limitada por servidor.
+            priority: PRIORITY_SECURITY, PRIORITY_NORMAL ou PRIORITY_COSMETIC.
+        """
+        bucket = (route or getattr(func, '__qualname__', repr(func)), guild_id)
+        self.metrics["calls"] += 1
+        self.metrics["calls_by_priority"][PRIORITY_NAMES.get(priority, "normal")] += 1
+
+        attempt = 0
+        while True:
+            delay = self._bucket_delay(bucket)
+            if delay:
+                await self._sleep(delay)
+                continue
+
+            # A vaga é disputada de novo, pela prioridade da chamada, a cada tentativa
+            queued_at = time.monotonic()
+            await self._acquire(priority)
+            waited = time.monotonic() - queued_at
+            self.metrics["wait_time_total"] += waited
+            self.metrics["wait_time_max"] = max(self.metrics["wait_time_max"], waited)
+            if self._bucket_delay(bucket):
+                self._release()  # O bucket foi bloqueado enquanto a chamada esperava na fila
+                continue
+
+            try:
+                return await func(*args, **kwargs)
+            except discord.HTTPException as e:
+                if attempt >= self.max_retries or not (e.status == 429 or e.status >= 500):
+                    self.metrics["failures"] += 1
+                    raise
+                attempt += 1
+                self.metrics["retries"] += 1
+                if e.status == 429:
+                    self.metrics["rate_limited"] += 1
+                    delay = getattr(e, 'retry_after', None) or 1.0
+                    self._blocked_until[bucket] = time.monotonic() + delay
+                    self.bot.logger.warning(f"Rate limit atingido na rota {bucket[0]}. Tentativa {attempt}/{self.max_retries} em {delay:.2f}s.")
+                else:
+                    delay = 2 ** (attempt - 1)
+            except Exception:
+                self.metrics["failures"] += 1
+                raise
+            finally:
+                self._release()
+            await self._sleep(delay + random.uniform(0, self.jitter))
+
+    async def drain(self, timeout: float) -> int:
+        """
+        Espera as chamadas em execução e na fila terminarem (usado no desligamento).
+        As que não terminarem no prazo são canceladas; retorna quantas foram descartadas.
+        """
+        deadline = time.monotonic() + timeout
+        while self.pending and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+        dropped = self.pending
+        for _, _, future in self._waiters:
+            if not future.done():
+                future.cancel()
+        return dropped
+
+    def stats(self) -> dict:
+        """Retorna as métricas do executor, incluindo a profundidade atual da fila."""
+        calls = self.metrics["calls"]
+        return {
+            **self.metrics,
+            "calls_by_priority": dict(self.metrics["calls_by_priority"]),
+            "queue_depth": self.queue_depth,
+            "running": self._running,
+            "wait_time_avg": round(self.metrics["wait_time_total"] / calls, 4) if calls else 0.0,
+        }
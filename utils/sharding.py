@@ -0,0 +1,67 @@
+import os
+
+
+def shard_for_guild(guild_id: int, shard_count: int) -> int:
+    """Shard responsável por um servidor, pela fórmula do Discord: (guild_id >> 22) % shard_count."""
+    return (int(guild_id) >> 22) % shard_count
+
+def shard_settings(config: dict) -> dict:
+    """
+    Lê as opções de sharding do config.json, com prioridade para as variáveis de ambiente
+    SHARDED, SHARD_COUNT e SHARD_IDS (ex: "0,1,2"), usadas pelo launcher de clusters.
+    Retorna None quando o modo com shards está desativado.
+    """
+    sharded = os.getenv('SHARDED', str(config.get('sharded', False))).lower() in ('1', 'true', 'sim')
+    if not sharded:
+        return None
+
+    settings = {}
+    shard_count = os.getenv('SHARD_COUNT') or config.get('shard_count')
+    if shard_count:
+        settings['shard_count'] = int(shard_count)
+    shard_ids = os.getenv('SHARD_IDS') or config.get('shard_ids')
+    if shard_ids:
+        if isinstance(shard_ids, str):
+            shard_ids = [int(shard_id) for shard_id in shard_ids.split(',') if shard_id.strip()]
+        settings['shard_ids'] = list(shard_ids)
+    return settings
+
+def owned_shard_ids(bot) -> set:
+    """Shards que este processo controla (todos, se o bot não usa shards)."""
+    shard_count = bot.shard_count or 1
+    shard_ids = getattr(bot, 'shard_ids', None)
+    return set(shard_ids) if shard_ids is not None else set(range(shard_count))
+
+def owns_guild(bot, guild_id: int) -> bool:
+    """Indica se o servidor pertence a um dos shards deste processo."""
+    shard_count = bot.shard_count or 1
+    if shard_count == 1:
+        return True
+    return shard_for_guild(guild_id, shard_count) in owned_shard_ids(bot)
+
+def owned_guilds_filter(bot, field: str = 'guild_id') -> dict:
+    """
+    Filtro do MongoDB que restringe uma varredura aos servidores dos shards deste processo, calculando
+    o shard de cada documento no banco. Inclui os servidores de onde o bot já saiu, para que os
+    registros órfãos ainda sejam limpos pelo processo dono do shard.
+    """
+    shard_count = bot.shard_count or 1
+    if shard_count == 1:
+        return {}
+    guild_id = f'${field}'
+    # (guild_id >> 22) % shard_count sem operadores de bits: subtrai o resto antes de dividir,
+    # para que a divisão por 2^22 seja exata mesmo com IDs de 64 bits
+    shifted = {'$divide': [{'$subtract': [guild_id, {'$mod': [guild_id, 1 << 22]}]}, 1 << 22]}
+    return {'$expr': {'$in': [{'$mod': [shifted, shard_count]}, sorted(owned_shard_ids(bot))]}}
+
+def shard_stats(bot) -> list:
+    """Latência e quantidade de servidores de cada shard deste processo."""
+    guild_counts = {}
+    for guild in bot.guilds:
+        guild_counts[guild.shard_id] = guild_counts.get(guild.shard_id, 0) + 1
+
+    latencies = getattr(bot, 'latencies', None) or [(bot.shard_id or 0, bot.latency)]
+    return [
+        {"shard_id": shard_id, "latency": latency, "guilds": guild_counts.get(shard_id, 0)}
+        for shard_id, latency in latencies
+    ]
@@ -0,0 +1,167 @@
+import asyncio
+import inspect
+import itertools
+import time
+from utils.web_service import stop_web_service
+from utils import log_service
+
+
+class ShutdownCoordinator:
+    """
+    Encerramento gracioso do bot, na ordem:
+
+    1. Para de aceitar eventos e comandos novos (`accepting` fica False).
+    2. Para os serviços em segundo plano (monitor do loop, status do cluster).
+    3. Avisa os trabalhos em andamento registrados com `track` (sorteios, julgamentos).
+    4. Drena as chamadas pendentes do executor REST, com prazo.
+    5. Grava os buffers registrados com `register_flush` (ex: XP acumulado).
+    6. Encerra o web service, desconecta do Discord e fecha o cliente do MongoDB.
+    7. Registra o relatório do que foi gravado e do que se perdeu e espera a fila de logs esvaziar.
+
+    Cada etapa roda isolada: uma falha entra em `step_failures` e o encerramento continua. Desconectar,
+    fechar o MongoDB e escrever os logs sempre acontecem.
+
+    Pode ser chamado várias vezes (sinal + `bot.close()`): todas esperam o mesmo encerramento.
+    """
+    def __init__(self, bot, drain_timeout: float = 10.0, flush_timeout: float = 10.0):
+        self.bot = bot
+        self.drain_timeout = drain_timeout
+        self.flush_timeout = flush_timeout
+        self.accepting = True
+        self.rejected_events = 0
+        self._flushes = {}  # {nome: corrotina que grava e retorna quantos itens gravou}
+        self._volatile = {}  # {nome: função que retorna quantos itens em memória seriam perdidos}
+        self._in_flight = {}  # {token: (descrição, corrotina chamada no desligamento)}
+        self._tokens = itertools.count()
+        self._task = None
+        self.report = None
+
+    def register_flush(self, name: str, callback):
+        """Registra um buffer gravado no desligamento. `callback()` retorna quantos itens gravou."""
+        self._flushes[name] = callback
+
+    def unregister_flush(self, name: str):
+        self._flushes.pop(name, None)
+
+    def register_volatile(self, name: str, size_callback):
+        """Registra um estado só em memória, descartado no desligamento; o tamanho entra no relatório."""
+        self._volatile[name] = size_callback
+
+    def unregister_volatile(self, name: str):
+        self._volatile.pop(name, None)
+
+    def track(self, description: str, on_shutdown=None) -> int:
+        """
+        Registra um trabalho em andamento (ex: um sorteio). Se o bot desligar antes de `untrack`,
+        `on_shutdown()` é chamada para avisar os usuários, e o trabalho entra no relatório como interrompido.
+        """
+        token = next(self._tokens)
+        self._in_flight[token] = (description, on_shutdown)
+        return token
+
+    def untrack(self, token: int):
+        self._in_flight.pop(token, None)
+
+    def admit(self) -> bool:
+        """Retorna False (e conta o evento como rejeitado) quando o desligamento já começou."""
+        if self.accepting:
+            return True
+        self.rejected_events += 1
+        return False
+
+    async def shutdown(self, disconnect, reason: str = "close") -> dict:
+        """Executa o encerramento uma única vez; chamadas seguintes esperam o mesmo resultado."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._shutdown(disconnect, reason))
+        return await asyncio.shield(self._task)
+
+    async def _step(self, report: dict, name: str, call):
+        """Executa uma etapa do desligamento; uma falha é registrada e não impede as seguintes."""
+        try:
+            result = call()
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        except Exception as e:
+            report["step_failures"][name] = repr(e)
+            self.bot.logger.error(f"Erro na etapa '{name}' do desligamento: {e!r}")
+            return None
+
+    async def _notify_in_flight(self, report: dict):
+        # Avisa os trabalhos em andamento antes de drenar, para que as mensagens entrem na fila do REST
+        in_flight = list(self._in_flight.values())
+        self._in_flight.clear()
+        report["interrupted"] = [description for description, _ in in_flight]
+        callbacks = [callback() for _, callback in in_flight if callback]
+        if callbacks:
+            results = await asyncio.gather(*(asyncio.wait_for(call, self.drain_timeout) for call in callbacks), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    self.bot.logger.warning(f"Erro ao avisar um trabalho interrompido: {result!r}")
+
+    async def _drain_rest(self, report: dict):
+        report["rest_pending"] = self.bot.rest.pending
+        report["rest_dropped"] = await self.bot.rest.drain(self.drain_timeout)
+
+    async def _flush_buffers(self, report: dict):
+        for name, callback in list(self._flushes.items()):
+            try:
+                report["flushed"][name] = await asyncio.wait_for(callback(), self.flush_timeout)
+            except Exception as e:
+                report["flush_failures"][name] = repr(e)
+                self.bot.logger.error(f"Erro ao gravar '{name}' no desligamento: {e!r}")
+
+    def _measure_volatile(self, report: dict):
+        for name, size_callback in self._volatile.items():
+            try:
+                size = size_callback()
+            except Exception:
+                continue
+            if size:
+                report["volatile_dropped"][name] = size
+
+    def _stop_background(self):
+        self.bot.loop_monitor.stop()
+        if self.bot.cluster:
+            self.bot.cluster.stop()
+
+    async def _shutdown(self, disconnect, reason: str) -> dict:
+        bot = self.bot
+        start = time.monotonic()
+        self.accepting = False
+        bot.logger.info(f"Desligamento iniciado ({reason}). Parando de aceitar eventos novos.")
+        report = {
+            "reason": reason, "interrupted": [], "flushed": {}, "flush_failures": {}, "volatile_dropped": {},
+            "rest_pending": 0, "rest_dropped": 0, "step_failures": {},
+        }
+
+        try:
+            await self._step(report, "background", self._stop_background)
+            await self._step(report, "in_flight", lambda: self._notify_in_flight(report))
+            await self._step(report, "rest_drain", lambda: self._drain_rest(report))
+            await self._step(report, "flush", lambda: self._flush_buffers(report))
+            self._measure_volatile(report)
+            await self._step(report, "web_service", lambda: stop_web_service(bot))
+        finally:
+            # Sempre desconecta e fecha o banco, mesmo que uma etapa anterior tenha falhado
+            await self._step(report, "disconnect", disconnect)
+            if bot.db_client is not None:
+                await self._step(report, "db_client", bot.db_client.close)
+
+            report["rejected_events"] = self.rejected_events
+            report["elapsed"] = round(time.monotonic() - start, 2)
+            self.report = report
+            bot.logger.info(
+                f"Desligamento concluído em {report['elapsed']}s: "
+                f"{report['rest_pending'] - report['rest_dropped']} chamadas REST concluídas, {report['rest_dropped']} descartadas; "
+                f"gravados {report['flushed'] or 'nenhum buffer'}; "
+                f"falhas {report['flush_failures'] or 'nenhuma'}; "
+                f"etapas com erro {report['step_failures'] or 'nenhuma'}; "
+                f"trabalhos interrompidos {len(report['interrupted'])}; "
+                f"estado em memória descartado {report['volatile_dropped'] or 'nenhum'}; "
+                f"{report['rejected_events']} eventos rejeitados.",
+                extra={"shutdown_report": report}
+            )
+            # Por último, para que o relatório também seja escrito antes de o processo sair
+            await self._step(report, "log_flush", log_service.flush_logging)
+        return report
@@ -0,0 +1,70 @@
+import collections
+import time
+
+
+class SlidingWindowCounter:
+    """
+    Contadores de janela deslizante por chave (ex: (guild_id, user_id)), com memória limitada.
+
+    Cada chave guarda um deque de instantes (time.monotonic) com no máximo `max_events` itens:
+    registrar um evento e descartar os que saíram da janela custa O(1) amortizado.
+
+    As chaves ficam em ordem de último uso (LRU). Como uma chave sem eventos há mais de `window`
+    segundos não tem mais nada na janela, as ociosas estão sempre no começo e são removidas a cada
+    `hit`; acima de `max_keys` chaves, as menos usadas são descartadas mesmo que ainda ativas.
+    """
+    def __init__(self, window: float, max_events: int = 1024, max_keys: int = 50000):
+        self.window = window
+        self.max_events = max_events
+        self.max_keys = max_keys
+        self._windows = collections.OrderedDict()  # {chave: deque de instantes}, menos usada primeiro
+        self.evicted = 0  # Chaves descartadas pelo limite de memória (as ociosas não contam)
+
+    def hit(self, key, now: float = None) -> int:
+        """Registra um evento para a chave e retorna quantos eventos ela tem dentro da janela."""
+        now = time.monotonic() if now is None else now
+        timestamps = self._windows.get(key)
+        if timestamps is None:
+            timestamps = self._windows[key] = collections.deque(maxlen=self.max_events)
+        else:
+            self._windows.move_to_end(key)
+        timestamps.append(now)
+        self._expire(timestamps, now)
+        self._evict(now)
+        return len(timestamps)
+
+    def count(self, key, now: float = None) -> int:
+        """Quantidade de eventos da chave dentro da janela, sem registrar um novo."""
+        timestamps = self._windows.get(key)
+        if not timestamps:
+            return 0
+        self._expire(timestamps, time.monotonic() if now is None else now)
+        return len(timestamps)
+
+    def reset(self, key):
+        """Esquece os eventos da chave (ex: depois de punir o usuário)."""
+        self._windows.pop(key, None)
+
+    def clear(self):
+        self._windows.clear()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def _expire(self, timestamps: collections.deque, now: float):
+        cutoff = now - self.window
+        while timestamps and timestamps[0] <= cutoff:
+            timestamps.popleft()
+
+    def _evict(self, now: float):
+        # Ociosas: o último evento já saiu da janela
+        cutoff = now - self.window
+        while self._windows:
+            key, timestamps = next(iter(self._windows.items()))
+            if timestamps and timestamps[-1] > cutoff:
+                break
+            del self._windows[key]
+        # Limite rígido: descarta as menos usadas
+        while len(self._windows) > self.max_keys:
+            self._windows.popitem(last=False)
+            self.evicted += 1
@@ -1,34 +1,134 @@
-from flask import Flask, jsonify
-import threading
+from aiohttp import web
+from utils.sharding import shard_stats
 import os
 
-app = Flask(__name__)
-# Declara a variável `bot` para ser acessada no contexto do módulo.
-# Ela será definida pela função `run_web_service`.
-global_bot = None 
+# Funções que retornam métricas extras no formato [(nome, {rótulos}, valor), ...]
+# Os módulos registram as suas com `register_metrics_provider`.
+metrics_providers = []
 
-# NOVA ROTA: Responde a requisições na URL raiz para o Uptime Robot
-@app.route('/', methods=['GET', 'HEAD'])
-def home():
-    """Retorna um status 200 OK para o Uptime Robot."""
-    return 'Serviço está online!', 200
+def register_metrics_provider(provider):
+    """Registra uma função `provider(bot)` que retorna uma lista de (nome, rótulos, valor)."""
+    if provider not in metrics_providers:
+        metrics_providers.append(provider)
 
-# Endpoint de exemplo para o web service
-@app.route('/status', methods=['GET'])
-def get_status():
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+def _core_metrics(bot):
+    """Métricas básicas do bot, do cache de configurações e do executor REST."""
+    ready = bot.is_ready()
+    samples = [
+        ("swityis_up", {}, 1 if ready else 0),
+        ("swityis_guilds", {}, len(bot.guilds)),
+    ]
+    if ready:
+        samples.append(("swityis_gateway_latency_seconds", {}, bot.latency))
+        for shard in shard_stats(bot):
+            labels = {"shard": shard["shard_id"]}
+            samples.append(("swityis_shard_latency_seconds", labels, shard["latency"]))
+            samples.append(("swityis_shard_guilds", labels, shard["guilds"]))
+
+    config_cache = getattr(bot, 'config_cache', None)
+    if config_cache:
+        stats = config_cache.stats()
+        samples += [
+            ("swityis_config_cache_hits_total", {}, stats["hits"]),
+            ("swityis_config_cache_misses_total", {}, stats["misses"]),
+            ("swityis_config_cache_entries", {}, stats["entries"]),
+        ]
+
+    rest = getattr(bot, 'rest', None)
+    if rest:
+        stats = rest.stats()
+        samples += [
+            ("swityis_rest_queue_depth", {}, stats["queue_depth"]),
+            ("swityis_rest_running", {}, stats["running"]),
+            ("swityis_rest_retries_total", {}, stats["retries"]),
+            ("swityis_rest_rate_limited_total", {}, stats["rate_limited"]),
+            ("swityis_rest_failures_total", {}, stats["failures"]),
+            ("swityis_rest_wait_seconds_total", {}, stats["wait_time_total"]),
+            ("swityis_rest_wait_seconds_max", {}, stats["wait_time_max"]),
+        ]
+        for priority, count in stats["calls_by_priority"].items():
+            samples.append(("swityis_rest_calls_total", {"priority": priority}, count))
+    return samples
+
+def render_metrics(bot) -> str:
+    """Monta o texto das métricas no formato de exposição do Prometheus."""
+    lines = []
+    for provider in [_core_metrics] + metrics_providers:
+        try:
+            samples = provider(bot)
+        except Exception as e:
+            bot.logger.error(f"Erro ao coletar métricas de {getattr(provider, '__name__', provider)}: {e}")
+            continue
+        for name, labels, value in samples:
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+def build_status(bot) -> dict:
     """Retorna o status atual do bot."""
-    if global_bot and global_bot.is_ready():
-        return jsonify({"status": "Online", "latency": f"{global_bot.latency:.2f} ms"})
-    else:
-        return jsonify({"status": "Offline"})
-
-def run_web_service(bot_instance):
-    """Inicia o servidor Flask em uma nova thread."""
-    global global_bot # Usa a variável global
-    global_bot = bot_instance
-    port = os.getenv('PORT', 5000)
+    if not bot.is_ready():
+        return {"status": "Offline"}
+    status = {"status": "Online", "latency": f"{bot.latency * 1000:.2f} ms", "guilds": len(bot.guilds)}
+    if bot.shard_count and bot.shard_count > 1:
+        status["shard_count"] = bot.shard_count
+        status["shards"] = [
+            {"shard_id": shard["shard_id"], "latency": f"{shard['latency'] * 1000:.2f} ms", "guilds": shard["guilds"]}
+            for shard in shard_stats(bot)
+        ]
+    loop_monitor = getattr(bot, 'loop_monitor', None)
+    if loop_monitor:
+        status["loop_lag_ms"] = {name: round(value * 1000, 2) for name, value in loop_monitor.percentiles().items()}
+    return status
+
+def create_app(bot) -> web.Application:
+    """Cria a aplicação aiohttp com as rotas do web service."""
+    async def home(request):
+        """Retorna um status 200 OK para o Uptime Robot."""
+        return web.Response(text='Serviço está online!')
+
+    async def get_status(request):
+        return web.json_response(build_status(bot))
+
+    async def get_metrics(request):
+        return web.Response(text=render_metrics(bot), content_type='text/plain', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/', home)  # add_get também responde a HEAD
+    app.router.add_get('/status', get_status)
+    app.router.add_get('/metrics', get_metrics)
+    return app
+
+async def start_web_service(bot):
+    """Inicia o servidor HTTP no próprio event loop do bot. Chamadas repetidas não abrem outro servidor."""
+    if getattr(bot, 'web_runner', None):
+        return bot.web_runner
+
+    port = int(os.getenv('PORT', bot.config.get('web_service_port', 5000)))
+    runner = web.AppRunner(create_app(bot), access_log=None)
+    await runner.setup()
     try:
-        threading.Thread(target=lambda: app.run(host='0.0.0.0', port=port, debug=False), daemon=True).start()
-        print(f"Web service rodando na porta {port}.")
+        await web.TCPSite(runner, host='0.0.0.0', port=port).start()
     except Exception as e:
-        print(f"Erro ao iniciar o web service: {e}")
+        await runner.cleanup()
+        bot.logger.error(f"Erro ao iniciar o web service: {e}")
+        return None
+
+    bot.web_runner = runner
+    bot.logger.info(f"Web service rodando na porta {port}.")
+    return runner
+
+async def stop_web_service(bot):
+    """Encerra o servidor HTTP, se estiver rodando."""
+    runner = getattr(bot, 'web_runner', None)
+    if runner:
+        bot.web_runner = None
+        await runner.cleanup()
+        bot.logger.info("Web service encerrado.")
@@ -0,0 +1,109 @@
+from utils.content_fingerprint import fold_text
+
+# Substituições comuns de leet-speak, aplicadas depois de remover acentos e maiúsculas
+LEET_TABLE = str.maketrans({'0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '7': 't', '8': 'b'})
+# Símbolos também usados como pontuação: só viram letra dentro de uma palavra ("p!ranha", "a$$im"),
+# para que "merda!" continue terminando numa fronteira de palavra
+LEET_SYMBOLS = {'@': 'a', '$': 's', '!': 'i', '|': 'i', '+': 't'}
+# Estes raramente são pontuação e também valem na borda da palavra ("@ss", "merd@")
+EDGE_SYMBOLS = frozenset('@$')
+
+
+def _translate_symbols(text: str) -> str:
+    chars = list(text)
+    for index, char in enumerate(text):
+        letter = LEET_SYMBOLS.get(char)
+        if letter is None:
+            continue
+        # Símbolos seguidos ("a$$im") contam como parte da mesma palavra
+        before = _word_reaches(text, index, -1)
+        after = _word_reaches(text, index, 1)
+        if (before and after) or (char in EDGE_SYMBOLS and (before or after)):
+            chars[index] = letter
+    return "".join(chars)
+
+
+def _word_reaches(text: str, index: int, step: int) -> bool:
+    """Se, a partir de `index`, há uma letra ou dígito antes de acabar a sequência de símbolos."""
+    index += step
+    while 0 <= index < len(text) and text[index] in LEET_SYMBOLS:
+        index += step
+    return 0 <= index < len(text) and text[index].isalnum()
+
+
+def normalize_filter_text(text: str) -> str:
+    """Normalização usada nos termos bloqueados e nas mensagens: sem acentos/zalgo, minúsculas e sem leet."""
+    text = fold_text(text).translate(LEET_TABLE)  # A pontuação fica: ela marca o fim das palavras
+    if any(char in LEET_SYMBOLS for char in text):
+        text = _translate_symbols(text)
+    return text
+
+
+class WordAutomaton:
+    """
+    Autômato de Aho–Corasick com todos os termos bloqueados de um servidor: uma única passada
+    pelo texto encontra todas as ocorrências, independente da quantidade de termos.
+
+    Os termos só contam como palavra inteira (cercados por caracteres que não são letras ou números),
+    para que "ass" não encontre "classe".
+    """
+    def __init__(self, terms):
+        self.terms = []
+        self._goto = [{}]  # Transições de cada nó
+        self._fail = [0]
+        self._output = [()]  # Índices dos termos que terminam em cada nó
+        for term in terms:
+            self._add(term)
+        self._build()
+
+    def _add(self, term: str):
+        term = normalize_filter_text(term)
+        if not term or term in self.terms:
+            return
+        node = 0
+        for char in term:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            node = next_node
+        self._output[node] += (len(self.terms),)
+        self.terms.append(term)
+
+    def _build(self):
+        # Busca em largura: o link de falha de cada nó é o maior sufixo que também é prefixo de algum termo
+        queue = list(self._goto[0].values())  # Os filhos da raiz falham para a raiz
+        for node in queue:
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] += self._output[self._fail[child]]
+
+    def find(self, text: str, normalized: bool = False) -> list:
+        """Retorna os termos encontrados no texto (com repetição, na ordem em que terminam)."""
+        if not self.terms:
+            return []
+        if not normalized:
+            text = normalize_filter_text(text)
+        goto, fail, output, terms = self._goto, self._fail, self._output, self.terms
+        found = []
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for term_index in output[node]:
+                term = terms[term_index]
+                start = index - len(term) + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (index + 1 == len(text) or not text[index + 1].isalnum()):
+                    found.append(term)
+        return found
+
+    def __len__(self) -> int:
+        return len(self.terms)